@@ -0,0 +1,27 @@
+import sys
+import json
+import asyncio
+import importlib
+
+
+def apply_overrides(overrides: dict[str, dict]):
+    for module_name, values in overrides.items():
+        module = importlib.import_module(module_name)
+
+        for name, value in values.items():
+            setattr(module, name, value)
+
+
+def main():
+    apply_overrides(json.loads(sys.argv[1]) if len(sys.argv) > 1 else {})
+
+    from src.chatbot import ChatBot
+
+    try:
+        asyncio.run(ChatBot().run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+import json
+import random
+import asyncio
+import hashlib
+import zlib
+from collections import Counter
+from typing import Callable
+from urllib.parse import urlsplit, parse_qs
+
+from websockets.asyncio.server import serve, ServerConnection
+from websockets.exceptions import ConnectionClosed
+
+from benchmarks.osu_files import synthesize_osu
+
+USER_ID_BASE = 10000
+BEATMAP_ID_BASE = 100000
+BEATMAPSET_ID_BASE = 50000
+RANKS = ("SS", "S", "A", "B", "C", "D")
+STATUS_REASONS = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}
+WORDS = (
+    "gg", "anyone", "multi", "farm", "map", "pp", "lol", "nice", "rank", "stream", "jump", "aim",
+    "tablet", "mouse", "skin", "hd", "dt", "hr", "fc", "choke", "miss", "acc", "today", "play"
+)
+
+
+class FakeWorld:
+    def __init__(self, users: int, beatmaps: int, seed: int, synthesize: bool = False):
+        rng = random.Random(seed)
+
+        self.synthesize = synthesize
+        self.usernames = [f"player{index}" for index in range(users)]
+        self.user_ids = {username: USER_ID_BASE + index for index, username in enumerate(self.usernames)}
+
+        self.beatmaps = []
+        self.by_md5: dict[str, dict] = {}
+        self.by_id: dict[str, dict] = {}
+        self.by_set: dict[str, list[dict]] = {}
+
+        for index in range(beatmaps):
+            self.add_beatmap(self.make_beatmap(rng, BEATMAP_ID_BASE + index, BEATMAPSET_ID_BASE + index // 4, hashlib.md5(f"beatmap-{index}".encode()).hexdigest()))
+
+    @staticmethod
+    def make_beatmap(rng: random.Random, beatmap_id: int, beatmapset_id: int, md5: str) -> dict:
+        return {
+            "beatmap_id": str(beatmap_id),
+            "beatmapset_id": str(beatmapset_id),
+            "file_md5": md5,
+            "approved": "1",
+            "mode": "0",
+            "artist": f"Artist {beatmapset_id % 97}",
+            "title": f"Song {beatmapset_id}",
+            "version": ("Easy", "Normal", "Hard", "Insane")[beatmap_id % 4],
+            "creator": f"mapper{beatmapset_id % 31}",
+            "bpm": str(rng.randint(120, 240)),
+            "hit_length": str(rng.randint(60, 300)),
+            "total_length": str(rng.randint(60, 320)),
+            "max_combo": str(rng.randint(200, 2500)),
+            "diff_size": str(rng.choice((3, 3.5, 4, 4.2, 5))),
+            "diff_overall": str(rng.randint(5, 10)),
+            "diff_approach": str(rng.randint(7, 10)),
+            "diff_drain": str(rng.randint(4, 8)),
+            "difficultyrating": f"{rng.uniform(1.5, 7.5):.4f}"
+        }
+
+    def add_beatmap(self, beatmap: dict) -> dict:
+        self.beatmaps.append(beatmap)
+        self.by_md5[beatmap["file_md5"]] = beatmap
+        self.by_id[beatmap["beatmap_id"]] = beatmap
+        self.by_set.setdefault(beatmap["beatmapset_id"], []).append(beatmap)
+
+        return beatmap
+
+    def synthesize_beatmap(self, beatmap_id: int | None = None, md5: str | None = None) -> dict:
+        if beatmap_id is None:
+            beatmap_id = BEATMAP_ID_BASE + int(md5[:8], 16) % 10 ** 7
+
+        md5 = md5 or hashlib.md5(f"beatmap-{beatmap_id}".encode()).hexdigest()
+
+        return self.add_beatmap(self.make_beatmap(random.Random(md5), beatmap_id, beatmap_id // 4, md5))
+
+    def beatmap_by_md5(self, md5: str) -> dict | None:
+        if md5 not in self.by_md5 and self.synthesize:
+            return self.synthesize_beatmap(md5=md5)
+
+        return self.by_md5.get(md5)
+
+    def beatmap_by_id(self, beatmap_id: str) -> dict | None:
+        if beatmap_id not in self.by_id and self.synthesize and beatmap_id.isdigit():
+            return self.synthesize_beatmap(beatmap_id=int(beatmap_id))
+
+        return self.by_id.get(beatmap_id)
+
+    def beatmaps_by_set(self, beatmapset_id: str) -> list[dict]:
+        if beatmapset_id not in self.by_set and self.synthesize and beatmapset_id.isdigit():
+            for beatmap_id in range(int(beatmapset_id) * 4, int(beatmapset_id) * 4 + 4):
+                self.synthesize_beatmap(beatmap_id=beatmap_id)
+
+        return self.by_set.get(beatmapset_id, [])
+
+    def user(self, username: str) -> dict | None:
+        user_id = self.user_ids.get(username.lower())
+
+        if user_id is None and self.synthesize:
+            user_id = USER_ID_BASE + zlib.crc32(username.lower().encode()) % 10 ** 7
+
+        return {"id": user_id, "username": username.lower()} if user_id is not None else None
+
+    def score(self, rng: random.Random, username: str) -> dict:
+        beatmap = rng.choice(self.beatmaps)
+        count_miss = rng.choice((0, 0, 0, 1, 2, 5))
+
+        return {
+            "id": rng.randint(1, 2 ** 31),
+            "user": {"id": self.user_ids[username], "username": username},
+            "beatmap_md5": beatmap["file_md5"],
+            "score": rng.randint(100000, 90000000),
+            "max_combo": rng.randint(100, int(beatmap["max_combo"])),
+            "full_combo": count_miss == 0,
+            "mods": rng.choice((0, 0, 8, 16, 24, 64, 72)),
+            "count_300": rng.randint(300, 1500),
+            "count_100": rng.randint(0, 60),
+            "count_50": rng.randint(0, 10),
+            "count_geki": rng.randint(0, 300),
+            "count_katu": rng.randint(0, 40),
+            "count_miss": count_miss,
+            "time": "2024-01-01T00:00:00Z",
+            "play_mode": 0,
+            "accuracy": round(rng.uniform(85, 100), 2),
+            "pp": round(rng.uniform(10, 400), 2),
+            "rank": rng.choice(RANKS),
+            "completed": rng.choice((2, 3, 3, 3))
+        }
+
+    def np_action(self, rng: random.Random) -> tuple[str, str]:
+        beatmap = rng.choice(self.beatmaps)
+        mods = rng.choice(("", "", " +Hidden", " +DoubleTime", " +Hidden +HardRock"))
+        text = (
+            f"\x01ACTION is playing [https://osu.ppy.sh/beatmapsets/{beatmap["beatmapset_id"]}#/{beatmap["beatmap_id"]} "
+            f"{beatmap["artist"]} - {beatmap["title"]} [{beatmap["version"]}]]{mods}\x01"
+        )
+
+        return beatmap["beatmapset_id"], text
+
+    @staticmethod
+    def chatter(rng: random.Random) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 9)))
+
+
+class FakeAPIServer:
+    def __init__(self, world: FakeWorld, latency: float = 0.0, jitter: float = 0.0, seed: int = 0, slow_rate: float = 0.0, slow_latency: float = 0.0, error_rate: float = 0.0):
+        self.world = world
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+        self.server: asyncio.Server | None = None
+        self.port = 0
+        self.writers: set[asyncio.StreamWriter] = set()
+        self.calls: Counter[str] = Counter()
+
+    def base_url(self, api: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{api}"
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle_client, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        return self.port
+
+    async def close(self):
+        self.server.close()
+
+        for writer in list(self.writers):
+            writer.close()
+
+        await self.server.wait_closed()
+
+    def route(self, path: str, query: dict[str, list[str]]) -> tuple[int, object]:
+        api, _, endpoint = path.lstrip("/").partition("/")
+        endpoint = "/" + endpoint
+
+        match api, endpoint:
+            case "ripple", "/users":
+                names = query.get("nname", []) + query.get("names", [])
+                users = [user for user in map(self.world.user, names) if user is not None]
+                return 200, {"code": 200, "users": users}
+            case "delta", _ if endpoint.startswith("/clients"):
+                return 200, {"code": 200, "clients": []}
+            case "peppy", "/get_beatmaps":
+                if "h" in query:
+                    beatmaps = [beatmap for beatmap in map(self.world.beatmap_by_md5, query["h"]) if beatmap is not None]
+                elif "b" in query:
+                    beatmaps = [beatmap for beatmap in map(self.world.beatmap_by_id, query["b"]) if beatmap is not None]
+                elif "s" in query:
+                    beatmaps = [beatmap for beatmapset_id in query["s"] for beatmap in self.world.beatmaps_by_set(beatmapset_id)]
+                else:
+                    beatmaps = []
+
+                return 200, beatmaps[:int(query.get("limit", ["500"])[0])]
+            case "osu", _ if endpoint.startswith("/osu/") and endpoint[5:].isdigit():
+                rng = random.Random(int(endpoint[5:]))
+                return 200, synthesize_osu(rng, rng.randint(100, 1500))
+
+        return 404, {"code": 404, "message": "Not Found"}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writers.add(writer)
+
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+
+                while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                url = urlsplit(request_line.decode("latin-1").split()[1])
+                self.calls[url.path.rstrip("0123456789")] += 1
+
+                latency = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+                if self.slow_rate and self.rng.random() < self.slow_rate:
+                    latency += self.slow_latency
+
+                if latency:
+                    await asyncio.sleep(latency)
+
+                if self.error_rate and self.rng.random() < self.error_rate:
+                    status, body = 503, {"code": 503, "message": "Service Unavailable"}
+                else:
+                    status, body = self.route(url.path, parse_qs(url.query))
+
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_REASONS[status]}\r\n"
+                    f"Content-Type: {"text/plain" if isinstance(body, bytes) else "application/json"}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+
+class FakeIRCServer:
+    def __init__(self, on_privmsg: Callable[[str, str], None]):
+        self.on_privmsg = on_privmsg
+
+        self.server: asyncio.Server | None = None
+        self.port = 0
+        self.writer: asyncio.StreamWriter | None = None
+        self.joined = asyncio.Event()
+        self.received_lines = 0
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle_client, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        return self.port
+
+    async def close(self):
+        self.server.close()
+
+        if self.writer is not None:
+            self.writer.close()
+
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        nickname = "bot"
+
+        try:
+            while line := await reader.readline():
+                self.received_lines += 1
+                parts = line.decode().rstrip("\r\n").split(" ", 2)
+
+                match parts[0]:
+                    case "NICK":
+                        nickname = parts[1]
+                    case "USER":
+                        writer.write(f":irc.fake 001 {nickname} :Welcome\r\n".encode())
+                    case "JOIN":
+                        for channel in parts[1].split(","):
+                            writer.write(f":{nickname}!{nickname}@fake JOIN {channel}\r\n".encode())
+
+                        self.writer = writer
+                        self.joined.set()
+                    case "PING":
+                        writer.write(f":irc.fake PONG {parts[1] if len(parts) > 1 else "irc.fake"}\r\n".encode())
+                    case "PRIVMSG" if len(parts) > 2:
+                        self.on_privmsg(parts[1], parts[2].removeprefix(":"))
+
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if self.writer is writer:
+                self.writer = None
+                self.joined.clear()
+
+    def write(self, lines: list[str]):
+        self.writer.write("".join(lines).encode())
+
+    async def drain(self):
+        await self.writer.drain()
+
+    @staticmethod
+    def privmsg(nick: str, target: str, text: str) -> str:
+        return f":{nick}!{nick}@fake PRIVMSG {target} :{text}\r\n"
+
+
+class FakeScoreFeed:
+    def __init__(self, world: FakeWorld, rate: float, seed: int):
+        self.world = world
+        self.rate = rate
+        self.rng = random.Random(seed)
+
+        self.server = None
+        self.port = 0
+        self.connections: dict[ServerConnection, set[int] | None] = {}
+        self.subscribed = asyncio.Event()
+        self.emitted = 0
+        self.filtered = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def start(self) -> int:
+        self.server = await serve(self.handle_client, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        return self.port
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_client(self, websocket: ServerConnection):
+        try:
+            async for frame in websocket:
+                message = json.loads(frame)
+
+                match message.get("type"):
+                    case "ping":
+                        await websocket.send(json.dumps({"type": "pong"}))
+                    case "identify":
+                        await websocket.send(json.dumps({"type": "identified", "data": {}}))
+                    case "subscribe_scores":
+                        users = {entry["user"] for entry in message.get("data", [])} or None
+                        await websocket.send(json.dumps({"type": "subscribed_to_scores", "data": message.get("data", [])}))
+
+                        if websocket not in self.connections:
+                            for username in self.world.usernames:
+                                await self.emit(websocket, username, users)
+
+                        self.connections[websocket] = users
+                        self.subscribed.set()
+        except ConnectionClosed:
+            pass
+        finally:
+            self.connections.pop(websocket, None)
+
+    async def emit(self, websocket: ServerConnection, username: str, users: set[int] | None):
+        score = self.world.score(self.rng, username)
+
+        if users is not None and score["user"]["id"] not in users:
+            self.filtered += 1
+            return
+
+        await websocket.send(json.dumps({"type": "new_score", "data": score}))
+        self.emitted += 1
+
+    async def run(self):
+        if self.rate <= 0:
+            return
+
+        while True:
+            await asyncio.sleep(1 / self.rate)
+
+            username = self.rng.choice(self.world.usernames)
+
+            for websocket, users in list(self.connections.items()):
+                try:
+                    await self.emit(websocket, username, users)
+                except ConnectionClosed:
+                    self.connections.pop(websocket, None)
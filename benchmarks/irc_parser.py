@@ -0,0 +1,72 @@
+import re
+import time
+import argparse
+from pathlib import Path
+
+from src.irc_command import IRCCommand
+from src.irc_message import IRCMessage
+
+CORPUS = Path(__file__).parent / "corpus" / "osu_irc.txt"
+
+
+def parse_legacy(line: str):
+    try:
+        irc_command = IRCCommand[line.split()[1]]
+    except KeyError:
+        if bool(re.search(r"^\d{3}$", line.split()[1])):
+            irc_command = None
+        else:
+            return None
+
+    if irc_command is IRCCommand.PRIVMSG:
+        sender = line[re.search(r":", line).end():re.search(r"!", line).start()]
+        channel = line[re.search(r"PRIVMSG ", line).end():re.search(r" :", line).start()]
+        message = line[re.search(r"(?<=:).*?:", line).end():].rstrip()
+        return irc_command, sender, channel, message
+
+    return irc_command
+
+
+def parse_current(line: str):
+    message = IRCMessage.parse(line)
+
+    if message is not None and message.command == "PRIVMSG":
+        return message.command, message.nick, message.target, message.params[-1]
+
+    return message
+
+
+def measure(parse, lines: list[str], rounds: int) -> float:
+    best = 0.0
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+
+        for line in lines:
+            parse(line)
+
+        best = max(best, len(lines) / (time.perf_counter() - start))
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IRC line parsing over a #osu corpus")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8", newline="") as corpus:
+        lines = corpus.read().splitlines(keepends=True)
+
+    legacy = measure(parse_legacy, lines, args.rounds)
+    current = measure(parse_current, lines, args.rounds)
+
+    print(f"Corpus: {args.corpus} ({len(lines)} lines)")
+    print(f"Legacy split/regex parsing: {legacy:,.0f} lines/sec")
+    print(f"IRCMessage.parse: {current:,.0f} lines/sec")
+    print(f"Speedup: {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import signal
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+from collections import deque
+
+from benchmarks.fake_servers import FakeWorld, FakeAPIServer, FakeIRCServer, FakeScoreFeed
+
+ROOT = Path(__file__).resolve().parent.parent
+CHANNEL = "#osu"
+NICKNAME = "loadbot"
+STARTUP_TIMEOUT = 30
+SHUTDOWN_TIMEOUT = 15
+BEATCONNECT_LINK = re.compile(r"beatconnect\.io/b/(\d+)")
+UNTHROTTLED = {"GLOBAL_RATE": 1e6, "GLOBAL_BURST": 10 ** 6, "TARGET_RATE": 1e6, "TARGET_BURST": 10 ** 6}
+
+
+class ReplyTracker:
+    def __init__(self):
+        self.pending: dict[tuple[str, str], deque[float]] = {}
+        self.latencies: dict[str, list[float]] = {"last": [], "np": []}
+        self.sent: dict[str, int] = {"last": 0, "np": 0, "chat": 0}
+        self.replies = 0
+        self.unmatched = 0
+        self.last_reply_at = 0.0
+
+    def expect(self, kind: str, key: str, sent_at: float):
+        self.sent[kind] += 1
+
+        if kind in self.latencies:
+            self.pending.setdefault((kind, key), deque()).append(sent_at)
+
+    def outstanding(self) -> int:
+        return sum(len(queue) for queue in self.pending.values())
+
+    def on_privmsg(self, target: str, text: str):
+        now = time.perf_counter()
+        self.replies += 1
+        self.last_reply_at = now
+
+        if match := BEATCONNECT_LINK.search(text):
+            key = ("np", match.group(1))
+        else:
+            key = ("last", text.split(" |", 1)[0])
+
+        queue = self.pending.get(key)
+
+        if not queue:
+            self.unmatched += 1
+            return
+
+        self.latencies[key[0]].append(now - queue.popleft())
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {kind: float(weight) for kind, _, weight in (part.partition("=") for part in mix.split(","))}
+    unknown = set(weights) - {"last", "np", "chat"}
+
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown traffic kinds: {", ".join(sorted(unknown))}")
+
+    return weights
+
+
+def build_workload(world: FakeWorld, mix: dict[str, float], count: int, seed: int) -> list[tuple[str, str, str, str]]:
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    workload = []
+
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        username = rng.choice(world.usernames)
+
+        match kind:
+            case "last":
+                workload.append((kind, username, username, "!last"))
+            case "np":
+                beatmapset_id, text = world.np_action(rng)
+                workload.append((kind, beatmapset_id, username, text))
+            case _:
+                workload.append((kind, "", username, world.chatter(rng)))
+
+    return workload
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def spawn_bot(workdir: Path, irc: FakeIRCServer, api: FakeAPIServer, feed: FakeScoreFeed, args: argparse.Namespace) -> subprocess.Popen:
+    shutil.copytree(ROOT / "config", workdir / "config")
+
+    overrides = {
+        "src.config": {
+            "host": "127.0.0.1",
+            "port": irc.port,
+            "irc_ssl": False,
+            "channels": [CHANNEL],
+            "default_channel": CHANNEL,
+            "nickname": NICKNAME,
+            "password": "load-test",
+            "ripple_token": "load-test",
+            "delta_token": "load-test",
+            "ripple_base_url": api.base_url("ripple"),
+            "delta_base_url": api.base_url("delta"),
+            "peppy_base_url": api.base_url("peppy"),
+            "osu_files_url": api.base_url("osu"),
+            "osu_files_path": str(workdir / "instance" / "osu"),
+            "websocket_host": feed.url,
+            "db_path": str(workdir / "instance" / "storage.db"),
+            "metrics_enabled": False,
+            "traffic_record_path": str(args.record.resolve()) if args.record else None,
+            "websocket_score_filter": args.score_filter
+        }
+    }
+
+    if args.unthrottled:
+        overrides["src.send_queue"] = UNTHROTTLED
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")}
+    log = open(workdir / "bot.log", "w")
+
+    return subprocess.Popen([sys.executable, "-m", "benchmarks.bot_process", json.dumps(overrides)], cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def stop_bot(process: subprocess.Popen) -> int:
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+
+        try:
+            process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+async def drive(irc: FakeIRCServer, tracker: ReplyTracker, workload: list[tuple[str, str, str, str]], rate: float) -> float:
+    start = time.perf_counter()
+    index = 0
+
+    while index < len(workload):
+        due = len(workload) if rate <= 0 else min(len(workload), int((time.perf_counter() - start) * rate) + 1)
+        lines = []
+        now = time.perf_counter()
+
+        for kind, key, username, text in workload[index:due]:
+            tracker.expect(kind, key, now)
+            lines.append(irc.privmsg(username, CHANNEL, text))
+
+        index = due
+        irc.write(lines)
+        await irc.drain()
+
+        if rate > 0 and index < len(workload):
+            await asyncio.sleep(max(0.0, start + index / rate - time.perf_counter()))
+
+    return time.perf_counter() - start
+
+
+async def run(args: argparse.Namespace) -> dict:
+    world = FakeWorld(args.users, args.beatmaps, args.seed)
+    tracker = ReplyTracker()
+
+    api = FakeAPIServer(world, args.api_latency, args.api_jitter, args.seed, args.api_slow_rate, args.api_slow_latency, args.api_error_rate)
+    irc = FakeIRCServer(tracker.on_privmsg)
+    feed = FakeScoreFeed(world, args.score_rate, args.seed)
+
+    await api.start()
+    await irc.start()
+    await feed.start()
+
+    workload = build_workload(world, args.mix, int(args.duration * args.rate) if args.rate > 0 else args.lines, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="ripplechatbot-load-") as workdir:
+        process = spawn_bot(Path(workdir), irc, api, feed, args)
+        feed_task = None
+
+        try:
+            await asyncio.wait_for(asyncio.gather(irc.joined.wait(), feed.subscribed.wait() if not args.score_filter else asyncio.sleep(0)), STARTUP_TIMEOUT)
+            await asyncio.sleep(args.warmup)
+
+            feed_task = asyncio.create_task(feed.run())
+            warmup_calls = dict(api.calls)
+            started = time.perf_counter()
+
+            elapsed = await drive(irc, tracker, workload, args.rate)
+
+            deadline = time.perf_counter() + args.drain
+
+            while tracker.outstanding() and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+
+            total = time.perf_counter() - started
+            processed = max(elapsed, tracker.last_reply_at - started)
+        except TimeoutError:
+            print((Path(workdir) / "bot.log").read_text(), file=sys.stderr)
+            raise RuntimeError("The bot did not connect to the fake servers in time")
+        finally:
+            if feed_task is not None:
+                feed_task.cancel()
+
+            peak_rss = stop_bot(process)
+
+            await irc.close()
+            await feed.close()
+            await api.close()
+
+    return {
+        "revision": git_revision(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "record")},
+        "lines": len(workload),
+        "send_seconds": round(elapsed, 3),
+        "processed_seconds": round(processed, 3),
+        "messages_per_second": round(len(workload) / processed, 1),
+        "replies": tracker.replies,
+        "replies_per_second": round(tracker.replies / total, 1),
+        "unanswered": tracker.outstanding(),
+        "unmatched": tracker.unmatched,
+        "latency_ms": {
+            kind: {
+                "sent": tracker.sent[kind],
+                "answered": len(latencies),
+                "p50": round(percentile(latencies, 0.5) * 1000, 2),
+                "p99": round(percentile(latencies, 0.99) * 1000, 2),
+                "max": round(max(latencies, default=0.0) * 1000, 2)
+            }
+            for kind, latencies in tracker.latencies.items()
+        },
+        "upstream_calls": {path: count - warmup_calls.get(path, 0) for path, count in sorted(api.calls.items()) if count > warmup_calls.get(path, 0)},
+        "startup_upstream_calls": warmup_calls,
+        "scores_emitted": feed.emitted,
+        "scores_filtered": feed.filtered,
+        "peak_rss_mib": round(peak_rss / 1024 / 1024, 1)
+    }
+
+
+def report(result: dict, baseline: dict | None):
+    def compare(value: float, previous: float | None) -> str:
+        if previous is None or not previous:
+            return ""
+
+        return f" ({(value - previous) / previous * 100:+.1f}% vs {baseline["revision"]})"
+
+    def lookup(*keys):
+        node = baseline
+
+        for key in keys:
+            if not isinstance(node, dict) or key not in node:
+                return None
+
+            node = node[key]
+
+        return node
+
+    print(f"Revision: {result["revision"]}")
+    print(f"Lines: {result["lines"]} sent in {result["send_seconds"]}s, last reply after {result["processed_seconds"]}s")
+    print(f"Messages/sec: {result["messages_per_second"]:,}{compare(result["messages_per_second"], lookup("messages_per_second"))}")
+    print(f"Replies: {result["replies"]} ({result["replies_per_second"]}/sec), unanswered {result["unanswered"]}, unmatched {result["unmatched"]}")
+
+    for kind, latency in result["latency_ms"].items():
+        print(
+            f"{"!last" if kind == "last" else "/np"}: {latency["answered"]}/{latency["sent"]} answered, "
+            f"p50 {latency["p50"]}ms{compare(latency["p50"], lookup("latency_ms", kind, "p50"))}, "
+            f"p99 {latency["p99"]}ms{compare(latency["p99"], lookup("latency_ms", kind, "p99"))}, "
+            f"max {latency["max"]}ms"
+        )
+
+    print(f"Upstream calls: {", ".join(f"{path}={count}" for path, count in result["upstream_calls"].items()) or "none"}")
+    print(f"Scores emitted: {result["scores_emitted"]} ({result["scores_filtered"]} filtered by subscription)")
+    print(f"Peak RSS: {result["peak_rss_mib"]} MiB{compare(result["peak_rss_mib"], lookup("peak_rss_mib"))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive ChatBot.run against local fake IRC, websocket and API servers")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic at --rate")
+    parser.add_argument("--rate", type=float, default=50, help="Inbound chat lines per second (0 sends --lines as fast as possible)")
+    parser.add_argument("--lines", type=int, default=20000, help="Line count when --rate is 0")
+    parser.add_argument("--mix", type=parse_mix, default="last=0.1,np=0.1,chat=0.8", help="Traffic weights for last, np and chat")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--beatmaps", type=int, default=400)
+    parser.add_argument("--score-rate", type=float, default=20, help="new_score frames per second after the initial one-per-user burst")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Injected upstream API latency in seconds")
+    parser.add_argument("--api-jitter", type=float, default=0.02)
+    parser.add_argument("--api-slow-rate", type=float, default=0.0, help="Fraction of upstream requests that get --api-slow-latency added")
+    parser.add_argument("--api-slow-latency", type=float, default=2.0)
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="Fraction of upstream requests answered with HTTP 503")
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--drain", type=float, default=15, help="Seconds to wait for outstanding replies")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--unthrottled", action="store_true", help="Lift the IRC send rate limits to measure the bot itself")
+    parser.add_argument("--score-filter", action="store_true", help="Subscribe to the scores of active bot users only")
+    parser.add_argument("--record", type=Path, help="Record the bot's inbound IRC and websocket traffic for benchmarks.replay")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    report(result, baseline)
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from src.action_phrase import ActionPhrase
+from src.mods import MOD_NAMES
+from src.np_parser import parse_np
+
+CORPUS = Path(__file__).parent / "corpus" / "np_actions.jsonl"
+
+
+def parse_legacy(message: str):
+    action_checks = {action_phrase: action_phrase.value in message for action_phrase in ActionPhrase}
+    action = next((action_phrase for action_phrase in action_checks.keys() if action_checks[action_phrase]), None)
+
+    if action is None:
+        return None
+
+    link_pattern = re.compile(r"https://osu.(ripple.moe|ppy.sh)/beatmapsets/[0-9]+#/[0-9]+")
+    beatmapset_id_pattern = re.compile(r"(?<=/)\d+(?=#)")
+    beatmap_id_pattern = re.compile(r"(?<=#/)\d+(?=$)")
+    song_standalone_pattern = re.compile(r".+\s-\s.+(?=])")
+    song_with_difficulty_pattern = re.compile(r".+\s-\s.+(?=\s\[(.*)]])")
+    difficulty_pattern = re.compile(r"(?<=\[)(.*)(?=]])")
+    mods_pattern = re.compile("|".join([re.escape(mod) for mod in MOD_NAMES.keys()]))
+
+    link_match = link_pattern.search(message)
+
+    if not link_match:
+        return None
+
+    np_link = link_match.group()
+    beatmapset_id = int(beatmapset_id_pattern.search(np_link).group())
+    beatmap_id = int(beatmap_id_pattern.search(np_link).group())
+    mods = []
+
+    try:
+        match action:
+            case ActionPhrase.LISTENING:
+                song_standalone_pattern.search(message[link_match.end() + 1:]).group()
+            case _:
+                song_match = song_with_difficulty_pattern.search(message[link_match.end() + 1:])
+                difficulty_match = difficulty_pattern.search(message[link_match.end() + song_match.end() + 1:])
+                mods = [MOD_NAMES[mod] for mod in mods_pattern.findall(message[link_match.end() + song_match.end() + difficulty_match.end() + 3:])]
+    except AttributeError:
+        return None
+
+    return beatmapset_id, beatmap_id, mods
+
+
+def as_dict(now_playing) -> dict | None:
+    if now_playing is None:
+        return None
+
+    return {
+        "action": now_playing.action.name,
+        "beatmapset_id": now_playing.beatmapset_id,
+        "beatmap_id": now_playing.beatmap_id,
+        "artist": now_playing.artist,
+        "title": now_playing.title,
+        "difficulty": now_playing.difficulty,
+        "mods": now_playing.mods
+    }
+
+
+def check(cases: list[dict]) -> int:
+    failures = 0
+
+    for case in cases:
+        result = as_dict(parse_np(case["line"]))
+
+        if result != case["expected"]:
+            failures += 1
+            print(f"MISMATCH {case["line"]!r}\n  expected: {case["expected"]}\n  got:      {result}")
+
+    return failures
+
+
+def measure(parse, lines: list[str], rounds: int) -> float:
+    best = 0.0
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+
+        for line in lines:
+            parse(line)
+
+        best = max(best, len(lines) / (time.perf_counter() - start))
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the /np action parser")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as corpus:
+        cases = [json.loads(line) for line in corpus if line.strip()]
+
+    failures = check(cases)
+    print(f"Correctness: {len(cases) - failures}/{len(cases)} lines parsed as expected")
+
+    lines = [case["line"] for case in cases] * args.repeat
+    legacy = measure(parse_legacy, lines, args.rounds)
+    current = measure(parse_np, lines, args.rounds)
+
+    print(f"Legacy per-message regex compilation: {legacy:,.0f} lines/sec")
+    print(f"parse_np: {current:,.0f} lines/sec")
+    print(f"Speedup: {current / legacy:.2f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
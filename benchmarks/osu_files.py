@@ -0,0 +1,76 @@
+import math
+import random
+
+PLAYFIELD = (512, 384)
+PATTERNS = ("stream", "jumps", "sliders", "sliders", "circles")
+BREAK_CHANCE = 0.03
+SPINNER_CHANCE = 0.02
+
+
+def synthesize_osu(rng: random.Random, objects: int) -> bytes:
+    bpm = rng.choice((150, 170, 180, 200, 222, 240))
+    beat = 60000 / bpm
+    slider_multiplier = rng.choice((1.4, 1.6, 1.8, 2.0))
+    cs, od, ar = rng.choice((3, 3.5, 4, 4.2, 5)), rng.randint(6, 10), rng.randint(8, 10)
+
+    time = 1000.0
+    x, y = PLAYFIELD[0] / 2, PLAYFIELD[1] / 2
+    hit_objects = []
+
+    while len(hit_objects) < objects:
+        if rng.random() < SPINNER_CHANCE:
+            hit_objects.append(f"256,192,{time:.0f},12,0,{time + beat * 4:.0f},0:0:0:0:")
+            time += beat * 6
+            continue
+
+        if rng.random() < BREAK_CHANCE:
+            time += beat * rng.randint(16, 48)
+
+        pattern = rng.choice(PATTERNS)
+        angle = rng.uniform(0, 2 * math.pi)
+
+        for _ in range(rng.randint(4, 16)):
+            match pattern:
+                case "stream":
+                    spacing, gap = rng.uniform(20, 60), beat / 4
+                case "jumps":
+                    spacing, gap = rng.uniform(150, 300), beat / 2
+                case _:
+                    spacing, gap = rng.uniform(60, 140), beat
+
+            angle += rng.uniform(-2.5, 2.5) if pattern == "jumps" else rng.uniform(-0.5, 0.5)
+            x = min(max(x + spacing * math.cos(angle), 0), PLAYFIELD[0])
+            y = min(max(y + spacing * math.sin(angle), 0), PLAYFIELD[1])
+
+            if pattern == "sliders":
+                repeats, length = rng.choice((1, 1, 1, 2)), rng.choice((70, 100, 140, 210))
+                end_x, end_y = min(max(x + length * math.cos(angle), 0), PLAYFIELD[0]), min(max(y + length * math.sin(angle), 0), PLAYFIELD[1])
+                hit_objects.append(f"{x:.0f},{y:.0f},{time:.0f},2,0,L|{end_x:.0f}:{end_y:.0f},{repeats},{length},0|0,0:0|0:0,0:0:0:0:")
+                time += length * repeats / (slider_multiplier * 100) * beat + gap
+            else:
+                hit_objects.append(f"{x:.0f},{y:.0f},{time:.0f},1,0,0:0:0:0:")
+                time += gap
+
+    lines = [
+        "osu file format v14",
+        "",
+        "[General]",
+        "Mode: 0",
+        "",
+        "[Difficulty]",
+        "HPDrainRate:6",
+        f"CircleSize:{cs}",
+        f"OverallDifficulty:{od}",
+        f"ApproachRate:{ar}",
+        f"SliderMultiplier:{slider_multiplier}",
+        "SliderTickRate:1",
+        "",
+        "[TimingPoints]",
+        f"0,{beat},4,2,0,60,1,0",
+        "",
+        "[HitObjects]",
+        *hit_objects[:objects],
+        ""
+    ]
+
+    return "\n".join(lines).encode()
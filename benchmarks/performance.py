@@ -0,0 +1,104 @@
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.osu_files import synthesize_osu
+from src.osu_parser import parse_osu
+from src.osu_file_directory import OsuFileDirectory
+from src.performance_calculator import PerformanceCalculator
+from src.score import Score
+
+MOD_CHOICES = (0, 0, 0, 8, 16, 24, 64, 72, 2, 1)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def write_beatmaps(path: Path, beatmaps: int, min_objects: int, max_objects: int, seed: int) -> list[int]:
+    rng = random.Random(seed)
+
+    for beatmap_id in range(1, beatmaps + 1):
+        (path / f"{beatmap_id}.osu").write_bytes(synthesize_osu(rng, rng.randint(min_objects, max_objects)))
+
+    return list(range(1, beatmaps + 1))
+
+
+def synthesize_scores(rng: random.Random, beatmap_ids: list[int], scores: int) -> list[tuple[int, Score]]:
+    synthetic = []
+
+    for _ in range(scores):
+        beatmap_id = rng.choice(beatmap_ids)
+        misses, n100, n50 = rng.choice((0, 0, 1, 3, 8)), rng.randint(0, 40), rng.randint(0, 5)
+        synthetic.append((beatmap_id, Score(
+            user={"id": 1, "username": "benchmark"}, score=0, accuracy=0.0, pp=0.0, rank="A", mods=rng.choice(MOD_CHOICES),
+            max_combo=rng.randint(50, 800), count_300=rng.randint(100, 1500), count_100=n100, count_50=n50, count_geki=0,
+            count_katu=0, count_miss=misses, time="", play_mode=0, completed=3, beatmap_md5=None
+        )))
+
+    return synthetic
+
+
+async def timed(calculator: PerformanceCalculator, scores: list[tuple[int, Score]]) -> list[float]:
+    latencies = []
+
+    for beatmap_id, score in scores:
+        start = time.perf_counter()
+        await calculator.performance(score, beatmap_id)
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+async def run(path: Path, beatmap_ids: list[int], args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    files = [(path / f"{beatmap_id}.osu").read_bytes() for beatmap_id in beatmap_ids]
+
+    start = time.perf_counter()
+    parsed = [parse_osu(data) for data in files]
+    parse_seconds = time.perf_counter() - start
+    objects = sum(beatmap.objects for beatmap in parsed)
+
+    calculator = PerformanceCalculator(OsuFileDirectory(str(path)), len(beatmap_ids), len(beatmap_ids) * len(MOD_CHOICES))
+    scores = synthesize_scores(rng, beatmap_ids, args.scores)
+
+    cold = await timed(calculator, [(beatmap_id, scores[index % len(scores)][1]) for index, beatmap_id in enumerate(beatmap_ids)])
+    mixed = await timed(calculator, scores)
+    warm = await timed(calculator, scores)
+    stats = calculator.stats()
+    calculator.close()
+
+    print(f"Parse: {len(files)} beatmaps, {objects:,} objects, {sum(map(len, files)) / 1024 ** 2:.1f}MiB in {parse_seconds:.2f}s ({objects / parse_seconds:,.0f} objects/sec)")
+    print(f"Parsed beatmaps in memory: {stats["parsed_bytes"] / 1024 ** 2:.2f}MiB ({stats["parsed_bytes"] / objects:.0f} bytes/object)")
+    print(f"Cold (read + parse + stars + pp): p50 {percentile(cold, 0.5) * 1000:.2f}ms, p99 {percentile(cold, 0.99) * 1000:.2f}ms")
+    print(f"Mixed mods ({stats["attribute_misses"] - len(beatmap_ids)} new map/mod attributes): p50 {percentile(mixed, 0.5) * 1000:.2f}ms, p99 {percentile(mixed, 0.99) * 1000:.2f}ms")
+    print(f"Warm (cached attributes, pp only): p50 {percentile(warm, 0.5) * 1000:.3f}ms, p99 {percentile(warm, 0.99) * 1000:.3f}ms")
+    print(f"Time spent: parse {stats["parse_seconds"]:.2f}s, stars {stats["difficulty_seconds"]:.2f}s over {stats["attribute_misses"]} calculations")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local star/pp calculation cold (file read + parse + difficulty) and warm (cached attributes)")
+    parser.add_argument("--beatmaps", type=int, default=200)
+    parser.add_argument("--min-objects", type=int, default=200)
+    parser.add_argument("--max-objects", type=int, default=2500)
+    parser.add_argument("--scores", type=int, default=5000)
+    parser.add_argument("--path", type=Path, help="Directory of <beatmap_id>.osu files to use instead of synthetic beatmaps")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.path is not None:
+        beatmap_ids = sorted(int(file.stem) for file in args.path.glob("*.osu") if file.stem.isdigit())[:args.beatmaps]
+        asyncio.run(run(args.path, beatmap_ids, args))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        beatmap_ids = write_beatmaps(Path(directory), args.beatmaps, args.min_objects, args.max_objects, args.seed)
+        asyncio.run(run(Path(directory), beatmap_ids, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import time
+import argparse
+
+import numpy as np
+
+from src.play_mode import PlayMode
+from src.recommender import BeatmapRecommender
+
+MOD_FACTORS = {0: 1.0, 8: 1.06, 16: 1.2, 64: 1.45, 72: 1.5}
+MOD_WEIGHTS = (0.55, 0.2, 0.08, 0.12, 0.05)
+
+
+def synthesize(scores: int, users: int, beatmaps: int, seed: int) -> tuple[list[tuple], np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+
+    skill = np.exp(rng.normal(5.0, 0.6, users)).astype(np.float32)
+    difficulty = np.sort(np.exp(rng.normal(4.6, 0.8, beatmaps))).astype(np.float32)
+    md5s = [f"{index:032x}" for index in range(beatmaps)]
+
+    players = (rng.pareto(1.2, scores) * users / 30).astype(np.int64) % users
+    mods = rng.choice(list(MOD_FACTORS), scores, p=MOD_WEIGHTS)
+    factors = np.vectorize(MOD_FACTORS.get)(mods)
+    wanted = skill[players] * rng.uniform(0.45, 1.1, scores) / factors
+    maps = np.clip(np.searchsorted(difficulty, wanted) + rng.integers(-20, 21, scores), 0, beatmaps - 1)
+    pp = difficulty[maps] * factors * rng.uniform(0.8, 1.0, scores)
+    completed = rng.choice((1, 2, 3, 3, 3), scores)
+
+    rows = [
+        (int(player) + 1, md5s[beatmap], PlayMode.STANDARD.value, int(mod), float(value), int(state))
+        for player, beatmap, mod, value, state in zip(players, maps, mods, pp, completed)
+    ]
+
+    return rows, skill, difficulty
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def churn(rows: list[tuple], max_entries: int) -> dict[str, float]:
+    recommender = BeatmapRecommender(max_entries, 50)
+    peak = {"users": 0, "beatmaps": 0, "columns": 0}
+
+    queried = {rows[index][0] for index in range(0, len(rows), max(1, len(rows) // 50))}
+
+    for row in rows:
+        if recommender.size >= max_entries:
+            for user_id in queried:
+                for md5, mods, _, _ in recommender.recommend(user_id, PlayMode.STANDARD):
+                    recommender.mark_recommended(user_id, md5, PlayMode.STANDARD, mods)
+
+            stats = recommender.stats()
+            peak = {name: max(value, stats[name]) for name, value in peak.items()}
+
+        recommender.add_play(*row)
+
+    recommender.compact()
+    stats = recommender.stats()
+    size, base = recommender.size, recommender.base
+    live_columns = np.unique(recommender.cols[:size])
+
+    assert stats["users"] == len(recommender.user_entries) == len(recommender.played) == len(recommender.top) == len(np.unique(recommender.rows[:size]))
+    assert stats["columns"] == len(recommender.columns) <= 2 * len(live_columns)
+    assert stats["beatmaps"] == len(recommender.beatmaps) <= 2 * len(np.unique(recommender.column_beatmap[live_columns]))
+    assert all(recommender.rows[position - base] == row and recommender.cols[position - base] == column for row, entries in enumerate(recommender.user_entries) for column, position in entries.items())
+    assert all(column < stats["columns"] for columns in recommender.recommended.values() for column in columns)
+    assert all(value <= 2 * max_entries for value in peak.values()), peak
+
+    return {**stats, **{f"peak_{name}": value for name, value in peak.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recommendation index build rate and !r latency against a synthetic score stream")
+    parser.add_argument("--scores", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--beatmaps", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000, help="Recommendations requested, by players sampled by activity")
+    parser.add_argument("--max-entries", type=int, default=500000)
+    parser.add_argument("--churn-entries", type=int, default=50000, help="Index size for the compaction check, which replays the stream through a small index and asserts players/maps/columns stay bounded")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rows, skill, difficulty = synthesize(args.scores, args.users, args.beatmaps, args.seed)
+    recommender = BeatmapRecommender(args.max_entries, 50)
+
+    start = time.perf_counter()
+
+    for row in rows:
+        recommender.add_play(*row)
+
+    build_seconds = time.perf_counter() - start
+    stats = recommender.stats()
+
+    rng = np.random.default_rng(args.seed)
+    queried = [rows[index][0] for index in rng.integers(0, len(rows), args.queries)]
+    latencies = []
+    ratios = []
+    replayed = 0
+
+    for user_id in queried:
+        start = time.perf_counter()
+        recommendations = recommender.recommend(user_id, PlayMode.STANDARD)
+        latencies.append(time.perf_counter() - start)
+
+        for md5, mods, _, _ in recommendations:
+            replayed += recommender.beatmaps[md5] in recommender.played[recommender.users[user_id]]
+            ratios.append(difficulty[int(md5, 16)] * MOD_FACTORS.get(mods, 1.0) / skill[user_id - 1])
+            recommender.mark_recommended(user_id, md5, PlayMode.STANDARD, mods)
+
+    stats = recommender.stats()
+
+    print(f"Index: {stats["entries"]:,} entries from {stats["users"]:,} players on {stats["columns"]:,} map/mod combinations, built at {len(rows) / build_seconds:,.0f} scores/sec")
+    print(f"!r: p50 {percentile(latencies, 0.5) * 1000:.2f}ms, p99 {percentile(latencies, 0.99) * 1000:.2f}ms, {args.queries - stats["empty_recommendations"]}/{args.queries} answered")
+    print(f"Relevance: recommended map pp / player skill p10/p50/p90 {percentile(ratios, 0.1):.2f}/{percentile(ratios, 0.5):.2f}/{percentile(ratios, 0.9):.2f}, {replayed} already played")
+
+    churned = churn(rows, args.churn_entries)
+
+    print(f"Compaction: {churned["compactions"]} compactions at {args.churn_entries:,} entries, peak {churned["peak_users"]:,} players / {churned["peak_beatmaps"]:,} maps / {churned["peak_columns"]:,} combinations, {churned["users"]:,} / {churned["beatmaps"]:,} / {churned["columns"]:,} after the last")
+
+
+if __name__ == "__main__":
+    main()
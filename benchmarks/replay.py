@@ -0,0 +1,271 @@
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from collections import Counter
+
+from benchmarks.bot_process import apply_overrides
+from benchmarks.fake_servers import FakeWorld, FakeAPIServer
+from benchmarks.load_test import UNTHROTTLED
+from src.logger import ROOT_LOGGER
+from src.traffic_recorder import TrafficRecorder, IRC_STREAM, WEBSOCKET_STREAM
+
+FEED_CHUNK = 256
+IDLE_POLL = 0.01
+OUTBOUND_COMMANDS = ("PRIVMSG", "NOTICE")
+
+
+class CaptureWriter:
+    def __init__(self, started: float):
+        self.started = started
+        self.lines: list[tuple[float, str]] = []
+
+    def write(self, data: bytes):
+        now = time.perf_counter() - self.started
+        self.lines.extend((now, line) for line in data.decode().split("\r\n") if line)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+    def is_closing(self) -> bool:
+        return False
+
+    async def wait_closed(self):
+        pass
+
+
+class ReplaySource:
+    def __init__(self, records: list[tuple[float, str, str]], speed: float):
+        self.records = records
+        self.speed = speed
+        self.position = 0
+        self.turn = asyncio.Condition()
+        self.started: float | None = None
+
+    def finished(self) -> bool:
+        return self.position >= len(self.records)
+
+    async def next(self, stream: str) -> str | None:
+        async with self.turn:
+            await self.turn.wait_for(lambda: self.finished() or self.records[self.position][1] == stream)
+
+            if self.finished():
+                return None
+
+            timestamp, _, payload = self.records[self.position]
+
+            if self.started is None:
+                self.started = time.perf_counter()
+
+            if self.speed > 0:
+                delay = self.started + (timestamp - self.records[0][0]) / self.speed - time.perf_counter()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif self.position % FEED_CHUNK == 0:
+                await asyncio.sleep(0)
+
+            self.position += 1
+            self.turn.notify_all()
+
+            return payload
+
+
+class ReplayReader:
+    def __init__(self, source: ReplaySource):
+        self.source = source
+
+    async def readline(self) -> bytes:
+        line = await self.source.next(IRC_STREAM)
+        return f"{line}\r\n".encode() if line is not None else b""
+
+
+class ReplayWebsocket:
+    def __init__(self, source: ReplaySource):
+        self.source = source
+        self.sent: list[str] = []
+
+    async def recv(self) -> str:
+        frame = await self.source.next(WEBSOCKET_STREAM)
+
+        if frame is None:
+            raise EOFError("End of recording")
+
+        return frame
+
+    async def send(self, message: str):
+        self.sent.append(message)
+
+    async def close(self):
+        pass
+
+
+def load_recording(path: Path) -> list[tuple[float, str, str]]:
+    return [record for record in TrafficRecorder.read(str(path)) if record[1] in (IRC_STREAM, WEBSOCKET_STREAM)]
+
+
+def detect_nickname(records: list[tuple[float, str, str]]) -> str | None:
+    for _, stream, payload in records:
+        parts = payload.split(" ", 3)
+
+        if stream == IRC_STREAM and len(parts) > 2 and parts[1] == "001":
+            return parts[2]
+
+    return None
+
+
+def is_idle(bot) -> bool:
+    dispatcher = bot.dispatcher.stats()
+    return not dispatcher["queued"] and not dispatcher["in_flight"] and not bot.irc.queue.heap and not bot.background_tasks
+
+
+async def replay(args: argparse.Namespace, records: list[tuple[float, str, str]], workdir: Path) -> tuple[dict, list[str]]:
+    api = FakeAPIServer(FakeWorld(0, 0, args.seed, synthesize=True), args.api_latency, args.api_jitter, args.seed)
+    await api.start()
+
+    overrides = {
+        "src.config": {
+            "nickname": args.nickname or detect_nickname(records) or "bot",
+            "password": "replay",
+            "ripple_base_url": api.base_url("ripple"),
+            "delta_base_url": api.base_url("delta"),
+            "peppy_base_url": api.base_url("peppy"),
+            "osu_files_url": api.base_url("osu"),
+            "osu_files_path": str(workdir / "osu"),
+            "db_path": str(workdir / "storage.db"),
+            "score_archive_path": str(workdir / "archive"),
+            "metrics_enabled": False,
+            "traffic_record_path": None
+        }
+    }
+
+    if args.unthrottled:
+        overrides["src.send_queue"] = UNTHROTTLED
+
+    apply_overrides(overrides)
+
+    from src.chatbot import ChatBot
+    from src.metrics import METRICS
+
+    bot = ChatBot()
+    started = time.perf_counter()
+
+    source = ReplaySource(records, args.speed)
+    writer = CaptureWriter(started)
+
+    bot.irc.reader = ReplayReader(source)
+    bot.irc.writer = writer
+    bot.irc.connected.set()
+    bot.irc.registered.set()
+    bot.irc.ready.set()
+    bot.ws.websocket = ReplayWebsocket(source)
+
+    services = await bot.start_services()
+    streams = [asyncio.create_task(bot.handle_irc()), asyncio.create_task(bot.ws.handle_server())]
+
+    await asyncio.gather(*streams, return_exceptions=True)
+
+    deadline = time.perf_counter() + args.drain
+
+    while not is_idle(bot) and time.perf_counter() < deadline:
+        await asyncio.sleep(IDLE_POLL)
+
+    elapsed = time.perf_counter() - started
+
+    for task in services:
+        task.cancel()
+
+    await asyncio.gather(*services, return_exceptions=True)
+    await bot.close()
+    await api.close()
+
+    irc_records = sum(1 for _, stream, _ in records if stream == IRC_STREAM)
+    span = records[-1][0] - records[0][0] if records else 0.0
+    outbound = [line for _, line in writer.lines if line.split(" ", 1)[0] in OUTBOUND_COMMANDS]
+
+    commands = {}
+
+    for (name, labels), histogram in METRICS.histograms.items():
+        if name == "command_seconds" and histogram.count:
+            commands[dict(labels)["command"]] = {
+                "count": histogram.count,
+                "p50_ms": round(histogram.quantile(0.5) * 1000, 2),
+                "p99_ms": round(histogram.quantile(0.99) * 1000, 2)
+            }
+
+    result = {
+        "irc_lines": irc_records,
+        "websocket_frames": len(records) - irc_records,
+        "recording_seconds": round(span, 3),
+        "replay_seconds": round(elapsed, 3),
+        "effective_speed": round(span / elapsed, 2) if elapsed else 0.0,
+        "irc_lines_per_second": round(irc_records / elapsed, 1) if elapsed else 0.0,
+        "outbound": len(outbound),
+        "dropped": bot.dispatcher.dropped + bot.irc.queue.dropped,
+        "commands": commands,
+        "upstream_calls": dict(sorted(api.calls.items()))
+    }
+
+    return result, outbound
+
+
+def diff(outbound: list[str], baseline: list[str], limit: int):
+    current, previous = Counter(outbound), Counter(baseline)
+    missing = previous - current
+    extra = current - previous
+
+    print(f"Diff: {sum(missing.values())} missing, {sum(extra.values())} extra")
+
+    for line, count in list(missing.items())[:limit]:
+        print(f"- {line}" + (f" (x{count})" if count > 1 else ""))
+
+    for line, count in list(extra.items())[:limit]:
+        print(f"+ {line}" + (f" (x{count})" if count > 1 else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded IRC/websocket stream through the bot and capture its outbound messages")
+    parser.add_argument("recording", type=Path, help="Recording written with TRAFFIC_RECORD or benchmarks.load_test --record")
+    parser.add_argument("--speed", type=float, default=1, help="Replay speed multiplier (0 replays as fast as possible)")
+    parser.add_argument("--nickname", help="Bot nickname (defaults to the one in the recorded 001 welcome)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Injected latency for the stubbed upstream APIs")
+    parser.add_argument("--api-jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--drain", type=float, default=30, help="Seconds to wait for in-flight work after the recording ends")
+    parser.add_argument("--unthrottled", action="store_true", help="Lift the IRC send rate limits")
+    parser.add_argument("--output", type=Path, help="Write the captured outbound PRIVMSG/NOTICE lines")
+    parser.add_argument("--diff", type=Path, help="Outbound capture from an earlier replay to compare against")
+    parser.add_argument("--diff-limit", type=int, default=20)
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the bot while replaying")
+    args = parser.parse_args()
+
+    logging.getLogger(ROOT_LOGGER).setLevel(args.log_level.upper())
+
+    records = load_recording(args.recording)
+
+    with tempfile.TemporaryDirectory(prefix="ripplechatbot-replay-") as workdir:
+        result, outbound = asyncio.run(replay(args, records, Path(workdir)))
+
+    print(f"Recording: {args.recording} ({result["irc_lines"]} IRC lines, {result["websocket_frames"]} websocket frames over {result["recording_seconds"]}s)")
+    print(f"Replayed in {result["replay_seconds"]}s ({result["effective_speed"]}x, {result["irc_lines_per_second"]:,} IRC lines/sec)")
+    print(f"Outbound: {result["outbound"]} messages, dropped {result["dropped"]}")
+
+    for command, latency in sorted(result["commands"].items()):
+        print(f"!{command}: {latency["count"]} handled, p50 {latency["p50_ms"]}ms, p99 {latency["p99_ms"]}ms")
+
+    print(f"Upstream calls: {", ".join(f"{path}={count}" for path, count in result["upstream_calls"].items()) or "none"}")
+
+    if args.output:
+        args.output.write_text("".join(f"{line}\n" for line in outbound))
+
+    if args.diff:
+        diff(outbound, args.diff.read_text().splitlines(), args.diff_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import time
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.score_archive import ScoreArchive, ROW, MOD_BITS, PERCENTILES, TREND_WINDOW
+
+CHUNK_ROWS = 1000000
+MODE_WEIGHTS = (0.85, 0.05, 0.04, 0.06)
+MOD_CHOICES = (0, 0, 0, 8, 16, 24, 64, 72, 2, 1)
+START_TIME = 1600000000
+
+
+def synthesize(rows: int, users: int, beatmaps: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    synthetic = np.empty(rows, ROW)
+
+    synthetic["user_id"] = (rng.pareto(1.1, rows) * users / 20).astype(np.int64) % users + 1
+    synthetic["pp"] = rng.gamma(2, 60, rows)
+    synthetic["accuracy"] = np.clip(100 - rng.gamma(1.5, 2, rows), 40, 100)
+    synthetic["mods"] = rng.choice(MOD_CHOICES, rows)
+    synthetic["play_mode"] = rng.choice(len(MODE_WEIGHTS), rows, p=MODE_WEIGHTS)
+    synthetic["played_at"] = START_TIME + np.sort(rng.integers(0, 60 * 60 * 24 * 365 * 3, rows))
+    synthetic["beatmap"] = rng.integers(0, beatmaps, rows)
+
+    return synthetic
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def build_sqlite(path: Path, rows: np.ndarray) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute(f"CREATE TABLE scores ({", ".join(ROW.names)})")
+
+    for start in range(0, len(rows), CHUNK_ROWS):
+        with connection:
+            connection.executemany(f"INSERT INTO scores VALUES ({", ".join("?" for _ in ROW.names)})", rows[start:start + CHUNK_ROWS].tolist())
+
+    connection.execute("CREATE INDEX scores_user_id ON scores (user_id)")
+    return connection
+
+
+def sqlite_aggregate(connection: sqlite3.Connection, user_id: int) -> dict | None:
+    rows = connection.execute("SELECT pp, accuracy, mods, play_mode, played_at, beatmap FROM scores WHERE user_id = ? ORDER BY played_at", (user_id,)).fetchall()
+
+    if not rows:
+        return None
+
+    ranked = sorted(row[0] for row in rows if row[0] > 0)
+    accuracy = [row[1] for row in rows]
+    modes = [0] * len(MODE_WEIGHTS)
+    mods = [0] * len(MOD_BITS)
+
+    for row in rows:
+        modes[row[3]] += 1
+
+        for index, bit in enumerate(MOD_BITS.tolist()):
+            mods[index] += row[2] >> bit & 1
+
+    return {
+        "plays": len(rows),
+        "beatmaps": len({row[5] for row in rows}),
+        "modes": modes,
+        "pp_percentiles": {q: ranked[min(len(ranked) - 1, len(ranked) * q // 100)] for q in PERCENTILES} if ranked else {},
+        "accuracy": sum(accuracy) / len(accuracy),
+        "recent_accuracy": sum(accuracy[-TREND_WINDOW:]) / len(accuracy[-TREND_WINDOW:]),
+        "mods": mods
+    }
+
+
+def time_queries(aggregate, user_ids: np.ndarray) -> tuple[float, float]:
+    latencies = []
+
+    for user_id in user_ids.tolist():
+        start = time.perf_counter()
+        aggregate(user_id)
+        latencies.append(time.perf_counter() - start)
+
+    return percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+
+
+async def measure(workdir: Path, rows: int, args: argparse.Namespace) -> dict:
+    synthetic = synthesize(rows, args.users, args.beatmaps, args.seed)
+    tail = synthesize(args.tail, args.users, args.beatmaps, args.seed + 1)
+    tail["played_at"] += synthetic["played_at"].max()
+
+    archive = ScoreArchive(str(workdir / "archive"), rows + args.tail + 1, 60)
+
+    start = time.perf_counter()
+    archive.extend(synthetic)
+    await archive.compact()
+    build_seconds = time.perf_counter() - start
+
+    archive.extend(tail)
+    archive.flush()
+    archive.close()
+
+    start = time.perf_counter()
+    archive = ScoreArchive(str(workdir / "archive"), rows + args.tail + 1, 60)
+    reopen_ms = (time.perf_counter() - start) * 1000
+
+    queried = np.random.default_rng(args.seed).choice(synthetic["user_id"], args.queries)
+    plays = np.mean([len(archive.user_columns(user_id)["user_id"]) for user_id in queried[:100].tolist()])
+    archive_p50, archive_p99 = time_queries(archive.aggregate, queried)
+
+    result = {
+        "build_seconds": build_seconds,
+        "disk_mib": sum(file.stat().st_size for file in (workdir / "archive").rglob("*") if file.is_file()) / 1024 / 1024,
+        "reopen_ms": reopen_ms,
+        "mean_plays": plays,
+        "archive_p50_ms": archive_p50,
+        "archive_p99_ms": archive_p99
+    }
+
+    archive.close()
+
+    if rows <= args.sql_max_rows:
+        connection = build_sqlite(workdir / "scores.db", np.concatenate((synthetic, tail)))
+        result["sqlite_p50_ms"], result["sqlite_p99_ms"] = time_queries(lambda user_id: sqlite_aggregate(connection, user_id), queried)
+        connection.close()
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark !stats aggregate latency over the memory-mapped score archive")
+    parser.add_argument("--rows", default="1000000,10000000", help="Comma-separated archive sizes")
+    parser.add_argument("--tail", type=int, default=100000, help="Scores left in the append log after compaction")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--beatmaps", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=1000, help="Players queried, sampled by activity")
+    parser.add_argument("--sql-max-rows", type=int, default=1000000, help="Largest size to also load into SQLite for comparison")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for rows in (int(size) for size in args.rows.split(",")):
+        with tempfile.TemporaryDirectory(prefix="ripplechatbot-archive-") as workdir:
+            result = asyncio.run(measure(Path(workdir), rows, args))
+
+        print(
+            f"{rows:,} rows (+{args.tail:,} in the log): built in {result["build_seconds"]:.1f}s, "
+            f"{result["disk_mib"]:.0f} MiB on disk, reopened in {result["reopen_ms"]:.1f}ms"
+        )
+        print(f"  Archive !stats: p50 {result["archive_p50_ms"]:.3f}ms, p99 {result["archive_p99_ms"]:.3f}ms (mean {result["mean_plays"]:,.0f} plays per queried player)")
+
+        if "sqlite_p50_ms" in result:
+            print(f"  SQLite rows + Python: p50 {result["sqlite_p50_ms"]:.3f}ms, p99 {result["sqlite_p99_ms"]:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.fake_servers import FakeWorld
+from src.database import DatabaseManager
+from src.score import Score
+from src.score_history import ScoreHistory
+
+LAG_PROBE_INTERVAL = 0.001
+FEED_CHUNK = 100
+
+
+def build_scores(world: FakeWorld, count: int, seed: int) -> list[Score]:
+    rng = random.Random(seed)
+    return [Score(**world.score(rng, rng.choice(world.usernames))) for _ in range(count)]
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def probe_lag(lags: list[float]):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - LAG_PROBE_INTERVAL)
+
+
+async def feed(history: ScoreHistory, scores: list[Score], rate: float):
+    start = time.perf_counter()
+
+    for index in range(0, len(scores), FEED_CHUNK):
+        for score in scores[index:index + FEED_CHUNK]:
+            history.add(score)
+
+        delay = start + (index + FEED_CHUNK) / rate - time.perf_counter() if rate > 0 else 0
+        await asyncio.sleep(max(delay, 0))
+
+
+async def insert_unbatched(db: DatabaseManager, scores: list[Score], rate: float):
+    start = time.perf_counter()
+
+    for index, score in enumerate(scores):
+        await db.insert_scores([ScoreHistory.to_row(score)])
+
+        if rate > 0:
+            await asyncio.sleep(max(start + index / rate - time.perf_counter(), 0))
+
+
+async def measure(path: Path, scores: list[Score], batch_size: int, rate: float, queries: int, world: FakeWorld, seed: int) -> dict:
+    db = DatabaseManager(str(path), 60, 4096)
+    history = ScoreHistory(db, batch_size, 1, len(scores), 60 * 60 * 24)
+    history.pruned_at = time.monotonic()
+
+    lags: list[float] = []
+    prober = asyncio.create_task(probe_lag(lags))
+    start = time.perf_counter()
+
+    if batch_size > 0:
+        writer = asyncio.create_task(history.run())
+        await feed(history, scores, rate)
+
+        while history.pending and not history.write_failures:
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+
+        written, commits = history.written, history.batches
+    else:
+        await insert_unbatched(db, scores, rate)
+        written, commits = len(scores), len(scores)
+
+    elapsed = time.perf_counter() - start
+    rng = random.Random(seed)
+    recent: list[float] = []
+    top: list[float] = []
+
+    for _ in range(queries):
+        user_id = world.user_ids[rng.choice(world.usernames)]
+
+        query_start = time.perf_counter()
+        await history.recent(user_id, 5)
+        recent.append(time.perf_counter() - query_start)
+
+        query_start = time.perf_counter()
+        await history.top(user_id, 0, 5)
+        top.append(time.perf_counter() - query_start)
+
+    prober.cancel()
+    await asyncio.gather(prober, return_exceptions=True)
+    await db.close()
+
+    return {
+        "scores_per_second": written / elapsed,
+        "commits": commits,
+        "loop_lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "recent_p50_ms": percentile(recent, 0.5) * 1000,
+        "recent_p99_ms": percentile(recent, 0.99) * 1000,
+        "top_p50_ms": percentile(top, 0.5) * 1000,
+        "top_p99_ms": percentile(top, 0.99) * 1000,
+        "database_mib": sum(file.stat().st_size for file in path.parent.iterdir()) / 1024 / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark score history insert throughput and !recent/!top query latency against a synthetic score stream")
+    parser.add_argument("--scores", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--beatmaps", type=int, default=5000)
+    parser.add_argument("--batch-sizes", default="0,50,500,5000", help="Comma-separated batch sizes to compare (0 commits every score on its own)")
+    parser.add_argument("--rate", type=float, default=0, help="Scores/sec offered to the writer (0 feeds as fast as possible)")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    world = FakeWorld(args.users, args.beatmaps, args.seed)
+    scores = build_scores(world, args.scores, args.seed)
+
+    print(f"Scores: {len(scores)} from {args.users} players on {args.beatmaps} beatmaps{f", offered at {args.rate:,.0f}/s" if args.rate > 0 else ""}")
+
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        with tempfile.TemporaryDirectory(prefix="ripplechatbot-history-") as workdir:
+            result = asyncio.run(measure(Path(workdir) / "storage.db", scores, batch_size, args.rate, args.queries, world, args.seed))
+
+        print(
+            f"{f"Batch {batch_size}" if batch_size > 0 else "Unbatched"}: {result["scores_per_second"]:,.0f} scores/sec in {result["commits"]} commits, "
+            f"loop lag p99 {result["loop_lag_p99_ms"]:.2f}ms, "
+            f"!recent p50/p99 {result["recent_p50_ms"]:.2f}/{result["recent_p99_ms"]:.2f}ms, "
+            f"!top p50/p99 {result["top_p50_ms"]:.2f}/{result["top_p99_ms"]:.2f}ms, "
+            f"{result["database_mib"]:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import time
+import random
+import argparse
+
+from benchmarks.fake_servers import FakeWorld
+from src.score import Score
+from src.score_store import ScoreStore
+from src.score_subscription import ScoreSubscription
+from src.websocket import RippleWebsocketClient
+from src.ws_message import WebsocketMessage
+
+
+def build_frames(world: FakeWorld, count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [json.dumps({"type": "new_score", "data": world.score(rng, rng.choice(world.usernames))}) for _ in range(count)]
+
+
+def ingest_all(client: RippleWebsocketClient, frames: list[str]) -> int:
+    decoded = 0
+
+    for frame in frames:
+        Score(**WebsocketMessage.deserialize(frame).kwargs["data"])
+        decoded += 1
+
+    return decoded
+
+
+def ingest_filtered(client: RippleWebsocketClient, frames: list[str]) -> int:
+    decoded = 0
+
+    for frame in frames:
+        if client.should_drop(frame):
+            continue
+
+        Score(**WebsocketMessage.deserialize(frame).kwargs["data"])
+        decoded += 1
+
+    return decoded
+
+
+def measure(ingest, client: RippleWebsocketClient, frames: list[str], rounds: int) -> tuple[float, int]:
+    best = 0.0
+    decoded = 0
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        decoded = ingest(client, frames)
+        best = max(best, len(frames) / (time.perf_counter() - start))
+
+    return best, decoded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark websocket score ingest with and without the active-user pre-filter")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=20000, help="Distinct players on the server")
+    parser.add_argument("--active", type=int, default=200, help="Players that use the bot")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    world = FakeWorld(args.users, 1000, args.seed)
+    frames = build_frames(world, args.frames, args.seed)
+
+    subscription = ScoreSubscription(ttl=60 * 60, max_size=args.active)
+
+    for username in random.Random(args.seed).sample(world.usernames, args.active):
+        subscription.touch(world.user_ids[username])
+
+    client = RippleWebsocketClient("ws://127.0.0.1", "", ScoreStore(args.users, 10, 60 * 60), subscription=subscription)
+
+    full, full_decoded = measure(ingest_all, client, frames, args.rounds)
+    filtered, filtered_decoded = measure(ingest_filtered, client, frames, args.rounds)
+
+    print(f"Frames: {len(frames)} from {args.users} players, {args.active} active bot users")
+    print(f"Full decode: {full:,.0f} frames/sec ({full_decoded} decoded)")
+    print(f"Pre-filtered: {filtered:,.0f} frames/sec ({filtered_decoded} decoded, {len(frames) - filtered_decoded} dropped before decode)")
+    print(f"Speedup: {filtered / full:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
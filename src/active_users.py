@@ -0,0 +1,27 @@
+import time
+from collections import OrderedDict
+
+from .user_resolver import UserResolver
+
+
+class ActiveUserTracker:
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.users: OrderedDict[str, float] = OrderedDict()
+
+    def touch(self, username: str):
+        key = UserResolver.normalize(username)
+
+        self.users[key] = time.time()
+        self.users.move_to_end(key)
+
+        while len(self.users) > self.max_size:
+            self.users.popitem(last=False)
+
+    def __contains__(self, username: str) -> bool:
+        seen_at = self.users.get(UserResolver.normalize(username))
+        return seen_at is not None and time.time() - seen_at < self.ttl
+
+    def __len__(self) -> int:
+        return len(self.users)
@@ -1,20 +1,197 @@
-import requests
+import time
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+import requests
+from requests.adapters import HTTPAdapter
+
+from .circuit_breaker import CircuitBreaker
+from .exceptions import APIException
+from .metrics import METRICS
+
+POOL_SIZE = 8
+DEFAULT_TIMEOUT = 10
+DEFAULT_CONCURRENCY = 4
+BREAKER_FAILURES = 5
+BREAKER_RESET = 30
+LATENCY_WINDOW = 256
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 0.5
+HEDGE_MIN_DELAY = 0.02
+HEDGE_BUDGET = 2
+
 
 class APIClientBase:
-    def __init__(self, base_url: str, headers: dict[str, str]):
+    def __init__(self, base_url: str, headers: dict[str, str], timeouts: dict[str, float] = None, concurrency: dict[str, int] = None, hedged: set[str] = None):
         self.base_url = base_url
         self.headers = headers
+        self.timeouts = timeouts or {}
+        self.concurrency = concurrency or {}
+        self.hedged = hedged or set()
+
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix=self.__class__.__name__)
+        self.semaphores: dict[str, asyncio.Semaphore] = {}
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.latencies: dict[str, deque[float]] = {}
+        self.hedges_in_flight: dict[str, int] = {}
+
+    @staticmethod
+    def get_endpoint_key(endpoint: str) -> str:
+        return "/" + endpoint.lstrip("/").split("/")[0]
+
+    def get_semaphore(self, key: str) -> asyncio.Semaphore:
+        if key not in self.semaphores:
+            self.semaphores[key] = asyncio.Semaphore(self.concurrency.get(key, DEFAULT_CONCURRENCY))
+
+        return self.semaphores[key]
+
+    def get_breaker(self, key: str) -> CircuitBreaker:
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
 
-    def get(self, endpoint: str, query: str = "") -> Any:
+        return self.breakers[key]
+
+    def get_latencies(self, key: str) -> deque[float]:
+        if key not in self.latencies:
+            self.latencies[key] = deque(maxlen=LATENCY_WINDOW)
+
+        return self.latencies[key]
+
+    def hedge_delay(self, key: str) -> float:
+        latencies = sorted(self.get_latencies(key))
+
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+
+        return max(HEDGE_MIN_DELAY, latencies[int(len(latencies) * HEDGE_PERCENTILE)])
+
+    async def request(self, method: str, endpoint: str, query: str = "", **kwargs) -> Any:
         url = self.base_url + endpoint + query
+        key = self.get_endpoint_key(endpoint)
+        breaker = self.get_breaker(key)
 
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        client = self.__class__.__name__
+
+        if not breaker.allow():
+            METRICS.counter("api_short_circuits_total", "Upstream API requests rejected by an open circuit", client=client, endpoint=key).inc()
+            raise APIException(f"{method} {url} skipped: circuit open for another {breaker.retry_in():.0f}s")
+
+        with METRICS.timer("api_request_seconds", "Upstream API request latency including concurrency wait", client=client, endpoint=key):
+            try:
+                if method == "GET" and key in self.hedged:
+                    result = await self.hedged_call(method, url, key, **kwargs)
+                else:
+                    result = await self.call(method, url, key, **kwargs)
+            except APIException:
+                breaker.record_failure()
+                METRICS.counter("api_errors_total", "Failed upstream API requests", client=client, endpoint=key).inc()
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+
+        breaker.record_success()
+        return result
+
+    async def call(self, method: str, url: str, key: str, **kwargs) -> Any:
+        async with self.get_semaphore(key):
+            return await self.send(method, url, key, **kwargs)
 
-    def post(self, endpoint: str, data: Any):
-        url = self.base_url + endpoint
+    async def send(self, method: str, url: str, key: str, **kwargs) -> Any:
+        timeout = self.timeouts.get(key, DEFAULT_TIMEOUT)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.session.request, method, url, timeout=timeout, **kwargs)
+        start = time.monotonic()
 
-        response = requests.post(url, json=data, headers=self.headers)
+        try:
+            response = await loop.run_in_executor(self.executor, call)
+
+            if response.status_code >= 500:
+                raise APIException(f"{method} {url} failed: HTTP {response.status_code}")
+
+            result = self.decode(response)
+        except (requests.RequestException, ValueError) as e:
+            raise APIException(f"{method} {url} failed: {e}") from e
+
+        self.get_latencies(key).append(time.monotonic() - start)
+
+        return result
+
+    def decode(self, response: requests.Response) -> Any:
         return response.json()
+
+    async def hedge(self, method: str, url: str, key: str, **kwargs) -> Any:
+        self.hedges_in_flight[key] = self.hedges_in_flight.get(key, 0) + 1
+
+        try:
+            return await self.call(method, url, key, **kwargs)
+        finally:
+            self.hedges_in_flight[key] -= 1
+
+    async def hedged_call(self, method: str, url: str, key: str, **kwargs) -> Any:
+        primary = asyncio.create_task(self.call(method, url, key, **kwargs))
+        tasks = {primary}
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(key))
+
+            if done or self.hedges_in_flight.get(key, 0) >= HEDGE_BUDGET:
+                return await primary
+
+            client = self.__class__.__name__
+            METRICS.counter("api_hedged_requests_total", "Hedged second requests sent after the p95 delay", client=client, endpoint=key).inc()
+
+            backup = asyncio.create_task(self.hedge(method, url, key, **kwargs))
+            tasks.add(backup)
+            pending = set(tasks)
+            error = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            METRICS.counter("api_hedge_wins_total", "Hedged requests that answered first", client=client, endpoint=key).inc()
+
+                        return task.result()
+
+                    error = task.exception()
+
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict[str, float]:
+        stats = {}
+
+        for key, breaker in self.breakers.items():
+            name = key.strip("/").replace("/", "_") or "root"
+            stats[f"{name}_circuit_state"] = breaker.state.value
+            stats[f"{name}_circuit_trips"] = breaker.trips
+            stats[f"{name}_circuit_rejected"] = breaker.rejected
+            stats[f"{name}_hedge_delay_seconds"] = self.hedge_delay(key) if key in self.hedged else 0.0
+
+        return stats
+
+    async def get(self, endpoint: str, query: str = "") -> Any:
+        return await self.request("GET", endpoint, query)
+
+    async def post(self, endpoint: str, data: Any) -> Any:
+        return await self.request("POST", endpoint, json=data)
+
+    def close(self):
+        self.session.close()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,235 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+from .peppy import PeppyAPIClient
+from .database import DatabaseManager
+from .exceptions import APIException
+from .logger import Logger
+
+IMMUTABLE_STATUSES = {1, 2, 4}
+
+
+class BeatmapCache:
+    def __init__(self, peppy: PeppyAPIClient, db: DatabaseManager, max_size: int, ttl: int, max_stale: int, not_found_ttl: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.peppy = peppy
+        self.db = db
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.not_found_ttl = not_found_ttl
+
+        self.cache: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self.missing: OrderedDict[str | int, float] = OrderedDict()
+        self.ids: dict[int, str] = {}
+        self.refreshing: set[str] = set()
+        self.tasks: set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.db_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_found_hits = 0
+        self.refresh_failures = 0
+
+    def is_fresh(self, beatmap: dict, cached_at: float) -> bool:
+        return int(beatmap["approved"]) in IMMUTABLE_STATUSES or time.time() - cached_at < self.ttl
+
+    def is_servable(self, beatmap: dict, cached_at: float) -> bool:
+        return self.is_fresh(beatmap, cached_at) or time.time() - cached_at < self.ttl + self.max_stale
+
+    def revalidate(self, md5: str):
+        if md5 in self.refreshing:
+            return
+
+        self.refreshing.add(md5)
+
+        task = asyncio.create_task(self.refresh(md5), name="Beatmap Refresh Task")
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def refresh(self, md5: str):
+        try:
+            await self.fetch(h=md5)
+        except APIException as e:
+            self.refresh_failures += 1
+            self.logger.debug(f"Keeping stale beatmap '{md5}': {e.message}")
+        finally:
+            self.refreshing.discard(md5)
+
+    def fallback(self, md5: str | None, error: APIException) -> dict:
+        entry = self.cache.get(md5) if md5 is not None else None
+
+        if entry is None:
+            raise error
+
+        self.stale_hits += 1
+        return entry[0]
+
+    def store(self, beatmap: dict, cached_at: float):
+        md5 = beatmap["file_md5"]
+
+        self.cache[md5] = (beatmap, cached_at)
+        self.cache.move_to_end(md5)
+        self.ids[int(beatmap["beatmap_id"])] = md5
+
+        while len(self.cache) > self.max_size:
+            evicted_md5, (evicted, _) = self.cache.popitem(last=False)
+            evicted_id = int(evicted["beatmap_id"])
+
+            if self.ids.get(evicted_id) == evicted_md5:
+                del self.ids[evicted_id]
+
+    async def persist(self, beatmaps: list[dict], cached_at: float):
+        rows = [
+            (beatmap["file_md5"], int(beatmap["beatmap_id"]), int(beatmap["approved"]), json.dumps(beatmap), int(cached_at))
+            for beatmap in beatmaps
+        ]
+
+        await self.db.set_beatmaps(rows)
+
+    def is_missing(self, key: str | int) -> bool:
+        missing_at = self.missing.get(key)
+
+        if missing_at is None:
+            return False
+
+        if time.time() - missing_at >= self.not_found_ttl:
+            del self.missing[key]
+            return False
+
+        self.not_found_hits += 1
+        return True
+
+    def remember_missing(self, key: str | int):
+        self.missing[key] = time.time()
+        self.missing.move_to_end(key)
+
+        while len(self.missing) > self.max_size:
+            self.missing.popitem(last=False)
+
+    def peek(self, md5: str) -> dict | None:
+        entry = self.cache.get(md5)
+        return entry[0] if entry and self.is_fresh(*entry) else None
+
+    async def lookup(self, md5: str = None, beatmap_id: int = None) -> dict | None:
+        if md5 is None:
+            md5 = self.ids.get(beatmap_id)
+
+        entry = self.cache.get(md5) if md5 is not None else None
+
+        if entry and self.is_fresh(*entry):
+            self.cache.move_to_end(md5)
+            self.hits += 1
+            return entry[0]
+
+        if entry and self.is_servable(*entry):
+            self.cache.move_to_end(md5)
+            self.stale_hits += 1
+            self.revalidate(md5)
+            return entry[0]
+
+        row = await self.db.get_beatmap_by_md5(md5) if md5 is not None else await self.db.get_beatmap_by_id(beatmap_id)
+
+        if row:
+            beatmap = json.loads(row[0])
+
+            if self.is_fresh(beatmap, row[1]):
+                self.store(beatmap, row[1])
+                self.db_hits += 1
+                return beatmap
+
+            if self.is_servable(beatmap, row[1]):
+                self.store(beatmap, row[1])
+                self.stale_hits += 1
+                self.revalidate(beatmap["file_md5"])
+                return beatmap
+
+        return None
+
+    async def fetch(self, **kwargs) -> list[dict]:
+        self.misses += 1
+
+        beatmaps = await self.peppy.get_beatmaps(**kwargs)
+
+        if not isinstance(beatmaps, list):
+            return []
+
+        now = time.time()
+
+        for beatmap in beatmaps:
+            self.store(beatmap, now)
+
+        if beatmaps:
+            await self.persist(beatmaps, now)
+
+        return beatmaps
+
+    async def get_by_md5(self, md5: str) -> dict | None:
+        beatmap = await self.lookup(md5=md5)
+
+        if beatmap is None and not self.is_missing(md5):
+            try:
+                beatmaps = await self.fetch(h=md5)
+            except APIException as e:
+                return self.fallback(md5, e)
+
+            beatmap = beatmaps[0] if beatmaps else None
+
+            if beatmap is None:
+                self.remember_missing(md5)
+
+        return beatmap
+
+    async def get_by_id(self, beatmap_id: int) -> dict | None:
+        beatmap = await self.lookup(beatmap_id=beatmap_id)
+
+        if beatmap is None and not self.is_missing(beatmap_id):
+            try:
+                beatmaps = await self.fetch(b=beatmap_id)
+            except APIException as e:
+                return self.fallback(self.ids.get(beatmap_id), e)
+
+            beatmap = beatmaps[0] if beatmaps else None
+
+            if beatmap is None:
+                self.remember_missing(beatmap_id)
+
+        return beatmap
+
+    async def warm(self, md5s: list[str] = (), beatmap_ids: list[int] = (), beatmapset_ids: list[int] = ()):
+        coros = [self.fetch(h=md5) for md5 in set(md5s) if await self.lookup(md5=md5) is None and not self.is_missing(md5)]
+        coros.extend([self.fetch(b=beatmap_id) for beatmap_id in set(beatmap_ids) if await self.lookup(beatmap_id=beatmap_id) is None and not self.is_missing(beatmap_id)])
+        coros.extend(self.fetch(s=beatmapset_id) for beatmapset_id in set(beatmapset_ids))
+
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+
+        if failures:
+            self.logger.warning(f"Failed to warm {len(failures)}/{len(coros)} beatmap lookup(s)")
+
+    async def preload(self, limit: int):
+        rows = await self.db.get_recent_beatmaps(limit)
+
+        for data, cached_at in reversed(rows):
+            beatmap = json.loads(data)
+
+            if self.is_fresh(beatmap, cached_at):
+                self.store(beatmap, cached_at)
+
+        self.logger.log(f"Preloaded {len(self.cache)} beatmap(s) from the database")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.cache),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_found": len(self.missing),
+            "not_found_hits": self.not_found_hits,
+            "refresh_failures": self.refresh_failures
+        }
@@ -1,4 +1,3 @@
-import re
 import asyncio
 
 from .irc_client import IRCClient
@@ -9,31 +8,81 @@ from .delta import DeltaAPIClient
 from .peppy import PeppyAPIClient
 from .logger import Logger
 from .preference import Preference
-from .command import Command
-from .action_phrase import ActionPhrase
+from .command import Command, COMMAND_ALIASES
 from .irc_command import IRCCommand
+from .irc_message import IRCMessage
+from .np_parser import parse_np
 from .websocket import RippleWebsocketClient
+from .send_queue import MessagePriority
+from .score_store import ScoreStore
+from .score_history import ScoreHistory
+from .score_archive import ScoreArchive, TREND_WINDOW
+from .recommender import BeatmapRecommender
+from .osu_file_client import OsuFileClient
+from .osu_file_directory import OsuFileDirectory
+from .performance_calculator import PerformanceCalculator
+from .score import Score
+from .user_resolver import UserResolver
+from .beatmap_cache import BeatmapCache
+from .active_users import ActiveUserTracker
+from .prefetcher import BeatmapPrefetcher
+from .presence import PresenceTracker
+from .startup_timer import StartupTimer
+from .supervisor import ConnectionSupervisor, wait_first
+from .dispatcher import MessageDispatcher
+from .line_classifier import LineClassifier, LineClass
+from .metrics import METRICS, MetricsServer
+from .traffic_recorder import TrafficRecorder
+from .score_subscription import ScoreSubscription
 from .play_mode import PlayMode
-from .mods import MOD_NAMES, ModBitwise
-from .exceptions import AbortException
+from .mods import ModBitwise
+from .exceptions import AbortException, APIException
 from .config import *
 
 HEARTBEAT_RATE = 60
 HEARTBEAT_TIMEOUT = 5
 LAST_SCORE_TIMEOUT = 1
+PERFORMANCE_TIMEOUT = 2
+RECENT_DEFAULT = 3
+RECENT_MAX = 5
+TOP_LIMIT = 5
+RECOMMEND_CANDIDATES = 3
 FOKABOT_USER_ID = 999
+REGISTRATION_NUMERICS = {"001", "376", "422"}
 
 
 class ChatBot:
     def __init__(self):
         self.logger = Logger(self.__class__.__name__)
-        self.irc = IRCClient(host, port, channels, default_channel, nickname, password)
-        self.db = DatabaseManager(db_path)
+        self.recorder = TrafficRecorder(traffic_record_path, traffic_flush_interval) if traffic_record_path else None
+        self.irc = IRCClient(host, port, channels, default_channel, nickname, password, irc_ssl, self.recorder)
+        self.db = DatabaseManager(db_path, db_flush_interval, preferences_cache_size)
         self.ripple = RippleAPIClient(ripple_base_url, ripple_token)
         self.delta = DeltaAPIClient(delta_base_url, delta_token)
         self.peppy = PeppyAPIClient(peppy_base_url)
-        self.ws = RippleWebsocketClient(websocket_host, ripple_token)
+        self.presence = PresenceTracker(self.delta, presence_watch, presence_poll_rate, presence_max_staleness)
+        self.users = UserResolver(self.ripple, self.db, user_cache_size, user_cache_ttl, stale_while_revalidate, user_batch_window, user_batch_size)
+        self.beatmaps = BeatmapCache(self.peppy, self.db, beatmap_cache_size, beatmap_cache_ttl, stale_while_revalidate, beatmap_not_found_ttl)
+        self.scores = ScoreStore(score_store_users, score_store_per_user, score_store_max_age)
+        self.history = ScoreHistory(self.db, score_history_batch_size, score_history_flush_interval, score_history_max_pending, score_history_retention)
+        self.archive = ScoreArchive(score_archive_path, score_archive_compact_rows, score_archive_flush_interval) if score_archive else None
+        self.recommender = BeatmapRecommender(recommender_max_entries, recommender_exclude_recent)
+        self.performance = PerformanceCalculator(
+            OsuFileDirectory(osu_files_path, OsuFileClient(osu_files_url) if osu_files_url else None),
+            parsed_beatmap_cache_size, difficulty_cache_size
+        )
+        self.score_subscription = ScoreSubscription(score_subscription_ttl, score_subscription_limit) if websocket_score_filter else None
+        self.ws = RippleWebsocketClient(websocket_host, ripple_token, self.scores, self.recorder, self.score_subscription)
+        self.active_users = ActiveUserTracker(active_user_ttl, active_user_limit)
+        self.last_users = ActiveUserTracker(last_user_ttl, active_user_limit)
+        self.prefetcher = BeatmapPrefetcher(self.beatmaps, prefetch_queue_size, prefetch_rate, self.is_active_user) if beatmap_prefetch else None
+        self.irc_supervisor = ConnectionSupervisor("IRC", self.connect_irc, self.serve_irc, self.reset_irc)
+        self.ws_supervisor = ConnectionSupervisor("Websocket", self.connect_websocket, self.ws.run, self.reset_websocket)
+        self.irc_tasks: list[asyncio.Task] = []
+        self.dispatcher = MessageDispatcher(self.handle_message, dispatch_workers, dispatch_queue_size, dispatch_enqueue_timeout)
         self.command_prefix = command_prefix
+        self.classifier = LineClassifier(command_prefix, nickname, keyword_triggers)
+        self.background_tasks: set[asyncio.Task] = set()
 
         self.docs = {
             "help": f"Available commands: {", ".join([self.command_prefix + command.lower() for command in Command.__members__.keys()])}",
@@ -41,71 +90,222 @@ class ChatBot:
             "bye": "Friendly farewells between a user and their obedient bot~",
             "preferences": f"Usage: {self.command_prefix}preferences <preference_name> <value> (To list all preferences: {self.command_prefix}preferences list)",
             "discord": "Prints the Ripple Discord server invite link",
-            "last": "Shows your last score"
+            "last": "Shows your last score",
+            "recent": f"Usage: {self.command_prefix}recent [1-{RECENT_MAX}] (Shows your most recent scores)",
+            "top": f"Usage: {self.command_prefix}top [osu|taiko|ctb|mania] (Shows your best scores seen by the bot)",
+            "stats": f"Usage: {self.command_prefix}stats [username] (Shows play statistics from the scores the bot has seen)",
+            "recommend": f"Usage: {self.command_prefix}r [osu|taiko|ctb|mania] [nomod|hr|dt|hddt|...] (Recommends a map near your skill level)",
+            "metrics": "Shows bot performance metrics (admins only)"
         }
 
+        METRICS.gauge("score_store", self.scores.stats)
+        METRICS.gauge("score_history", self.history.stats)
+        METRICS.gauge("recommender", self.recommender.stats)
+        METRICS.gauge("performance", self.performance.stats)
+        METRICS.gauge("user_cache", self.users.stats)
+        METRICS.gauge("user_lookups", self.users.lookups.stats)
+        METRICS.gauge("beatmap_cache", self.beatmaps.stats)
+        METRICS.gauge("presence", self.presence.stats)
+        METRICS.gauge("ripple_api", self.ripple.stats)
+        METRICS.gauge("delta_api", self.delta.stats)
+        METRICS.gauge("peppy_api", self.peppy.stats)
+        METRICS.gauge("send_queue", self.irc.queue.stats)
+        METRICS.gauge("dispatcher", self.dispatcher.stats)
+        METRICS.gauge("lines", self.classifier.stats)
+        METRICS.gauge("database", self.db.stats)
+        METRICS.gauge("irc_connection", self.irc_supervisor.stats)
+        METRICS.gauge("websocket_connection", self.ws_supervisor.stats)
+        METRICS.gauge("websocket", self.ws.stats)
+
+        if self.prefetcher:
+            METRICS.gauge("prefetcher", self.prefetcher.stats)
+
+        if self.recorder:
+            METRICS.gauge("traffic_recorder", self.recorder.stats)
+
+        if self.archive is not None:
+            METRICS.gauge("score_archive", self.archive.stats)
+
+    async def start_services(self) -> list[asyncio.Task]:
+        await self.beatmaps.preload(beatmap_preload)
+        self.recommender.preload(await self.db.get_score_samples(recommender_preload))
+
+        tasks = [
+            asyncio.create_task(self.irc.queue.run(), name="Send Queue Task"),
+            asyncio.create_task(self.dispatcher.run(), name="Dispatcher Task"),
+            asyncio.create_task(self.db.run_flusher(), name="Database Flush Task"),
+            asyncio.create_task(self.history.run(), name="Score History Task"),
+            asyncio.create_task(self.presence.run(), name="Presence Task")
+        ]
+
+        self.ws.score_listeners.append(self.history.add)
+        self.ws.score_listeners.append(self.recommender.add)
+
+        if metrics_enabled:
+            tasks.append(asyncio.create_task(MetricsServer(METRICS, metrics_host, metrics_port).run(), name="Metrics Task"))
+
+        if self.prefetcher:
+            self.ws.score_listeners.append(self.prefetcher.offer)
+            tasks.append(asyncio.create_task(self.prefetcher.run(), name="Prefetch Task"))
+
+        if self.recorder:
+            tasks.append(asyncio.create_task(self.recorder.run_flusher(), name="Traffic Recorder Task"))
+
+        if self.archive is not None:
+            self.ws.score_listeners.append(self.archive.add)
+            tasks.append(asyncio.create_task(self.archive.run(), name="Score Archive Task"))
+
+        return tasks
+
+    async def close(self):
+        if self.recorder:
+            self.recorder.close()
+
+        if self.archive is not None:
+            self.archive.close()
+
+        self.performance.close()
+        await self.history.close()
+        await self.db.close()
+
+        for client in (self.ripple, self.delta, self.peppy):
+            client.close()
+
     async def run(self):
-        await self.irc.connect()
-        await self.ws.connect()
+        tasks = await self.start_services()
+        tasks.append(asyncio.create_task(self.irc_supervisor.run(), name="IRC Supervisor Task"))
+        tasks.append(asyncio.create_task(self.ws_supervisor.run(), name="Websocket Supervisor Task"))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await self.close()
+
+    async def connect_irc(self, timer: StartupTimer):
+        with timer.phase("irc_connect"):
+            await self.irc.connect()
+
+        self.irc_tasks = [asyncio.create_task(self.handle_irc(), name="IRC Task")]
+
+        with timer.phase("irc_register"):
+            await self.irc.wait_registered()
+
+        with timer.phase("irc_join"):
+            await self.irc.join_channels()
+
+        self.irc_tasks.append(asyncio.create_task(self.handle_heartbeat(), name="Heartbeat Task"))
+
+    async def serve_irc(self):
+        await wait_first(*self.irc_tasks)
+
+    async def reset_irc(self):
+        for task in self.irc_tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.irc_tasks, return_exceptions=True)
+        self.irc_tasks = []
+
+        await self.irc.disconnect()
 
-        irc_task = asyncio.create_task(self.handle_irc(), name="IRC Task")
-        heartbeat_task = asyncio.create_task(self.handle_heartbeat(), name="Heartbeat Task")
-        websocket_task = asyncio.create_task(self.ws.run(), name="Websocket Task")
-        join_task = asyncio.create_task(self.irc.join_channels(), name="Join Channels Task")
+    async def connect_websocket(self, timer: StartupTimer):
+        with timer.phase("websocket_connect"):
+            await self.ws.connect()
 
-        await asyncio.gather(irc_task, heartbeat_task, websocket_task, join_task)
+        with timer.phase("websocket_setup"):
+            await self.ws.setup()
+
+    async def reset_websocket(self):
+        await self.ws.disconnect()
 
     async def handle_irc(self):
         while True:
-            message = await self.irc.recv()
+            line = await self.irc.recv()
 
-            if not message:
+            if not line:
                 raise RuntimeError("Connection closed by the server")
 
-            try:
-                irc_command = IRCCommand[message.split()[1]]
-            except KeyError:
-                if bool(re.search(r"^\d{3}$", message.split()[1])):
-                    irc_command = None
-                else:
-                    self.logger.log(f"Unknown IRC command: {message}")
-                    continue
-
-            match irc_command:
-                case IRCCommand.JOIN:
-                    if self.irc.nickname in message:
-                        self.irc.joined.set()
-                case IRCCommand.PART:
-                    continue
-                case IRCCommand.PING:
-                    await self.irc.pong()
-                case IRCCommand.PONG:
-                    self.irc.alive.set()
-                case IRCCommand.PRIVMSG:
-                    self.logger.log(message)
-                    await self.handle_message(message)
-                case _:
-                    self.logger.log(message)
+            message = IRCMessage.parse(line)
+
+            if message is None:
+                continue
+
+            if message.command in IRCCommand.__members__:
+                label = message.command
+            else:
+                label = "numeric" if message.is_numeric else "other"
+
+            with METRICS.timer("irc_line_seconds", "Time spent handling an IRC line in the read loop", command=label):
+                await self.handle_line(message)
+
+    async def handle_line(self, message: IRCMessage):
+        try:
+            irc_command = IRCCommand[message.command]
+        except KeyError:
+            if message.is_numeric:
+                irc_command = None
+
+                if message.command in REGISTRATION_NUMERICS:
+                    self.irc.registered.set()
+            else:
+                self.logger.debug(f"Unknown IRC command: {message.raw}", category="irc")
+                return
+
+        match irc_command:
+            case IRCCommand.JOIN:
+                if message.nick and message.nick.lower() == self.irc.nickname.lower():
+                    for channel in message.target.split(","):
+                        self.irc.mark_joined(channel)
+
+                self.presence.push(message.nick, True)
+            case IRCCommand.PART:
+                return
+            case IRCCommand.QUIT:
+                self.presence.push(message.nick, False)
+            case IRCCommand.NICK:
+                await self.users.rename(message.nick, message.target)
+            case IRCCommand.PING:
+                await self.irc.pong()
+            case IRCCommand.PONG:
+                self.irc.alive.set()
+            case IRCCommand.PRIVMSG:
+                self.logger.debug(message.raw, category="chat_in")
+
+                if not message.nick or len(message.params) < 2:
+                    return
+
+                self.active_users.touch(message.nick)
+                line_class = self.classifier.classify(message)
+
+                if line_class is not LineClass.IGNORED:
+                    await self.dispatcher.submit(message.nick, message, line_class)
+            case _:
+                self.logger.debug(message.raw, category="irc")
+
+    def spawn(self, coro, name: str = None) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=name)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+        return task
 
     async def handle_heartbeat(self):
         while True:
             await self.irc.heartbeat(HEARTBEAT_TIMEOUT)
             await asyncio.sleep(HEARTBEAT_RATE)
 
-    async def handle_message(self, message: str):
+    async def handle_message(self, message: IRCMessage, line_class: LineClass):
         ctx = ContextManager()
-        ctx.sender = message[re.search(r":", message).end():re.search(r"!", message).start()]
-        ctx.channel = message[re.search(r"PRIVMSG ", message).end():re.search(r" :", message).start()]
-        ctx.message = message[re.search(r"(?<=:).*?:", message).end():].rstrip()
-
-        if ctx.message.startswith(self.command_prefix):
-            ctx.type = "COMMAND"
-        elif ctx.message.startswith(("\x01ACTION", "ACTION")):
-            ctx.type = "ACTION"
-        else:
-            ctx.type = "TEXT"
-
-        self.db.add_user(self.ripple.get_user_id(ctx.sender))
+        ctx.sender = message.nick
+        ctx.channel = message.target
+        ctx.message = message.params[-1].rstrip()
+
+        match line_class:
+            case LineClass.COMMAND:
+                ctx.type = "COMMAND"
+            case LineClass.ACTION:
+                ctx.type = "ACTION"
+            case _:
+                ctx.type = "TEXT"
 
         match ctx.type:
             case "COMMAND":
@@ -118,43 +318,84 @@ class ChatBot:
     async def handle_command(self, ctx: ContextManager):
         parts = ctx.message.split()
         command_name = parts[0].lstrip(self.command_prefix).lower()
+        command_name = COMMAND_ALIASES.get(command_name, command_name)
         args = parts[1:]
 
         try:
             ctx.command = Command[command_name.upper()]
         except KeyError:
-            self.logger.log(f"Invalid command: '{command_name}'")
+            self.logger.debug(f"Invalid command: '{command_name}'")
             return
 
-        try:
-            coro = getattr(self, command_name)
-            await coro(ctx, *args)
-        except AbortException as e:
-            if not e.suppress_response:
-                await self.irc.privmsg(e.message, channel=self.get_channel(e.ctx))
+        timeout = command_timeouts.get(command_name, default_command_timeout)
+        outcome = "ok"
+
+        with METRICS.timer("command_seconds", "Command handling latency", command=command_name):
+            try:
+                coro = getattr(self, command_name)
+                await asyncio.wait_for(coro(ctx, *args), timeout)
+            except TimeoutError:
+                outcome = "timeout"
+                self.logger.warning(f"Command '{command_name}' from '{ctx.sender}' timed out after {timeout}s")
+            except AbortException as e:
+                outcome = "aborted"
 
-            if e.log_message:
-                self.logger.log(e.message)
+                if not e.suppress_response:
+                    await self.irc.privmsg(e.message, channel=self.get_channel(e.ctx))
+
+                if e.log_message:
+                    self.logger.log(e.message)
+            except APIException as e:
+                outcome = "api_error"
+                self.logger.warning(e.message)
+
+        METRICS.counter("commands_total", "Commands handled by outcome", command=command_name, outcome=outcome).inc()
 
     async def handle_action(self, ctx: ContextManager):
-        action_checks = {action_phrase: action_phrase.value in ctx.message for action_phrase in ActionPhrase}
+        now_playing = parse_np(ctx.message)
+
+        if now_playing is None:
+            self.logger.debug("Failed to parse action")
+            return
+
+        ctx.action = now_playing.action
+        ctx.beatmapset_id = now_playing.beatmapset_id
+        ctx.beatmap_id = now_playing.beatmap_id
+        ctx.song = now_playing.song
+        ctx.difficulty = now_playing.difficulty
+        ctx.mods = now_playing.mods
 
         try:
-            ctx.action = next((action_phrase for action_phrase in action_checks.keys() if action_checks[action_phrase]))
-        except StopIteration:
-            self.logger.log("Failed to parse action")
+            user_id = await self.get_user_id(ctx)
+        except APIException as e:
+            self.logger.warning(e.message)
             return
 
-        if any(list(action_checks.values())):
-            if bool(self.db.get_user_column(self.ripple.get_user_id(ctx.sender), "auto_beatconnect")):
-                await self.send_beatconnect_link(ctx)
+        if bool(await self.db.get_user_column(user_id, "auto_beatconnect")):
+            await self.send_beatconnect_link(ctx)
 
     async def handle_text(self, ctx: ContextManager):
         await self.parse_for_bancho(ctx)
 
+    async def get_user_id(self, ctx: ContextManager) -> int:
+        if not ctx.user_id:
+            ctx.user_id = await self.users.get_user_id(ctx.sender)
+            await self.db.add_user(ctx.user_id)
+
+            if self.score_subscription is not None:
+                self.score_subscription.touch(ctx.user_id)
+
+        return ctx.user_id
+
+    def is_active_user(self, username: str) -> bool:
+        return username in self.active_users or username in self.last_users
+
     def get_channel(self, ctx: ContextManager):
         return ctx.channel if not ctx.channel == self.irc.nickname else ctx.sender
 
+    def get_automatic_priority(self, ctx: ContextManager) -> MessagePriority:
+        return MessagePriority.HIGH if ctx.channel == self.irc.nickname else MessagePriority.LOW
+
     async def help(self, ctx: ContextManager, *args):
         message = self.docs["help"]
 
@@ -217,7 +458,7 @@ class ChatBot:
                         preference_value = 0
                         message = "Ok, I will no longer only reply to your !last's via DM"
 
-        self.db.update_user(self.ripple.get_user_id(ctx.sender), preference_name, preference_value)
+        await self.db.update_user(await self.get_user_id(ctx), preference_name, preference_value)
 
         await self.irc.privmsg(message, channel=self.get_channel(ctx))
         
@@ -226,72 +467,42 @@ class ChatBot:
         await self.irc.privmsg(message, channel=self.get_channel(ctx))
 
     async def send_beatconnect_link(self, ctx: ContextManager):
-        link_pattern = re.compile(r"https://osu.(ripple.moe|ppy.sh)/beatmapsets/[0-9]+#/[0-9]+")
-        beatmapset_id_pattern = re.compile(r"(?<=/)\d+(?=#)")
-        beatmap_id_pattern = re.compile(r"(?<=#/)\d+(?=$)")
-        song_standalone_pattern = re.compile(r".+\s-\s.+(?=])")
-        song_with_difficulty_pattern = re.compile(r".+\s-\s.+(?=\s\[(.*)]])")
-        difficulty_pattern = re.compile(r"(?<=\[)(.*)(?=]])")
-        mods_pattern = re.compile("|".join([re.escape(mod) for mod in MOD_NAMES.keys()]))
-
-        link_match = link_pattern.search(ctx.message)
-
-        if link_match:
-            np_link = link_match.group()
-            ctx.beatmapset_id = int(beatmapset_id_pattern.search(np_link).group())
-            ctx.beatmap_id = int(beatmap_id_pattern.search(np_link).group())
-
-            match ctx.action:
-                case ActionPhrase.LISTENING:
-                    ctx.song = song_standalone_pattern.search(ctx.message[link_match.end() + 1:]).group()
-                case ActionPhrase.PLAYING | ActionPhrase.WATCHING:
-                    song_match = song_with_difficulty_pattern.search(ctx.message[link_match.end() + 1:])
-                    difficulty_match = difficulty_pattern.search(ctx.message[link_match.end() + song_match.end() + 1:])
-                    mods_match = mods_pattern.findall(ctx.message[link_match.end() + song_match.end() + difficulty_match.end() + 3:])
-
-                    ctx.song = song_match.group()
-                    ctx.difficulty = difficulty_match.group()
-
-                    if mods_match:
-                        ctx.mods = [MOD_NAMES[mod] for mod in mods_match]
-                case ActionPhrase.EDITING:
-                    song_match = song_with_difficulty_pattern.search(ctx.message[link_match.end() + 1:])
-                    difficulty_match = difficulty_pattern.search(ctx.message[link_match.end() + song_match.end() + 1:])
-
-                    ctx.song = song_match.group()
-                    ctx.difficulty = difficulty_match.group()
+        message = (
+            f"[Download]: "
+            f"[https://beatconnect.io/b/{ctx.beatmapset_id} Beatconnect] | "
+            f"[https://osu.ppy.sh/beatmapsets/{ctx.beatmapset_id} Bancho]"
+        )
 
-            message = (
-                f"[Download]: "
-                f"[https://beatconnect.io/b/{ctx.beatmapset_id} Beatconnect] | "
-                f"[https://osu.ppy.sh/beatmapsets/{ctx.beatmapset_id} Bancho]"
-            )
+        await self.irc.privmsg(message, channel=self.get_channel(ctx), priority=self.get_automatic_priority(ctx))
 
-            await self.irc.privmsg(message, channel=self.get_channel(ctx))
-        else:
-            self.logger.log(f"Error finding link pattern match!?")
+        self.spawn(self.beatmaps.warm(beatmap_ids=[ctx.beatmap_id]), name="Beatmap Warm Task")
 
     async def parse_for_bancho(self, ctx: ContextManager):
         if "bancho" in ctx.message:
-            await self.irc.privmsg(f"bancho is dead :*", channel=self.get_channel(ctx))
+            await self.irc.privmsg(f"bancho is dead :*", channel=self.get_channel(ctx), priority=self.get_automatic_priority(ctx))
 
     async def last(self, ctx: ContextManager):
-        if self.delta.is_online(FOKABOT_USER_ID):
+        self.last_users.touch(ctx.sender)
+
+        if await self.presence.is_online(FOKABOT_USER_ID):
             return
 
-        score = self.ws.last_scores.get(ctx.sender)
+        user_id = await self.get_user_id(ctx)
+        score = self.scores.last(ctx.sender) or next(iter(await self.history.recent(user_id, 1)), None)
 
         if not score:
             return
 
-        try:
-            beatmaps = self.peppy.get_beatmaps(h=score.beatmap_md5)
-            beatmap = beatmaps[0]
-        except KeyError:
+        beatmap = await self.beatmaps.get_by_md5(score.beatmap_md5)
+
+        if not beatmap:
             return
 
         link = f"https://osu.ripple.moe/beatmapsets/{beatmap["beatmapset_id"]}#/{beatmap["beatmap_id"]}"
         mods = ModBitwise.bitwise_to_list(score.mods)
+        performance = await self.score_performance(score, beatmap)
+        stars = performance[0].stars if performance else float(beatmap["difficultyrating"])
+        full_combo = performance is not None and not score.count_miss and score.max_combo >= performance[0].max_combo
 
         message = (
             f"{score.username} | "
@@ -301,10 +512,178 @@ class ChatBot:
             f"({round(score.accuracy, 2)}% {score.rank}) "
             f"{"[" + ("Fail" if score.completed == 1 else "Quit") + "] | " if score.completed < 2 else "| "}"
             f"{score.max_combo}x/{beatmap["max_combo"]}x | "
-            f"{str(round(score.pp, 2)) + "pp" if score.pp > 0 else "{:,}".format(score.score)} | "
-            f"{round(float(beatmap["difficultyrating"]), 2)}★"
+            f"{str(round(score.pp, 2)) + "pp" if score.pp > 0 else "{:,}".format(score.score)} "
+            f"{"(" + str(round(performance[2], 2)) + "pp if FC) " if performance and not full_combo else ""}| "
+            f"{round(stars, 2)}★"
         )
 
-        channel = ctx.channel if not bool(self.db.get_user_column(self.ripple.get_user_id(ctx.sender), "dm_last")) else ctx.sender
+        channel = ctx.channel if not bool(await self.db.get_user_column(user_id, "dm_last")) else ctx.sender
 
         await self.irc.privmsg(message, channel=channel)
+
+    async def score_performance(self, score: Score, beatmap: dict) -> tuple | None:
+        try:
+            return await asyncio.wait_for(self.performance.performance(score, int(beatmap["beatmap_id"])), PERFORMANCE_TIMEOUT)
+        except asyncio.TimeoutError as e:
+            self.logger.debug(f"No local performance for beatmap {beatmap["beatmap_id"]}: {e!r}")
+            return None
+        except Exception as e:
+            self.logger.warning(f"Performance calculation failed for beatmap {beatmap["beatmap_id"]}: {e!r}")
+            return None
+
+    async def format_plays(self, scores: list[Score]) -> str:
+        beatmaps = await asyncio.gather(*(self.beatmaps.lookup(md5=score.beatmap_md5) for score in scores))
+        plays = []
+
+        for index, (score, beatmap) in enumerate(zip(scores, beatmaps), start=1):
+            mods = ModBitwise.bitwise_to_list(score.mods)
+            title = f"{beatmap["artist"]} - {beatmap["title"]} [{beatmap["version"]}]" if beatmap else f"Beatmap {score.beatmap_md5[:8]}"
+
+            plays.append(
+                f"{index}. {title} "
+                f"{"+" + "".join(mods) + " " if mods else ""}"
+                f"({round(score.accuracy, 2)}% {score.rank}"
+                f"{", " + ("Fail" if score.completed == 1 else "Quit") if score.completed < 2 else ""}) "
+                f"{score.max_combo}x "
+                f"{str(round(score.pp, 2)) + "pp" if score.pp > 0 else "{:,}".format(score.score)}"
+            )
+
+        return " | ".join(plays)
+
+    async def recent(self, ctx: ContextManager, *args):
+        limit = RECENT_DEFAULT
+
+        if args:
+            if not args[0].isdigit() or not 1 <= int(args[0]) <= RECENT_MAX:
+                raise AbortException(self.docs["recent"], ctx)
+
+            limit = int(args[0])
+
+        scores = await self.history.recent(await self.get_user_id(ctx), limit)
+
+        if not scores:
+            raise AbortException(f"I haven't seen any scores from {ctx.sender} yet", ctx)
+
+        message = f"{ctx.sender}'s recent plays: {await self.format_plays(scores)}"
+        await self.irc.privmsg(message, channel=self.get_channel(ctx))
+
+    async def top(self, ctx: ContextManager, *args):
+        user_id = await self.get_user_id(ctx)
+
+        if args:
+            play_mode = PlayMode.from_alias(args[0])
+
+            if play_mode is None:
+                raise AbortException(self.docs["top"], ctx)
+        else:
+            latest = next(iter(await self.history.recent(user_id, 1)), None)
+            play_mode = PlayMode(latest.play_mode if latest else PlayMode.STANDARD.value)
+
+        scores = await self.history.top(user_id, play_mode.value, TOP_LIMIT)
+
+        if not scores:
+            raise AbortException(f"I haven't seen any ranked {play_mode.get_name()} passes from {ctx.sender} yet", ctx)
+
+        message = f"{ctx.sender}'s top {play_mode.get_name()} plays: {await self.format_plays(scores)}"
+        await self.irc.privmsg(message, channel=self.get_channel(ctx))
+
+    async def stats(self, ctx: ContextManager, *args):
+        if self.archive is None:
+            return
+
+        if args:
+            username = args[0]
+
+            try:
+                user_id = await self.users.get_user_id(username)
+            except APIException:
+                raise AbortException(f"Unknown user '{username}'", ctx)
+        else:
+            username = ctx.sender
+            user_id = await self.get_user_id(ctx)
+
+        summary = self.archive.aggregate(user_id)
+
+        if summary is None:
+            raise AbortException(f"I haven't seen any scores from {username} yet", ctx)
+
+        modes = ", ".join(f"{mode.get_name()} {share:.0%}" for mode, share in sorted(summary["modes"].items(), key=lambda item: item[1], reverse=True))
+        percentiles = summary["pp_percentiles"]
+        mods = ", ".join(f"{mod} {share:.0%}" for mod, share in summary["mods"].items())
+
+        message = (
+            f"{username}: {summary["plays"]:,} plays on {summary["beatmaps"]:,} maps ({modes}) | "
+            f"{f"pp p50/p90/p99/max: {percentiles[50]:.0f}/{percentiles[90]:.0f}/{percentiles[99]:.0f}/{summary["pp_max"]:.0f} | " if percentiles else ""}"
+            f"Accuracy: {summary["accuracy"]:.2f}% (last {min(summary["plays"], TREND_WINDOW)}: {summary["recent_accuracy"]:.2f}%, {summary["recent_accuracy"] - summary["accuracy"]:+.2f}) | "
+            f"Mods: {mods or "none"}"
+        )
+
+        await self.irc.privmsg(message, channel=self.get_channel(ctx))
+
+    async def recommend(self, ctx: ContextManager, *args):
+        play_mode = None
+        mods = None
+
+        for arg in args:
+            if (alias := PlayMode.from_alias(arg)) is not None:
+                play_mode = alias
+            elif (bitwise := ModBitwise.string_to_bitwise(arg)) is not None:
+                mods = BeatmapRecommender.normalize_mods(bitwise)
+            else:
+                raise AbortException(self.docs["recommend"], ctx)
+
+        user_id = await self.get_user_id(ctx)
+        play_mode = play_mode or self.recommender.main_mode(user_id) or PlayMode.STANDARD
+
+        for md5, recommended_mods, expected_pp, players in self.recommender.recommend(user_id, play_mode, mods, RECOMMEND_CANDIDATES):
+            beatmap = await self.beatmaps.get_by_md5(md5)
+
+            if not beatmap:
+                continue
+
+            link = f"https://osu.ripple.moe/beatmapsets/{beatmap["beatmapset_id"]}#/{beatmap["beatmap_id"]}"
+            mod_list = ModBitwise.bitwise_to_list(recommended_mods)
+
+            message = (
+                f"{ctx.sender} | "
+                f"[{link} {beatmap["artist"]} - {beatmap["title"]} [{beatmap["version"]}]] "
+                f"<{play_mode.get_name()}> "
+                f"{"+" + "".join(mod_list) + " " if mod_list else ""}| "
+                f"~{expected_pp:.0f}pp (from {players} similar player{"s" if players != 1 else ""}) | "
+                f"{round(float(beatmap["difficultyrating"]), 2)}★ | "
+                f"[https://beatconnect.io/b/{beatmap["beatmapset_id"]} Beatconnect]"
+            )
+
+            await self.irc.privmsg(message, channel=self.get_channel(ctx))
+            self.recommender.mark_recommended(user_id, md5, play_mode, recommended_mods)
+            return
+
+        raise AbortException(f"I don't have a {play_mode.get_name()} recommendation for {ctx.sender} yet, I need to see more of your (and similar players') passes first", ctx)
+
+    async def metrics(self, ctx: ContextManager, *args):
+        if ctx.sender.lower() not in admins:
+            return
+
+        lines = self.classifier.stats()
+        last = METRICS.histogram("command_seconds", "Command handling latency", command="last")
+        api = METRICS.merged("api_request_seconds")
+        scores = self.scores.stats()
+        feed = self.ws.stats()
+        lookups = self.users.lookups.stats()
+        history = self.history.stats()
+
+        message = (
+            f"Lines: {sum(lines.values())} ({lines["ignored"]} ignored) | "
+            f"!last p50/p99: {last.quantile(0.5) * 1000:.0f}/{last.quantile(0.99) * 1000:.0f}ms | "
+            f"API p99: {api.quantile(0.99) * 1000:.0f}ms ({api.count} calls) | "
+            f"Queues: send {self.irc.queue.stats()["queue_depth"]}, dispatch {self.dispatcher.stats()["queued"]} | "
+            f"Scores: {scores["scores"]} ({scores["memory_bytes"] / 1024 / 1024:.1f} MiB) | "
+            f"Score feed: {feed["decoded_per_second"]:.1f}/s decoded, {feed["dropped_per_second"]:.1f}/s dropped | "
+            f"Score history: {history["written"]} written in {history["batches"]} batches, {history["pending"]} pending | "
+            f"Cache hits: users {self.users.hits + self.users.db_hits}/{self.users.hits + self.users.db_hits + self.users.misses}, "
+            f"beatmaps {self.beatmaps.hits + self.beatmaps.db_hits}/{self.beatmaps.hits + self.beatmaps.db_hits + self.beatmaps.misses} | "
+            f"User lookups: {lookups["batches"]} batches (mean {lookups["mean_batch_size"]:.1f}), {lookups["requests_saved"]} requests saved | "
+            f"Reconnects: IRC {self.irc_supervisor.reconnects}, websocket {self.ws_supervisor.reconnects}"
+        )
+
+        await self.irc.privmsg(message, channel=ctx.sender)
@@ -0,0 +1,59 @@
+import time
+from enum import Enum
+
+
+class CircuitState(Enum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state is CircuitState.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = CircuitState.HALF_OPEN
+            self.probing = False
+
+        match self.state:
+            case CircuitState.CLOSED:
+                return True
+            case CircuitState.HALF_OPEN if not self.probing:
+                self.probing = True
+                return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def release(self):
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+
+        if self.state is CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                self.trips += 1
+
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+COMMAND_ALIASES = {"r": "recommend"}
+
 
 class Command(Enum):
     HELP = auto()
@@ -8,3 +10,8 @@ class Command(Enum):
     PREFERENCES = auto()
     DISCORD = auto()
     LAST = auto()
+    RECENT = auto()
+    TOP = auto()
+    STATS = auto()
+    RECOMMEND = auto()
+    METRICS = auto()
@@ -7,17 +7,94 @@ load_dotenv()
 # IRC Config
 host = "irc.ripple.moe"
 port = 6697
+irc_ssl = True
 default_channel = "#osu"
 channels = [default_channel]
 nickname = os.getenv("NICKNAME")
 password = os.getenv("IRC_TOKEN")
 
+# Logging Config
+log_level = os.getenv("LOG_LEVEL", "INFO")
+log_json = os.getenv("LOG_JSON", "0") == "1"
+log_rate_limits = {"chat_in": 5, "chat_out": 5, "irc": 2, "websocket": 2}
+
 # Bot Config
 command_prefix = "!"
+keyword_triggers = ["bancho"]
 discord_link = "https://discord.gg/893AKDKDwz"
 
+# Dispatch Config
+dispatch_workers = 8
+dispatch_queue_size = 64
+dispatch_enqueue_timeout = 0.5
+command_timeouts = {"last": 10, "recent": 10, "top": 10, "recommend": 10, "preferences": 10}
+default_command_timeout = 5
+
+# Metrics Config
+metrics_enabled = True
+metrics_host = "127.0.0.1"
+metrics_port = 9464
+admins = [name.strip().lower() for name in os.getenv("ADMINS", "").split(",") if name.strip()]
+
+# Traffic Recording Config
+traffic_record_path = os.getenv("TRAFFIC_RECORD")
+traffic_flush_interval = 5
+
 # Database Config
 db_path = "instance/storage.db"
+db_flush_interval = 2
+preferences_cache_size = 4096
+
+# Upstream Resilience Config
+stale_while_revalidate = 60 * 60 * 24 * 7
+
+# User Cache Config
+user_cache_size = 4096
+user_cache_ttl = 60 * 60 * 24
+user_batch_window = 0.05
+user_batch_size = 50
+
+# Beatmap Cache Config
+beatmap_cache_size = 2048
+beatmap_cache_ttl = 60 * 60 * 6
+beatmap_not_found_ttl = 60 * 10
+beatmap_preload = 512
+
+# Score Store Config
+score_store_users = 20000
+score_store_per_user = 10
+score_store_max_age = 60 * 60 * 24
+
+# Score History Config
+score_history_batch_size = 500
+score_history_flush_interval = 1
+score_history_max_pending = 50000
+score_history_retention = 60 * 60 * 24 * 180
+
+# Score Archive Config
+score_archive = True
+score_archive_path = "instance/archive"
+score_archive_compact_rows = 200000
+score_archive_flush_interval = 5
+
+# Recommender Config
+recommender_max_entries = 500000
+recommender_preload = 200000
+recommender_exclude_recent = 50
+
+# Performance Calculator Config
+osu_files_path = "instance/osu"
+osu_files_url = "https://osu.ppy.sh"
+parsed_beatmap_cache_size = 256
+difficulty_cache_size = 4096
+
+# Beatmap Prefetch Config
+beatmap_prefetch = True
+prefetch_queue_size = 256
+prefetch_rate = 2.0
+active_user_ttl = 60 * 60
+active_user_limit = 10000
+last_user_ttl = 60 * 60 * 24 * 7
 
 # Ripple API Config
 ripple_token = os.getenv("API_TOKEN")
@@ -27,8 +104,16 @@ ripple_base_url = "https://ripple.moe/api/v1"
 delta_token = os.getenv("API_TOKEN")
 delta_base_url = "https://c.ripple.moe/api/v2"
 
+# Presence Config
+presence_watch = {999: "FokaBot"}
+presence_poll_rate = 60
+presence_max_staleness = 180
+
 # Peppy API Config
 peppy_base_url = "https://ripple.moe/api"
 
 # Websocket Config
 websocket_host = "wss://api.ripple.moe/api/v1/ws"
+websocket_score_filter = False
+score_subscription_ttl = 60 * 60 * 24 * 7
+score_subscription_limit = 5000
@@ -4,10 +4,11 @@ from .logger import Logger
 
 
 class ContextManager:
-    def __init__(self):
-        self.logger = Logger(self.__class__.__name__)
+    logger = Logger("ContextManager")
 
+    def __init__(self):
         self.sender = ""
+        self.user_id = 0
         self.channel = ""
         self.message = ""
         self.type = ""
@@ -53,4 +54,4 @@ class ContextManager:
 
         message_block.append("-----END CONTEXT BLOCK-----")
 
-        self.logger.log("Printing context..." + "\n".join(message_block))
+        self.logger.debug("Printing context..." + "\n".join(message_block))
@@ -1,25 +1,55 @@
 import sqlite3
 import os
 import json
-from typing import Any
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 from .logger import Logger
+from .metrics import METRICS
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,
+    "cache_size": -16000
+}
+
+SCORE_COLUMNS = (
+    "score_id", "user_id", "username", "beatmap_md5", "play_mode", "score", "accuracy", "pp", "rank", "mods", "max_combo",
+    "count_300", "count_100", "count_50", "count_geki", "count_katu", "count_miss", "completed", "played_at", "received_at"
+)
 
 
 class DatabaseManager:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, flush_interval: float, preferences_cache_size: int):
         self.logger = Logger(self.__class__.__name__)
 
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-        self.connection = sqlite3.connect(db_path)
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
         self.cursor = self.connection.cursor()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+        self.flush_interval = flush_interval
+        self.preferences_cache_size = preferences_cache_size
+
+        for pragma, value in PRAGMAS.items():
+            self.cursor.execute(f"PRAGMA {pragma} = {value}")
 
         with open("config/schema.json", "r") as schema:
             self.schema = json.load(schema)
 
         self.create_database()
 
+        self.user_defaults: dict[str, Any] = self.schema["defaults"]["users"]
+        self.user_columns = [column for column in self.user_defaults if column != "id"]
+        self.preferences: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self.pending_preferences: dict[tuple[int, str], Any] = {}
+        self.flushing_preferences: dict[tuple[int, str], Any] = {}
+
     def create_database(self):
         for table in self.schema["tables"]:
 
@@ -29,6 +59,9 @@ class DatabaseManager:
 
             self.create_table(table_name, column_def, foreign_key_def)
 
+            for index in table.get("indexes", []):
+                self.create_index(index["name"], table_name, index["columns"], index.get("unique", False))
+
     def get_column_def(self, columns: list[dict]) -> str:
         column_defs = []
 
@@ -92,8 +125,10 @@ class DatabaseManager:
 
         return "FOREIGN KEY ({0}) REFERENCES {1} ({2}) {3}".format(child_key, parent_table, parent_key, action_clause).rstrip()
 
-    def close(self):
-        self.connection.close()
+    async def close(self):
+        await self.flush()
+        await self.run(self.connection.close)
+        self.executor.shutdown(wait=True)
 
     def create_table(self, table_name: str, column_def: str, foreign_key_def: str = None):
         command = f"CREATE TABLE IF NOT EXISTS {table_name} ({column_def})"
@@ -104,6 +139,12 @@ class DatabaseManager:
         self.cursor.execute(command)
         self.connection.commit()
 
+    def create_index(self, index_name: str, table_name: str, columns: list[str], unique: bool = False):
+        command = f"CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {index_name} ON {table_name} ({", ".join(columns)})"
+
+        self.cursor.execute(command)
+        self.connection.commit()
+
     def drop_table(self, table_name: str):
         command = f"DROP TABLE {table_name}"
 
@@ -119,46 +160,191 @@ class DatabaseManager:
         self.cursor.execute(command)
         self.connection.commit()
 
-    def user_exists(self, user_id: int) -> Any:
-        command = "SELECT * FROM users WHERE id = ?"
-        args = [(user_id,)]
+    async def run(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
 
-        self.cursor.execute(command, *args)
+    def _fetch_one(self, command: str, args: tuple) -> Any:
+        return self.connection.execute(command, args).fetchone()
 
-        return self.cursor.fetchone()
+    def _fetch_all(self, command: str, args: tuple) -> list[Any]:
+        return self.connection.execute(command, args).fetchall()
 
-    def add_user(self, user_id: int):
-        if not self.user_exists(user_id):
-            command = "INSERT INTO users (id, auto_beatconnect) VALUES (?, ?)"
-            args = [(user_id, self.schema["defaults"]["users"]["auto_beatconnect"])]
+    def _execute(self, command: str, args: tuple) -> int:
+        with self.connection:
+            return self.connection.execute(command, args).rowcount
 
-            self.cursor.execute(command, *args)
-            self.connection.commit()
+    def _execute_many(self, statements: list[tuple[str, list[tuple]]]):
+        with self.connection:
+            for command, rows in statements:
+                self.connection.executemany(command, rows)
 
-            self.logger.log(f"Added user '{user_id}'")
+    async def fetch_one(self, name: str, command: str, args: tuple = ()) -> Any:
+        with METRICS.timer("db_query_seconds", "SQLite statement latency including executor wait", statement=name):
+            return await self.run(self._fetch_one, command, args)
 
-    def update_user(self, user_id: int, column: str, value: Any):
-        if self.user_exists(user_id):
-            command = f"UPDATE users SET {column} = ? WHERE id = ?"
-            args = [(value, user_id)]
+    async def fetch_all(self, name: str, command: str, args: tuple = ()) -> list[Any]:
+        with METRICS.timer("db_query_seconds", "SQLite statement latency including executor wait", statement=name):
+            return await self.run(self._fetch_all, command, args)
 
-            self.cursor.execute(command, *args)
-            self.connection.commit()
+    async def execute(self, name: str, command: str, args: tuple = ()) -> int:
+        with METRICS.timer("db_query_seconds", "SQLite statement latency including executor wait", statement=name):
+            return await self.run(self._execute, command, args)
 
-            self.logger.log(f"Updated preference '{column}' to '{value}' for user '{user_id}'")
-        else:
-            self.add_user(user_id)
-            self.update_user(user_id, column, value)
+    async def execute_many(self, name: str, statements: list[tuple[str, list[tuple]]]):
+        with METRICS.timer("db_query_seconds", "SQLite statement latency including executor wait", statement=name):
+            await self.run(self._execute_many, statements)
+
+    async def user_exists(self, user_id: int) -> bool:
+        if user_id in self.preferences:
+            return True
+
+        command = "SELECT 1 FROM users WHERE id = ?"
+        return await self.fetch_one("user_exists", command, (user_id,)) is not None
 
-    def get_user_column(self, user_id: int, column: str) -> Any:
-        if self.user_exists(user_id):
-            command = f"SELECT {column} FROM users WHERE id = ?"
-            args = [(user_id,)]
+    async def add_user(self, user_id: int):
+        if user_id in self.preferences:
+            return
 
-            self.cursor.execute(command, *args)
-            self.connection.commit()
+        await self.load_preferences(user_id)
+
+    async def load_preferences(self, user_id: int) -> dict[str, Any]:
+        command = f"SELECT {", ".join(self.user_columns)} FROM users WHERE id = ?"
+        row = await self.fetch_one("load_preferences", command, (user_id,))
+
+        if row is None:
+            preferences = {column: self.user_defaults[column] for column in self.user_columns}
+
+            command = f"INSERT INTO users (id, {", ".join(self.user_columns)}) VALUES (?, {", ".join("?" for _ in self.user_columns)}) ON CONFLICT (id) DO NOTHING"
+            await self.execute("add_user", command, (user_id, *preferences.values()))
+
+            self.logger.debug(f"Added user '{user_id}'")
         else:
-            self.add_user(user_id)
-            self.get_user_column(user_id, column)
+            preferences = dict(zip(self.user_columns, row))
+
+        for (pending_user_id, column), value in (*self.flushing_preferences.items(), *self.pending_preferences.items()):
+            if pending_user_id == user_id:
+                preferences[column] = value
+
+        self.preferences[user_id] = preferences
+        self.preferences.move_to_end(user_id)
+
+        while len(self.preferences) > self.preferences_cache_size:
+            self.preferences.popitem(last=False)
+
+        return preferences
+
+    async def get_preferences(self, user_id: int) -> dict[str, Any]:
+        preferences = self.preferences.get(user_id)
+
+        if preferences is None:
+            return await self.load_preferences(user_id)
+
+        self.preferences.move_to_end(user_id)
+        return preferences
+
+    async def update_user(self, user_id: int, column: str, value: Any):
+        if column not in self.user_columns:
+            raise ValueError(f"Unknown user column: '{column}'")
+
+        preferences = await self.get_preferences(user_id)
+        preferences[column] = value
+
+        self.pending_preferences[(user_id, column)] = value
+
+        self.logger.log(f"Updated preference '{column}' to '{value}' for user '{user_id}'")
+
+    async def get_user_column(self, user_id: int, column: str) -> Any:
+        preferences = await self.get_preferences(user_id)
+        return preferences[column]
+
+    async def flush(self):
+        if not self.pending_preferences:
+            return
+
+        pending, self.pending_preferences = self.pending_preferences, {}
+        self.flushing_preferences = pending
+        rows_by_column: dict[str, list[tuple]] = {}
+
+        for (user_id, column), value in pending.items():
+            rows_by_column.setdefault(column, []).append((user_id, value))
+
+        statements = [
+            (f"INSERT INTO users (id, {column}) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET {column} = excluded.{column}", rows)
+            for column, rows in rows_by_column.items()
+        ]
+
+        try:
+            await self.execute_many("flush_preferences", statements)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to flush {len(pending)} preference write(s): {e!r}")
+
+            for key, value in pending.items():
+                self.pending_preferences.setdefault(key, value)
+        finally:
+            self.flushing_preferences = {}
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "cached_users": len(self.preferences),
+            "pending_writes": len(self.pending_preferences)
+        }
+
+    async def run_flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def get_username(self, username: str) -> Any:
+        command = "SELECT id, updated_at FROM usernames WHERE username = ?"
+        return await self.fetch_one("get_username", command, (username,))
+
+    async def set_username(self, username: str, user_id: int, updated_at: int):
+        await self.execute_many("set_username", [
+            ("DELETE FROM usernames WHERE id = ? AND username != ?", [(user_id, username)]),
+            ("INSERT INTO usernames (username, id, updated_at) VALUES (?, ?, ?) ON CONFLICT (username) DO UPDATE SET id = excluded.id, updated_at = excluded.updated_at", [(username, user_id, updated_at)])
+        ])
+
+    async def delete_username(self, username: str):
+        command = "DELETE FROM usernames WHERE username = ?"
+        await self.execute("delete_username", command, (username,))
+
+    async def get_beatmap_by_md5(self, md5: str) -> Any:
+        command = "SELECT data, cached_at FROM beatmaps WHERE md5 = ?"
+        return await self.fetch_one("get_beatmap_by_md5", command, (md5,))
+
+    async def get_beatmap_by_id(self, beatmap_id: int) -> Any:
+        command = "SELECT data, cached_at FROM beatmaps WHERE beatmap_id = ? ORDER BY cached_at DESC LIMIT 1"
+        return await self.fetch_one("get_beatmap_by_id", command, (beatmap_id,))
+
+    async def get_recent_beatmaps(self, limit: int) -> list[Any]:
+        command = "SELECT data, cached_at FROM beatmaps ORDER BY cached_at DESC LIMIT ?"
+        return await self.fetch_all("get_recent_beatmaps", command, (limit,))
+
+    async def set_beatmaps(self, rows: list[tuple[str, int, int, str, int]]):
+        command = "INSERT INTO beatmaps (md5, beatmap_id, approved, data, cached_at) VALUES (?, ?, ?, ?, ?) ON CONFLICT (md5) DO UPDATE SET beatmap_id = excluded.beatmap_id, approved = excluded.approved, data = excluded.data, cached_at = excluded.cached_at"
+        await self.execute_many("set_beatmaps", [(command, rows)])
+
+    async def insert_scores(self, rows: list[tuple]):
+        command = f"INSERT INTO scores ({", ".join(SCORE_COLUMNS)}) VALUES ({", ".join("?" for _ in SCORE_COLUMNS)}) ON CONFLICT (score_id) DO NOTHING"
+        await self.execute_many("insert_scores", [(command, rows)])
+
+    async def get_recent_scores(self, user_id: int, limit: int) -> list[Any]:
+        command = f"SELECT {", ".join(SCORE_COLUMNS)} FROM scores WHERE user_id = ? ORDER BY played_at DESC, id DESC LIMIT ?"
+        return await self.fetch_all("get_recent_scores", command, (user_id, limit))
+
+    async def get_top_scores(self, user_id: int, play_mode: int, limit: int) -> list[Any]:
+        command = f"SELECT {", ".join(SCORE_COLUMNS)}, MAX(pp) FROM scores WHERE user_id = ? AND play_mode = ? AND completed >= 2 AND pp > 0 GROUP BY beatmap_md5 ORDER BY pp DESC LIMIT ?"
+        return [row[:-1] for row in await self.fetch_all("get_top_scores", command, (user_id, play_mode, limit))]
 
-        return self.cursor.fetchone()[0]
+    async def get_score_boundary(self, received_before: int) -> int:
+        command = "SELECT COALESCE((SELECT id FROM scores WHERE received_at >= ? ORDER BY id LIMIT 1), (SELECT MAX(id) + 1 FROM scores), 0)"
+        return (await self.fetch_one("get_score_boundary", command, (received_before,)))[0]
+
+    async def delete_scores(self, before_id: int, limit: int) -> int:
+        command = "DELETE FROM scores WHERE id IN (SELECT id FROM scores WHERE id < ? ORDER BY id LIMIT ?)"
+        return await self.execute("delete_scores", command, (before_id, limit))
+
+    async def get_score_samples(self, limit: int) -> list[Any]:
+        command = "SELECT user_id, beatmap_md5, play_mode, mods, pp, completed FROM scores ORDER BY id DESC LIMIT ?"
+        return list(reversed(await self.fetch_all("get_score_samples", command, (limit,))))
@@ -3,14 +3,17 @@ import re
 from .api_base import APIClientBase
 from .logger import Logger
 
+TIMEOUTS = {"/clients": 3}
+CONCURRENCY = {"/clients": 2}
+
 
 class DeltaAPIClient(APIClientBase):
     def __init__(self, delta_base_url, api_token):
         self.logger = Logger(self.__class__.__name__)
 
-        super().__init__(delta_base_url, {"X-Ripple-Token": api_token})
+        super().__init__(delta_base_url, {"X-Ripple-Token": api_token}, TIMEOUTS, CONCURRENCY)
 
-    def get_client(self, client_identifier: str | int) -> dict:
+    async def get_client(self, client_identifier: str | int) -> dict:
         endpoint = "/clients"
         api_identifier_pattern = r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
 
@@ -19,8 +22,9 @@ class DeltaAPIClient(APIClientBase):
         else:
             raise ValueError("client_identifier must be a valid API Identifier or an integer")
 
-        response = self.get(endpoint)
+        response = await self.get(endpoint)
         return response
 
-    def is_online(self, client_identifier: str | int) -> bool:
-        return bool(self.get_client(client_identifier)["clients"])
+    async def is_online(self, client_identifier: str | int) -> bool:
+        response = await self.get_client(client_identifier)
+        return bool(response["clients"])
@@ -0,0 +1,253 @@
+import math
+
+import numpy as np
+
+from .osu_parser import ParsedBeatmap, SPINNER
+from .mods import ModBitwise
+
+EASY = 1 << ModBitwise.EZ.value
+HARD_ROCK = 1 << ModBitwise.HR.value
+DOUBLE_TIME = 1 << ModBitwise.DT.value
+NIGHTCORE = 1 << ModBitwise.NC.value
+HALF_TIME = 1 << ModBitwise.HT.value
+HIDDEN = 1 << ModBitwise.HD.value
+FLASHLIGHT = 1 << ModBitwise.FL.value
+NO_FAIL = 1 << ModBitwise.NF.value
+SPUN_OUT = 1 << ModBitwise.SO.value
+DIFFICULTY_MODS = EASY | HARD_ROCK | DOUBLE_TIME | HALF_TIME
+
+PLAYFIELD_CENTER = (256.0, 192.0)
+STRAIN_STEP = 400.0
+DECAY_WEIGHT = 0.9
+STAR_SCALING_FACTOR = 0.0675
+EXTREME_SCALING_FACTOR = 0.5
+DECAY_BLOCK = 60000.0
+AIM_DECAY = 0.15
+SPEED_DECAY = 0.3
+AIM_SCALING = 26.25
+SPEED_SCALING = 1400.0
+SINGLE_SPACING = 125.0
+MIN_STRAIN_TIME = 50.0
+MIN_SPEED_BONUS = 75.0
+MAX_SPEED_BONUS = 45.0
+ANGLE_BONUS_SCALE = 90.0
+AIM_TIMING_THRESHOLD = 107.0
+SPEED_ANGLE_BONUS_BEGIN = 5 * math.pi / 6
+AIM_ANGLE_BONUS_BEGIN = math.pi / 3
+CIRCLE_SIZE_BUFF_THRESHOLD = 30.0
+
+
+class DifficultyAttributes:
+    __slots__ = ("stars", "aim", "speed", "cs", "ar", "od", "hp", "objects", "circles", "spinners", "max_combo")
+
+    def __init__(self, stars: float, aim: float, speed: float, cs: float, ar: float, od: float, hp: float, objects: int, circles: int, spinners: int, max_combo: int):
+        self.stars = stars
+        self.aim = aim
+        self.speed = speed
+        self.cs = cs
+        self.ar = ar
+        self.od = od
+        self.hp = hp
+        self.objects = objects
+        self.circles = circles
+        self.spinners = spinners
+        self.max_combo = max_combo
+
+
+def normalize_mods(mods: int) -> int:
+    if mods & NIGHTCORE:
+        mods |= DOUBLE_TIME
+
+    return mods & DIFFICULTY_MODS
+
+
+def clock_rate(mods: int) -> float:
+    if mods & (DOUBLE_TIME | NIGHTCORE):
+        return 1.5
+
+    return 0.75 if mods & HALF_TIME else 1.0
+
+
+def apply_mods(beatmap: ParsedBeatmap, mods: int) -> tuple[float, float, float, float]:
+    if not mods & (DIFFICULTY_MODS | NIGHTCORE):
+        return beatmap.cs, beatmap.ar, beatmap.od, beatmap.hp
+
+    rate = clock_rate(mods)
+    multiplier = (1.4 if mods & HARD_ROCK else 1.0) * (0.5 if mods & EASY else 1.0)
+
+    cs = min(max(beatmap.cs * (0.5 if mods & EASY else 1.3 if mods & HARD_ROCK else 1.0), 0.0), 10.0)
+    hp = min(beatmap.hp * multiplier, 10.0)
+
+    ar = beatmap.ar * multiplier
+    preempt = min(max(1800 - 120 * ar if ar <= 5 else 1200 - 150 * (ar - 5), 450), 1800) / rate
+    ar = (1800 - preempt) / 120 if preempt > 1200 else 5 + (1200 - preempt) / 150
+
+    hit_window = min(max(80 - math.ceil(6 * beatmap.od * multiplier), 20), 80) / rate
+    od = (80 - hit_window) / 6
+
+    return cs, ar, od, hp
+
+
+def decayed_sums(times: np.ndarray, values: np.ndarray, base: float) -> np.ndarray:
+    strains = np.empty_like(values)
+    carry, carry_time = 0.0, times[0]
+    edges = [0, *(np.flatnonzero(np.diff((times - times[0]) // DECAY_BLOCK)) + 1).tolist(), len(times)]
+
+    for start, end in zip(edges[:-1], edges[1:]):
+        decay = base ** ((times[start:end] - times[start]) / 1000)
+        strains[start:end] = (np.cumsum(values[start:end] / decay) + carry * base ** ((times[start] - carry_time) / 1000)) * decay
+        carry, carry_time = strains[end - 1], times[end - 1]
+
+    return strains
+
+
+def weighted_peaks(times: np.ndarray, values: np.ndarray, base: float, rate: float) -> float:
+    strains = decayed_sums(times, values, base)
+
+    first_end = math.ceil(times[0] / STRAIN_STEP) * STRAIN_STEP
+    sections = np.maximum(np.ceil((times - first_end) / STRAIN_STEP), 0).astype(np.int64)
+
+    peaks = np.zeros(sections[-1] + 1)
+    np.maximum.at(peaks, sections, strains)
+
+    ends = first_end + STRAIN_STEP * np.arange(len(peaks) - 1)
+    last = np.searchsorted(times, ends, side="right") - 1
+    peaks[1:] = np.maximum(peaks[1:], strains[last] * base ** ((ends - times[last]) * rate / 1000))
+
+    peaks = np.sort(peaks)[::-1]
+    return float(np.dot(peaks, DECAY_WEIGHT ** np.arange(len(peaks))))
+
+
+def strain_values(beatmap: ParsedBeatmap, cs: float, rate: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    radius = 32 * (1 - 0.7 * (cs - 5) / 5)
+    scale = 52 / radius
+
+    if radius < CIRCLE_SIZE_BUFF_THRESHOLD:
+        scale *= 1 + min(CIRCLE_SIZE_BUFF_THRESHOLD - radius, 5) / 50
+
+    spinners = beatmap.kind == SPINNER
+    positions = np.column_stack((
+        np.where(spinners, PLAYFIELD_CENTER[0], beatmap.x),
+        np.where(spinners, PLAYFIELD_CENTER[1], beatmap.y)
+    )) * scale
+    times = beatmap.time / rate
+
+    delta = np.zeros(len(times))
+    delta[1:] = np.diff(times)
+
+    distance = np.zeros(len(times))
+    distance[1:] = np.hypot(*(positions[1:] - positions[:-1]).T)
+    distance[spinners] = 0
+
+    angle = np.full(len(times), np.nan)
+    before, after = positions[:-2] - positions[1:-1], positions[2:] - positions[1:-1]
+    angle[2:] = np.abs(np.arctan2(before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0], before[:, 0] * after[:, 0] + before[:, 1] * after[:, 1]))
+
+    previous_delta = np.concatenate(([0.0], delta[:-1]))
+    previous_distance = np.concatenate(([0.0], distance[:-1]))
+    strain_time = np.maximum(delta, MIN_STRAIN_TIME)
+    scored = ~spinners
+    scored[0] = False
+
+    with np.errstate(invalid="ignore"):
+        wide = angle > AIM_ANGLE_BONUS_BEGIN
+        sharp = angle < SPEED_ANGLE_BONUS_BEGIN
+        acute = angle < math.pi / 2
+        narrow = angle < math.pi / 4
+
+    aim_angle_bonus = np.sqrt(
+        np.maximum(previous_distance - ANGLE_BONUS_SCALE, 0)
+        * np.sin(np.where(wide, angle - AIM_ANGLE_BONUS_BEGIN, 0)) ** 2
+        * np.maximum(distance - ANGLE_BONUS_SCALE, 0)
+    )
+    spacing = distance ** 0.99
+    aim = np.maximum(
+        np.where(wide, 1.5 * aim_angle_bonus ** 0.99 / np.maximum(AIM_TIMING_THRESHOLD, np.maximum(previous_delta, MIN_STRAIN_TIME)), 0)
+        + spacing / np.maximum(strain_time, AIM_TIMING_THRESHOLD),
+        spacing / strain_time
+    )
+
+    capped = np.minimum(distance, SINGLE_SPACING)
+    speed_bonus = 1 + np.maximum((MIN_SPEED_BONUS - np.maximum(delta, MAX_SPEED_BONUS)) / 40, 0) ** 2
+
+    speed_angle_bonus = np.where(sharp, 1 + np.sin(1.5 * (SPEED_ANGLE_BONUS_BEGIN - np.where(sharp, angle, 0))) ** 2 / 3.57, 1.0)
+    close = np.minimum((ANGLE_BONUS_SCALE - capped) / 10, 1.0)
+    tight = np.where(narrow, 1.0, np.sin((math.pi / 2 - np.where(acute, angle, 0)) * 4 / math.pi))
+    speed_angle_bonus = np.where(acute, np.where(capped < ANGLE_BONUS_SCALE, 1.28 - 0.28 * close * tight, 1.28), speed_angle_bonus)
+
+    speed = (1 + (speed_bonus - 1) * 0.75) * speed_angle_bonus * (0.95 + speed_bonus * (capped / SINGLE_SPACING) ** 3.5) / strain_time
+
+    return times, np.where(scored, aim * AIM_SCALING, 0), np.where(scored, speed * SPEED_SCALING, 0)
+
+
+def calculate_difficulty(beatmap: ParsedBeatmap, mods: int) -> DifficultyAttributes:
+    cs, ar, od, hp = apply_mods(beatmap, mods)
+    aim = speed = 0.0
+
+    if beatmap.objects:
+        times, aim_values, speed_values = strain_values(beatmap, cs, clock_rate(mods))
+
+        aim = math.sqrt(weighted_peaks(times, aim_values, AIM_DECAY, clock_rate(mods))) * STAR_SCALING_FACTOR
+        speed = math.sqrt(weighted_peaks(times, speed_values, SPEED_DECAY, clock_rate(mods))) * STAR_SCALING_FACTOR
+
+    return DifficultyAttributes(
+        stars=aim + speed + abs(speed - aim) * EXTREME_SCALING_FACTOR,
+        aim=aim,
+        speed=speed,
+        cs=cs,
+        ar=ar,
+        od=od,
+        hp=hp,
+        objects=beatmap.objects,
+        circles=beatmap.circles,
+        spinners=beatmap.spinners,
+        max_combo=beatmap.max_combo
+    )
+
+
+def base_pp(stars: float) -> float:
+    return (5 * max(1.0, stars / STAR_SCALING_FACTOR) - 4) ** 3 / 100000
+
+
+def accuracy(count_300: int, count_100: int, count_50: int, count_miss: int) -> float:
+    hits = count_300 + count_100 + count_50 + count_miss
+    return (count_300 * 300 + count_100 * 100 + count_50 * 50) / (hits * 300) if hits else 0.0
+
+
+def calculate_pp(attributes: DifficultyAttributes, mods: int, combo: int, count_300: int, count_100: int, count_50: int, count_miss: int) -> float:
+    objects, ar, od = attributes.objects, attributes.ar, attributes.od
+
+    if not objects or not count_300 + count_100 + count_50 + count_miss:
+        return 0.0
+
+    played = accuracy(count_300, count_100, count_50, count_miss)
+    miss_ratio = 1 - (count_miss / objects) ** 0.775
+
+    length_bonus = 0.95 + 0.4 * min(1.0, objects / 2000) + (math.log10(objects / 2000) * 0.5 if objects > 2000 else 0.0)
+    aim_miss_penalty = 0.97 * miss_ratio ** count_miss if count_miss else 1.0
+    speed_miss_penalty = 0.97 * miss_ratio ** (count_miss ** 0.875) if count_miss else 1.0
+    combo_penalty = (combo / max(attributes.max_combo, 1)) ** 0.8
+    ar_factor = 0.4 * (ar - 10.33) if ar > 10.33 else 0.01 * (8 - ar) if ar < 8 else 0.0
+    ar_bonus = 1 + min(ar_factor, ar_factor * objects / 1000)
+    hidden_bonus = 1 + 0.04 * (12 - ar) if mods & HIDDEN else 1.0
+
+    aim = base_pp(attributes.aim) * length_bonus * aim_miss_penalty * combo_penalty * ar_bonus * hidden_bonus
+
+    if mods & FLASHLIGHT:
+        aim *= 1 + 0.35 * min(1.0, objects / 200) + (0.3 * min(1.0, (objects - 200) / 300) if objects > 200 else 0.0) + ((objects - 500) / 1200 if objects > 500 else 0.0)
+
+    aim *= (0.5 + played / 2) * (0.98 + od ** 2 / 2500)
+
+    speed = base_pp(attributes.speed) * length_bonus * speed_miss_penalty * combo_penalty * (ar_bonus if ar > 10.33 else 1.0) * hidden_bonus
+    speed *= (0.95 + od ** 2 / 750) * played ** ((14.5 - max(od, 8)) / 2)
+    speed *= 0.98 ** (count_50 - objects / 500 if count_50 >= objects / 500 else 0.0)
+
+    circle_accuracy = accuracy(max(count_300 - (objects - attributes.circles), 0), count_100, count_50, count_miss)
+    acc = 1.52163 ** od * circle_accuracy ** 24 * 2.83 * min(1.15, (attributes.circles / 1000) ** 0.3)
+    acc *= (1.08 if mods & HIDDEN else 1.0) * (1.02 if mods & FLASHLIGHT else 1.0)
+
+    multiplier = 1.12
+    multiplier *= max(0.9, 1 - 0.2 * count_miss) if mods & NO_FAIL else 1.0
+    multiplier *= 1 - (attributes.spinners / objects) ** 0.85 if mods & SPUN_OUT else 1.0
+
+    return (aim ** 1.1 + speed ** 1.1 + acc ** 1.1) ** (1 / 1.1) * multiplier
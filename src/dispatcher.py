@@ -0,0 +1,67 @@
+import asyncio
+import zlib
+from typing import Any, Awaitable, Callable
+
+from .logger import Logger
+
+
+class MessageDispatcher:
+    def __init__(self, handler: Callable[[Any], Awaitable[None]], workers: int, queue_size: int, enqueue_timeout: float):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.handler = handler
+        self.enqueue_timeout = enqueue_timeout
+        self.queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in range(workers)]
+
+        self.in_flight = 0
+        self.dispatched = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def get_queue(self, key: str) -> asyncio.Queue:
+        return self.queues[zlib.crc32(key.lower().encode()) % len(self.queues)]
+
+    async def submit(self, key: str, *args: Any) -> bool:
+        queue = self.get_queue(key)
+
+        try:
+            queue.put_nowait(args)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(queue.put(args), self.enqueue_timeout)
+            except TimeoutError:
+                self.dropped += 1
+                self.logger.warning(f"Dropped message from '{key}': worker queue is saturated")
+                return False
+
+        self.dispatched += 1
+        return True
+
+    async def run(self):
+        await asyncio.gather(*[self.work(queue) for queue in self.queues])
+
+    async def work(self, queue: asyncio.Queue):
+        while True:
+            args = await queue.get()
+            self.in_flight += 1
+
+            try:
+                await self.handler(*args)
+            except Exception as e:
+                self.failed += 1
+                self.logger.error(f"Handler failed: {e!r}")
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+                queue.task_done()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": sum(queue.qsize() for queue in self.queues),
+            "in_flight": self.in_flight,
+            "dispatched": self.dispatched,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
@@ -9,3 +9,10 @@ class AbortException(Exception):
         self.log_message = log_message
 
         super().__init__(message)
+
+
+class APIException(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+        super().__init__(message)
@@ -2,68 +2,103 @@ import ssl
 import asyncio
 
 from .logger import Logger
+from .metrics import METRICS
 from .irc_command import IRCCommand
+from .send_queue import SendQueue, MessagePriority
+from .traffic_recorder import TrafficRecorder, IRC_STREAM
 
 JOIN_TIMEOUT = 5
+REGISTER_TIMEOUT = 15
+MAX_LINE_BYTES = 512
 
 
 class IRCClient:
-    def __init__(self, host: str, port: int, channels: list[str], default_channel: str, nickname: str, password: str):
+    def __init__(self, host: str, port: int, channels: list[str], default_channel: str, nickname: str, password: str, use_ssl: bool = True, recorder: TrafficRecorder | None = None):
         self.logger = Logger(self.__class__.__name__)
 
         self.host = host
         self.port = port
+        self.use_ssl = use_ssl
+        self.recorder = recorder
         self.channels = channels
         self.default_channel = default_channel
         self.nickname = nickname
         self.password = password
 
         self.connected = asyncio.Event()
+        self.registered = asyncio.Event()
+        self.ready = asyncio.Event()
         self.joined = asyncio.Event()
+        self.pending_channels: set[str] = set()
         self.alive = asyncio.Event()
         self.reader: asyncio.StreamReader | None = None
         self.writer: asyncio.StreamWriter | None = None
+        self.queue = SendQueue(self.send, self.ready)
 
     async def _open_connection(self):
-        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
+        context = None
+
+        if self.use_ssl:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
 
         self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
 
     async def connect(self):
         self.logger.log(f"Connecting to {self.host}...")
         await self._open_connection()
-        await asyncio.sleep(1)
 
-        self.logger.log("Authenticating with /PASS method...")
-        await self.auth(self.password)
-        await asyncio.sleep(1)
+        self.registered.clear()
+        self.connected.set()
 
-        self.logger.log(f"Setting nickname '{self.nickname}'...")
-        await self.nick(self.nickname)
-        await asyncio.sleep(1)
+        self.logger.log(f"Registering as '{self.nickname}' with /PASS method...")
+        await self.send(IRCCommand.PASS.compose(self.password) + IRCCommand.NICK.compose(self.nickname) + IRCCommand.USER.compose(self.nickname))
 
-        self.logger.log(f"Setting user '{self.nickname}'...")
-        await self.user(self.nickname)
-        await asyncio.sleep(1)
+    async def wait_registered(self):
+        try:
+            await asyncio.wait_for(self.registered.wait(), REGISTER_TIMEOUT)
+        except TimeoutError:
+            raise RuntimeError("Timed out waiting for the server to accept registration")
 
         self.logger.log("Connected!\n")
-        self.connected.set()
 
     async def disconnect(self):
-        self.writer.close()
-        await self.writer.wait_closed()
+        self.connected.clear()
+        self.registered.clear()
+        self.ready.clear()
+
+        if self.writer is not None:
+            self.writer.close()
+
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+            self.writer = None
 
         self.logger.log("Disconnected!\n")
 
     async def send(self, message: str):
-        self.writer.write(message.encode())
-        await self.writer.drain()
+        if self.writer is None:
+            raise ConnectionError("Not connected")
+
+        data = message.encode()
+
+        with METRICS.timer("irc_send_seconds", "Time to write and drain an IRC send"):
+            self.writer.write(data)
+            await self.writer.drain()
+
+        METRICS.counter("irc_sent_bytes_total", "Bytes written to the IRC connection").inc(len(data))
 
     async def recv(self) -> str:
-        message = await self.reader.readline()
-        return message.decode()
+        message = (await self.reader.readline()).decode()
+
+        if self.recorder is not None and message:
+            self.recorder.record(IRC_STREAM, message)
+
+        return message
 
     async def heartbeat(self, timeout: int):
         try:
@@ -74,23 +109,57 @@ class IRCClient:
             raise RuntimeError(f"Connection lost!")
 
     async def join_channels(self):
-        await self.connected.wait()
-        await asyncio.sleep(1)
+        await self.registered.wait()
 
         self.logger.log(f"Joining channel(s): {self.channels}...")
 
-        for channel in self.channels:
-            self.joined.clear()
-            await self.join(channel)
+        self.pending_channels = {channel.lower() for channel in self.channels}
+        self.joined.clear()
+
+        for batch in self.batch_channels():
+            await self.join(",".join(batch))
+
+        try:
             await asyncio.wait_for(self.joined.wait(), JOIN_TIMEOUT)
+        except TimeoutError:
+            self.logger.warning(f"Timed out waiting to join channel(s): {sorted(self.pending_channels)}")
+
+        self.ready.set()
+
+    def batch_channels(self) -> list[list[str]]:
+        batches = []
+        batch = []
+        size = len(IRCCommand.JOIN.compose(""))
+
+        for channel in self.channels:
+            channel_size = len(channel.encode()) + 1
+
+            if batch and size + channel_size > MAX_LINE_BYTES:
+                batches.append(batch)
+                batch = []
+                size = len(IRCCommand.JOIN.compose(""))
+
+            batch.append(channel)
+            size += channel_size
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def mark_joined(self, channel: str):
+        self.pending_channels.discard(channel.lower())
+
+        if not self.pending_channels:
+            self.joined.set()
 
     async def privmsg(self, *args, **kwargs):
         channel = kwargs["channel"] if "channel" in kwargs else self.default_channel
+        priority = kwargs["priority"] if "priority" in kwargs else MessagePriority.HIGH
 
         for msg in args:
-            message = IRCCommand.PRIVMSG.compose(channel, msg)
-            self.logger.log(f":{self.nickname}!127.0.0.1 {message}")
-            await self.send(message)
+            self.logger.info(f":{self.nickname}!127.0.0.1 {IRCCommand.PRIVMSG.compose(channel, msg)}", category="chat_out")
+            self.queue.put(channel, IRCCommand.PRIVMSG, msg, priority)
 
     async def auth(self, password: str):
         message = IRCCommand.PASS.compose(password)
@@ -114,11 +183,11 @@ class IRCClient:
 
     async def notice(self, *args, **kwargs):
         channel = kwargs["channel"] if "channel" in kwargs else self.default_channel
+        priority = kwargs["priority"] if "priority" in kwargs else MessagePriority.HIGH
 
         for msg in args:
-            message = IRCCommand.NOTICE.compose(channel, msg)
-            self.logger.log(f":{self.nickname}!127.0.0.1 {message}")
-            await self.send(message)
+            self.logger.info(f":{self.nickname}!127.0.0.1 {IRCCommand.NOTICE.compose(channel, msg)}", category="chat_out")
+            self.queue.put(channel, IRCCommand.NOTICE, msg, priority)
 
     async def quit(self):
         message = IRCCommand.QUIT.compose()
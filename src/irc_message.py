@@ -0,0 +1,80 @@
+class IRCMessage:
+    __slots__ = ("raw", "tags", "prefix", "nick", "command", "params", "trailing")
+
+    def __init__(self, raw: str, tags: dict[str, str] | None, prefix: str | None, nick: str | None, command: str, params: list[str], trailing: str | None):
+        self.raw = raw
+        self.tags = tags
+        self.prefix = prefix
+        self.nick = nick
+        self.command = command
+        self.params = params
+        self.trailing = trailing
+
+    @property
+    def target(self) -> str:
+        return self.params[0] if self.params else ""
+
+    @property
+    def is_numeric(self) -> bool:
+        return len(self.command) == 3 and self.command.isdigit()
+
+    @staticmethod
+    def parse_tags(raw_tags: str) -> dict[str, str]:
+        tags = {}
+
+        for tag in raw_tags.split(";"):
+            key, _, value = tag.partition("=")
+            tags[key] = value.replace("\\:", ";").replace("\\s", " ").replace("\\\\", "\\")
+
+        return tags
+
+    @classmethod
+    def parse(cls, line: str) -> "IRCMessage | None":
+        raw = line.rstrip("\r\n")
+
+        if not raw.strip():
+            return None
+
+        position = 0
+        tags = None
+        prefix = None
+        nick = None
+
+        if raw[0] == "@":
+            position = raw.find(" ")
+
+            if position == -1:
+                return None
+
+            tags = cls.parse_tags(raw[1:position])
+            position += 1
+
+        if raw.startswith(":", position):
+            end = raw.find(" ", position)
+
+            if end == -1:
+                return None
+
+            prefix = raw[position + 1:end]
+            bang = prefix.find("!")
+            nick = prefix[:bang] if bang != -1 else prefix
+            position = end + 1
+
+        trailing_start = raw.find(" :", position)
+
+        if trailing_start != -1:
+            params = raw[position:trailing_start].split()
+            trailing = raw[trailing_start + 2:]
+        else:
+            params = raw[position:].split()
+            trailing = None
+
+        if not params:
+            return None
+
+        command = params.pop(0).upper()
+
+        if trailing is not None:
+            params.append(trailing)
+
+        return cls(raw, tags, prefix, nick, command, params, trailing)
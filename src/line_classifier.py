@@ -0,0 +1,41 @@
+from enum import Enum, auto
+
+from .irc_message import IRCMessage
+
+
+class LineClass(Enum):
+    COMMAND = auto()
+    ACTION = auto()
+    DIRECT = auto()
+    KEYWORD = auto()
+    IGNORED = auto()
+
+
+class LineClassifier:
+    def __init__(self, command_prefix: str, nickname: str, keywords: list[str]):
+        self.command_prefix = command_prefix
+        self.nickname = nickname.lower()
+        self.keywords = tuple(keywords)
+
+        self.counts = {line_class: 0 for line_class in LineClass}
+
+    def classify(self, message: IRCMessage) -> LineClass:
+        text = message.params[-1]
+
+        if text.startswith(self.command_prefix):
+            line_class = LineClass.COMMAND
+        elif text.startswith(("\x01ACTION", "ACTION")):
+            line_class = LineClass.ACTION
+        elif message.target.lower() == self.nickname:
+            line_class = LineClass.DIRECT
+        elif any(keyword in text for keyword in self.keywords):
+            line_class = LineClass.KEYWORD
+        else:
+            line_class = LineClass.IGNORED
+
+        self.counts[line_class] += 1
+
+        return line_class
+
+    def stats(self) -> dict[str, int]:
+        return {line_class.name.lower(): count for line_class, count in self.counts.items()}
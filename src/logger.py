@@ -1,9 +1,118 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
 from typing import Any
 
+from .config import log_level, log_json, log_rate_limits
+
+ROOT_LOGGER = "ripplechatbot"
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        level = f"{record.levelname}: " if record.levelno >= logging.WARNING else ""
+        return f"[{record.component}] {level}{record.getMessage()}{record.suppressed_note}\n"
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "component": record.component,
+            "message": record.getMessage()
+        }
+
+        if record.category:
+            entry["category"] = record.category
+
+        if record.suppressed:
+            entry["suppressed"] = record.suppressed
+
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class CategoryRateLimiter(logging.Filter):
+    def __init__(self, limits: dict[str, float]):
+        super().__init__()
+
+        self.limits = limits
+        self.tokens = {category: float(limit) for category, limit in limits.items()}
+        self.updated_at = {category: time.monotonic() for category in limits}
+        self.suppressed = {category: 0 for category in limits}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = record.category
+        record.suppressed = 0
+        record.suppressed_note = ""
+
+        if category not in self.limits:
+            return True
+
+        now = time.monotonic()
+        limit = self.limits[category]
+
+        self.tokens[category] = min(limit, self.tokens[category] + (now - self.updated_at[category]) * limit)
+        self.updated_at[category] = now
+
+        if self.tokens[category] < 1:
+            self.suppressed[category] += 1
+            return False
+
+        self.tokens[category] -= 1
+
+        if self.suppressed[category]:
+            record.suppressed = self.suppressed[category]
+            record.suppressed_note = f" ({record.suppressed} similar '{category}' line(s) suppressed)"
+            self.suppressed[category] = 0
+
+        return True
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter() if log_json else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(CategoryRateLimiter(log_rate_limits))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(log_level.upper())
+    root.addHandler(queue_handler)
+    root.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
+
+
+LISTENER = setup_logging()
+
 
 class Logger:
     def __init__(self, name: str):
         self.name = name
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+    def log(self, data: Any, level: int = logging.INFO, category: str = None):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, str(data).rstrip(), extra={"component": self.name, "category": category})
+
+    def debug(self, data: Any, category: str = None):
+        self.log(data, logging.DEBUG, category)
+
+    def info(self, data: Any, category: str = None):
+        self.log(data, logging.INFO, category)
+
+    def warning(self, data: Any, category: str = None):
+        self.log(data, logging.WARNING, category)
 
-    def log(self, data: Any):
-        print(f"[{self.name}] {str(data).rstrip()}\n")
+    def error(self, data: Any, category: str = None):
+        self.log(data, logging.ERROR, category)
@@ -0,0 +1,190 @@
+import time
+import asyncio
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable
+
+from .logger import Logger
+
+NAMESPACE = "ripplechatbot"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+
+        return float("inf")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.help: dict[str, tuple[str, str]] = {}
+        self.counters: dict[tuple[str, tuple], Counter] = {}
+        self.histograms: dict[tuple[str, tuple], Histogram] = {}
+        self.gauges: dict[str, Callable[[], dict[str, float]]] = {}
+
+    def counter(self, name: str, description: str, **labels: str) -> Counter:
+        key = (name, tuple(labels.items()))
+        counter = self.counters.get(key)
+
+        if counter is None:
+            self.help.setdefault(name, ("counter", description))
+            counter = self.counters[key] = Counter()
+
+        return counter
+
+    def histogram(self, name: str, description: str, **labels: str) -> Histogram:
+        key = (name, tuple(labels.items()))
+        histogram = self.histograms.get(key)
+
+        if histogram is None:
+            self.help.setdefault(name, ("histogram", description))
+            histogram = self.histograms[key] = Histogram()
+
+        return histogram
+
+    def merged(self, name: str) -> Histogram:
+        merged = Histogram()
+
+        for (histogram_name, _), histogram in self.histograms.items():
+            if histogram_name == name:
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+
+        return merged
+
+    def gauge(self, name: str, callback: Callable[[], dict[str, float]]):
+        self.gauges[name] = callback
+
+    @contextmanager
+    def timer(self, name: str, description: str, **labels: str):
+        histogram = self.histogram(name, description, **labels)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def format_labels(labels: tuple, extra: str = "") -> str:
+        parts = [f'{key}="{str(value).replace("\\", "\\\\").replace('"', '\\"')}"' for key, value in labels]
+
+        if extra:
+            parts.append(extra)
+
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        lines = []
+        described = set()
+
+        def describe(name: str):
+            if name not in described:
+                described.add(name)
+                metric_type, description = self.help[name]
+                lines.append(f"# HELP {NAMESPACE}_{name} {description}")
+                lines.append(f"# TYPE {NAMESPACE}_{name} {metric_type}")
+
+        for (name, labels), counter in sorted(self.counters.items()):
+            describe(name)
+            lines.append(f"{NAMESPACE}_{name}{self.format_labels(labels)} {counter.value}")
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            describe(name)
+            cumulative = 0
+
+            for bucket, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f"{NAMESPACE}_{name}_bucket{self.format_labels(labels, f'le="{bucket}"')} {cumulative}")
+
+            lines.append(f"{NAMESPACE}_{name}_bucket{self.format_labels(labels, 'le="+Inf"')} {histogram.count}")
+            lines.append(f"{NAMESPACE}_{name}_sum{self.format_labels(labels)} {histogram.sum}")
+            lines.append(f"{NAMESPACE}_{name}_count{self.format_labels(labels)} {histogram.count}")
+
+        for name, callback in sorted(self.gauges.items()):
+            for key, value in callback().items():
+                lines.append(f"# TYPE {NAMESPACE}_{name}_{key} gauge")
+                lines.append(f"{NAMESPACE}_{name}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, host: str, port: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.registry = registry
+        self.host = host
+        self.port = port
+
+    async def run(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.logger.log(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+        async with server:
+            await server.serve_forever()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass
+
+            parts = request_line.decode(errors="replace").split()
+
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (ConnectionError, TimeoutError):
+            pass
+        finally:
+            writer.close()
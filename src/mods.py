@@ -58,3 +58,17 @@ class ModBitwise(Enum):
                 mod_list.append(name)
 
         return mod_list
+
+    @classmethod
+    def string_to_bitwise(cls, text: str) -> int | None:
+        text = text.upper().lstrip("+")
+
+        if text == "NOMOD":
+            return 0
+
+        names = [text[index:index + 2] for index in range(0, len(text), 2)]
+
+        if not names or any(name not in cls.__members__ for name in names):
+            return None
+
+        return sum(1 << cls[name].value for name in set(names))
@@ -0,0 +1,61 @@
+import re
+
+from .action_phrase import ActionPhrase
+from .mods import MOD_NAMES
+
+ACTION_PHRASES = {action_phrase.value: action_phrase for action_phrase in ActionPhrase}
+
+NP_PATTERN = re.compile(
+    r"^\x01?ACTION (?P<phrase>" + "|".join(re.escape(phrase) for phrase in ACTION_PHRASES) + r") "
+    r"\[https?://osu\.(?:ripple\.moe|ppy\.sh)/beatmapsets/(?P<beatmapset_id>\d+)#(?:osu|taiko|fruits|mania)?/(?P<beatmap_id>\d+) "
+    r"(?P<body>.*)\](?P<mods>[^\]]*)$"
+)
+
+
+class NowPlaying:
+    __slots__ = ("action", "beatmapset_id", "beatmap_id", "artist", "title", "difficulty", "mods")
+
+    def __init__(self, action: ActionPhrase, beatmapset_id: int, beatmap_id: int, artist: str, title: str, difficulty: str, mods: list[str]):
+        self.action = action
+        self.beatmapset_id = beatmapset_id
+        self.beatmap_id = beatmap_id
+        self.artist = artist
+        self.title = title
+        self.difficulty = difficulty
+        self.mods = mods
+
+    @property
+    def song(self) -> str:
+        return f"{self.artist} - {self.title}" if self.artist else self.title
+
+
+def parse_np(message: str) -> NowPlaying | None:
+    match = NP_PATTERN.match(message.rstrip())
+
+    if match is None:
+        return None
+
+    action = ACTION_PHRASES[match.group("phrase")]
+    body = match.group("body")
+    difficulty = ""
+
+    if action is not ActionPhrase.LISTENING:
+        if not body.endswith("]"):
+            return None
+
+        difficulty_start = body.rfind(" [")
+
+        if difficulty_start == -1:
+            return None
+
+        difficulty = body[difficulty_start + 2:-1]
+        body = body[:difficulty_start]
+
+    artist, separator, title = body.partition(" - ")
+
+    if not separator:
+        artist, title = "", body
+
+    mods = [MOD_NAMES[token] for token in match.group("mods").strip("\x01 ").split() if token in MOD_NAMES]
+
+    return NowPlaying(action, int(match.group("beatmapset_id")), int(match.group("beatmap_id")), artist, title, difficulty, mods)
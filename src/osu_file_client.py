@@ -0,0 +1,20 @@
+import requests
+
+from .api_base import APIClientBase
+from .logger import Logger
+
+TIMEOUTS = {"/osu": 10}
+CONCURRENCY = {"/osu": 2}
+
+
+class OsuFileClient(APIClientBase):
+    def __init__(self, base_url: str):
+        self.logger = Logger(self.__class__.__name__)
+
+        super().__init__(base_url, {}, TIMEOUTS, CONCURRENCY)
+
+    def decode(self, response: requests.Response) -> bytes | None:
+        return response.content if response.status_code == 200 and response.content else None
+
+    async def get_osu_file(self, beatmap_id: int, md5: str | None = None) -> bytes | None:
+        return await self.get(f"/osu/{beatmap_id}")
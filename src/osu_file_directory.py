@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .osu_file_client import OsuFileClient
+from .exceptions import APIException
+from .logger import Logger
+
+MISMATCH_TTL = 60 * 60 * 6
+
+
+class OsuFileDirectory:
+    def __init__(self, path: str, fallback: OsuFileClient | None = None):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.path = path
+        self.fallback = fallback
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+        self.mismatches: OrderedDict[tuple[int, str], float] = OrderedDict()
+
+        self.reads = 0
+        self.downloads = 0
+        self.outdated = 0
+        self.missing = 0
+        self.mismatched = 0
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def file(self, beatmap_id: int) -> str:
+        return os.path.join(self.path, f"{beatmap_id}.osu")
+
+    def read(self, beatmap_id: int) -> bytes | None:
+        try:
+            with open(self.file(beatmap_id), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.warning(f"Failed to read beatmap {beatmap_id}: {e!r}")
+            return None
+
+    def write(self, beatmap_id: int, data: bytes):
+        temporary = f"{self.file(beatmap_id)}.tmp"
+
+        with open(temporary, "wb") as file:
+            file.write(data)
+
+        os.replace(temporary, self.file(beatmap_id))
+
+    def is_final(self, beatmap_id: int, md5: str | None) -> bool:
+        if self.fallback is None:
+            return True
+
+        cutoff = time.monotonic() - MISMATCH_TTL
+
+        while self.mismatches and next(iter(self.mismatches.values())) < cutoff:
+            self.mismatches.popitem(last=False)
+
+        return (beatmap_id, md5) in self.mismatches
+
+    async def get_osu_file(self, beatmap_id: int, md5: str | None = None) -> bytes | None:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self.executor, self.read, beatmap_id)
+
+        if data is not None and (md5 is None or hashlib.md5(data).hexdigest() == md5 or self.is_final(beatmap_id, md5)):
+            self.reads += 1
+            return data
+
+        if self.fallback is None:
+            self.missing += 1
+            return None
+
+        if data is not None:
+            self.outdated += 1
+
+        try:
+            downloaded = await self.fallback.get_osu_file(beatmap_id, md5)
+        except APIException as e:
+            self.logger.warning(f"Failed to download beatmap {beatmap_id}: {e.message}")
+            return data
+
+        if downloaded is None:
+            self.missing += 1
+            return data
+
+        actual = hashlib.md5(downloaded).hexdigest()
+
+        if md5 is not None and actual != md5:
+            self.mismatched += 1
+            self.mismatches[(beatmap_id, md5)] = time.monotonic()
+            self.mismatches.move_to_end((beatmap_id, md5))
+            self.logger.warning(f"Downloaded beatmap {beatmap_id} is {actual}, not {md5}; not retrying for {MISMATCH_TTL}s")
+
+        try:
+            await loop.run_in_executor(self.executor, self.write, beatmap_id, downloaded)
+        except OSError as e:
+            self.logger.error(f"Failed to store beatmap {beatmap_id}: {e!r}")
+
+        self.downloads += 1
+        return downloaded
+
+    def close(self):
+        if self.fallback is not None:
+            self.fallback.close()
+
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "reads": self.reads,
+            "downloads": self.downloads,
+            "outdated": self.outdated,
+            "missing": self.missing,
+            "mismatched": self.mismatched
+        }
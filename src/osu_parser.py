@@ -0,0 +1,138 @@
+import hashlib
+
+import numpy as np
+
+CIRCLE = 1
+SLIDER = 2
+SPINNER = 8
+DEFAULT_SLIDER_MULTIPLIER = 1.4
+DEFAULT_TICK_RATE = 1.0
+MIN_VELOCITY = 0.1
+MAX_VELOCITY = 10.0
+
+
+class ParsedBeatmap:
+    __slots__ = ("md5", "mode", "cs", "od", "ar", "hp", "x", "y", "time", "kind", "combo")
+
+    def __init__(self, md5: str, mode: int, cs: float, od: float, ar: float, hp: float, x: np.ndarray, y: np.ndarray, time: np.ndarray, kind: np.ndarray, combo: np.ndarray):
+        self.md5 = md5
+        self.mode = mode
+        self.cs = cs
+        self.od = od
+        self.ar = ar
+        self.hp = hp
+        self.x = x
+        self.y = y
+        self.time = time
+        self.kind = kind
+        self.combo = combo
+
+    @property
+    def objects(self) -> int:
+        return len(self.time)
+
+    @property
+    def circles(self) -> int:
+        return int(np.count_nonzero(self.kind == CIRCLE))
+
+    @property
+    def spinners(self) -> int:
+        return int(np.count_nonzero(self.kind == SPINNER))
+
+    @property
+    def max_combo(self) -> int:
+        return int(self.combo.sum())
+
+    def memory_usage(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ("x", "y", "time", "kind", "combo"))
+
+
+def slider_combo(times: np.ndarray, repeats: np.ndarray, lengths: np.ndarray, timing_points: list[tuple[float, float]], slider_multiplier: float, tick_rate: float) -> np.ndarray:
+    if not timing_points or slider_multiplier <= 0:
+        return repeats + 1
+
+    points = np.array(timing_points, dtype=np.float64)
+    points = points[np.argsort(points[:, 0], kind="stable")]
+
+    beat_lengths = points[np.maximum(np.searchsorted(points[:, 0], times, side="right") - 1, 0), 1]
+    inherited = beat_lengths < 0
+
+    velocity = np.ones(len(times))
+    velocity[inherited] = np.clip(-100 / beat_lengths[inherited], MIN_VELOCITY, MAX_VELOCITY)
+
+    beats = lengths * repeats / (slider_multiplier * 100 * velocity)
+    ticks = np.ceil((beats - 0.1) / repeats * tick_rate).astype(np.int64)
+
+    return np.maximum(ticks * repeats + 1, 0)
+
+
+def parse_osu(data: bytes) -> ParsedBeatmap:
+    settings: dict[str, str] = {}
+    timing_points: list[tuple[float, float]] = []
+    objects: list[tuple[float, float, float, int, int, float]] = []
+    section = ""
+
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        line = line.strip()
+
+        if not line or line.startswith("//"):
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1]
+            continue
+
+        match section:
+            case "General" | "Difficulty":
+                key, _, value = line.partition(":")
+                settings[key.strip()] = value.strip()
+            case "TimingPoints":
+                fields = line.split(",")
+
+                if len(fields) >= 2:
+                    timing_points.append((float(fields[0]), float(fields[1])))
+            case "HitObjects":
+                fields = line.split(",")
+
+                if len(fields) < 4:
+                    continue
+
+                kind = int(fields[3])
+                repeats, length = 1, 0.0
+
+                if kind & SLIDER and len(fields) >= 8:
+                    repeats, length = max(int(fields[6]), 1), float(fields[7])
+
+                objects.append((float(fields[0]), float(fields[1]), float(fields[2]), kind & (CIRCLE | SLIDER | SPINNER), repeats, length))
+
+    if objects:
+        x, y, time, kind, repeats, length = (np.array(column) for column in zip(*objects))
+    else:
+        x, y, time, kind, repeats, length = (np.zeros(0) for _ in range(6))
+
+    kind = kind.astype(np.uint8)
+    combo = np.ones(len(objects), np.int64)
+    sliders = (kind & SLIDER) != 0
+
+    combo[sliders] = slider_combo(
+        time[sliders], repeats[sliders].astype(np.int64), length[sliders], timing_points,
+        float(settings.get("SliderMultiplier", DEFAULT_SLIDER_MULTIPLIER)),
+        float(settings.get("SliderTickRate", DEFAULT_TICK_RATE))
+    )
+
+    od = float(settings.get("OverallDifficulty", 5))
+    ar = settings.get("ApproachRate")
+
+    return ParsedBeatmap(
+        md5=hashlib.md5(data).hexdigest(),
+        mode=int(settings.get("Mode", 0)),
+        cs=float(settings.get("CircleSize", 5)),
+        od=od,
+        ar=float(ar) if ar is not None else od,
+        hp=float(settings.get("HPDrainRate", 5)),
+        x=x.astype(np.float32),
+        y=y.astype(np.float32),
+        time=time.astype(np.float64),
+        kind=np.where(kind & SPINNER, SPINNER, np.where(kind & SLIDER, SLIDER, CIRCLE)).astype(np.uint8),
+        combo=combo.astype(np.uint32)
+    )
@@ -1,14 +1,18 @@
 from .api_base import APIClientBase
 from .logger import Logger
 
+TIMEOUTS = {"/get_beatmaps": 5}
+CONCURRENCY = {"/get_beatmaps": 4}
+HEDGED = {"/get_beatmaps"}
+
 
 class PeppyAPIClient(APIClientBase):
     def __init__(self, peppy_base_url):
         self.logger = Logger(self.__class__.__name__)
 
-        super().__init__(peppy_base_url, {})
+        super().__init__(peppy_base_url, {}, TIMEOUTS, CONCURRENCY, HEDGED)
 
-    def get_beatmaps(self, **kwargs) -> list[dict]:
+    async def get_beatmaps(self, **kwargs) -> list[dict]:
         endpoint = "/get_beatmaps"
         query_params = []
 
@@ -16,8 +20,14 @@ class PeppyAPIClient(APIClientBase):
             match key:
                 case "h":
                     query_params.append("h={}".format(value))
+                case "b":
+                    query_params.append("b={}".format(value))
+                case "s":
+                    query_params.append("s={}".format(value))
+                case "limit":
+                    query_params.append("limit={}".format(value))
 
         query = "?" + "&".join(query_params)
 
-        response = self.get(endpoint, query)
+        response = await self.get(endpoint, query)
         return response
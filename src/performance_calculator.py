@@ -0,0 +1,156 @@
+import time
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .osu_parser import ParsedBeatmap, parse_osu
+from .difficulty import DifficultyAttributes, calculate_difficulty, calculate_pp, normalize_mods
+from .osu_file_directory import OsuFileDirectory
+from .play_mode import PlayMode
+from .score import Score
+from .exceptions import APIException
+from .logger import Logger
+
+
+class PerformanceCalculator:
+    def __init__(self, source: OsuFileDirectory, parsed_cache_size: int, attributes_cache_size: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.source = source
+        self.parsed_cache_size = parsed_cache_size
+        self.attributes_cache_size = attributes_cache_size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+
+        self.parsed: OrderedDict[int, ParsedBeatmap] = OrderedDict()
+        self.attributes: OrderedDict[tuple[int, int], tuple[str, DifficultyAttributes]] = OrderedDict()
+        self.loading: dict[tuple[int, str | None], asyncio.Task] = {}
+
+        self.parsed_hits = 0
+        self.parsed_misses = 0
+        self.attribute_hits = 0
+        self.attribute_misses = 0
+        self.unavailable = 0
+        self.parse_seconds = 0.0
+        self.difficulty_seconds = 0.0
+
+    def parse(self, data: bytes) -> ParsedBeatmap:
+        start = time.perf_counter()
+        beatmap = parse_osu(data)
+        self.parse_seconds += time.perf_counter() - start
+
+        return beatmap
+
+    def calculate(self, beatmap: ParsedBeatmap, mods: int) -> DifficultyAttributes:
+        start = time.perf_counter()
+        attributes = calculate_difficulty(beatmap, mods)
+        self.difficulty_seconds += time.perf_counter() - start
+
+        return attributes
+
+    async def load(self, beatmap_id: int, md5: str | None) -> ParsedBeatmap | None:
+        try:
+            data = await self.source.get_osu_file(beatmap_id, md5)
+        except APIException as e:
+            self.logger.warning(f"Failed to fetch beatmap {beatmap_id}: {e.message}")
+            data = None
+
+        if data is None:
+            self.unavailable += 1
+            return None
+
+        try:
+            beatmap = await asyncio.get_running_loop().run_in_executor(self.executor, self.parse, data)
+        except ValueError as e:
+            self.logger.warning(f"Failed to parse beatmap {beatmap_id}: {e!r}")
+            self.unavailable += 1
+            return None
+
+        self.parsed[beatmap_id] = beatmap
+        self.parsed.move_to_end(beatmap_id)
+
+        while len(self.parsed) > self.parsed_cache_size:
+            self.parsed.popitem(last=False)
+
+        return beatmap
+
+    def is_current(self, beatmap_id: int, cached_md5: str, md5: str | None) -> bool:
+        return md5 is None or cached_md5 == md5 or self.source.is_final(beatmap_id, md5)
+
+    async def beatmap(self, beatmap_id: int, md5: str | None = None) -> ParsedBeatmap | None:
+        beatmap = self.parsed.get(beatmap_id)
+
+        if beatmap is not None and self.is_current(beatmap_id, beatmap.md5, md5):
+            self.parsed.move_to_end(beatmap_id)
+            self.parsed_hits += 1
+            return beatmap
+
+        self.parsed_misses += 1
+        key = (beatmap_id, md5)
+        task = self.loading.get(key)
+
+        if task is None:
+            task = self.loading[key] = asyncio.create_task(self.load(beatmap_id, md5), name="Beatmap Parse Task")
+            task.add_done_callback(lambda _: self.loading.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def difficulty(self, beatmap_id: int, mods: int, md5: str | None = None) -> DifficultyAttributes | None:
+        key = (beatmap_id, normalize_mods(mods))
+        entry = self.attributes.get(key)
+
+        if entry is not None and self.is_current(beatmap_id, entry[0], md5):
+            self.attributes.move_to_end(key)
+            self.attribute_hits += 1
+            return entry[1]
+
+        beatmap = await self.beatmap(beatmap_id, md5)
+
+        if beatmap is None or beatmap.mode != PlayMode.STANDARD.value:
+            return None
+
+        self.attribute_misses += 1
+        attributes = await asyncio.get_running_loop().run_in_executor(self.executor, self.calculate, beatmap, key[1])
+
+        self.attributes[key] = (beatmap.md5, attributes)
+        self.attributes.move_to_end(key)
+
+        while len(self.attributes) > self.attributes_cache_size:
+            self.attributes.popitem(last=False)
+
+        return attributes
+
+    async def performance(self, score: Score, beatmap_id: int) -> tuple[DifficultyAttributes, float, float] | None:
+        if score.play_mode != PlayMode.STANDARD.value:
+            return None
+
+        attributes = await self.difficulty(beatmap_id, score.mods, score.beatmap_md5)
+
+        if attributes is None:
+            return None
+
+        pp = calculate_pp(attributes, score.mods, score.max_combo, score.count_300, score.count_100, score.count_50, score.count_miss)
+        full_combo_pp = calculate_pp(
+            attributes, score.mods, attributes.max_combo,
+            max(attributes.objects - score.count_100 - score.count_50, 0), score.count_100, score.count_50, 0
+        )
+
+        return attributes, pp, full_combo_pp
+
+    def close(self):
+        self.source.close()
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "parsed": len(self.parsed),
+            "parsed_bytes": sum(beatmap.memory_usage() for beatmap in self.parsed.values()),
+            "attributes": len(self.attributes),
+            "parsed_hits": self.parsed_hits,
+            "parsed_misses": self.parsed_misses,
+            "attribute_hits": self.attribute_hits,
+            "attribute_misses": self.attribute_misses,
+            "unavailable": self.unavailable,
+            "parse_seconds": self.parse_seconds,
+            "difficulty_seconds": self.difficulty_seconds,
+            **{f"source_{name}": value for name, value in self.source.stats().items()}
+        }
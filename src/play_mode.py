@@ -1,5 +1,16 @@
 from enum import Enum
 
+MODE_ALIASES = {
+    "osu": 0,
+    "std": 0,
+    "standard": 0,
+    "taiko": 1,
+    "ctb": 2,
+    "catch": 2,
+    "fruits": 2,
+    "mania": 3
+}
+
 
 class PlayMode(Enum):
     STANDARD = 0
@@ -9,3 +20,12 @@ class PlayMode(Enum):
 
     def get_name(self) -> str:
         return f"osu!{self.name.lower()}"
+
+    @classmethod
+    def from_alias(cls, alias: str) -> "PlayMode | None":
+        alias = alias.lower().removeprefix("osu!") or "osu"
+
+        if alias.isdigit() and int(alias) in cls._value2member_map_:
+            return cls(int(alias))
+
+        return cls(MODE_ALIASES[alias]) if alias in MODE_ALIASES else None
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Callable
+
+from .beatmap_cache import BeatmapCache
+from .score import Score
+from .exceptions import APIException
+from .logger import Logger
+
+
+class BeatmapPrefetcher:
+    def __init__(self, beatmaps: BeatmapCache, queue_size: int, rate: float, is_wanted: Callable[[str], bool]):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.beatmaps = beatmaps
+        self.rate = rate
+        self.is_wanted = is_wanted
+
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.pending: set[str] = set()
+
+        self.queued = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.fetched = 0
+        self.failed = 0
+
+    def offer(self, score: Score):
+        if not self.is_wanted(score.username):
+            return
+
+        md5 = score.beatmap_md5
+
+        if md5 in self.pending or self.beatmaps.peek(md5) is not None:
+            self.skipped += 1
+            return
+
+        try:
+            self.queue.put_nowait(md5)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+
+        self.pending.add(md5)
+        self.queued += 1
+
+    async def run(self):
+        while True:
+            md5 = await self.queue.get()
+
+            try:
+                await self.beatmaps.get_by_md5(md5)
+                self.fetched += 1
+            except APIException as e:
+                self.failed += 1
+                self.logger.warning(e.message)
+            except Exception as e:
+                self.failed += 1
+                self.logger.error(f"Failed to prefetch beatmap {md5}: {e!r}")
+            finally:
+                self.pending.discard(md5)
+
+            await asyncio.sleep(1 / self.rate)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queued": self.queued,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "fetched": self.fetched,
+            "failed": self.failed
+        }
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from .delta import DeltaAPIClient
+from .exceptions import APIException
+from .logger import Logger
+
+
+class PresenceTracker:
+    def __init__(self, delta: DeltaAPIClient, watched: dict[int, str], poll_rate: int, max_staleness: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.delta = delta
+        self.watched = watched
+        self.nicknames = {nickname.lower(): client_id for client_id, nickname in watched.items()}
+        self.poll_rate = poll_rate
+        self.max_staleness = max_staleness
+
+        self.presence: dict[int, tuple[bool, float]] = {}
+
+        self.polls = 0
+        self.pushes = 0
+        self.stale_reads = 0
+
+    def update(self, client_id: int, online: bool):
+        previous = self.presence.get(client_id)
+
+        if previous is None or previous[0] != online:
+            self.logger.log(f"Client '{client_id}' is now {"online" if online else "offline"}")
+
+        self.presence[client_id] = (online, time.time())
+
+    def push(self, nickname: str | None, online: bool):
+        client_id = self.nicknames.get(nickname.lower()) if nickname else None
+
+        if client_id is not None:
+            self.pushes += 1
+            self.update(client_id, online)
+
+    async def refresh(self, client_id: int):
+        self.polls += 1
+        self.update(client_id, await self.delta.is_online(client_id))
+
+    async def run(self):
+        while True:
+            results = await asyncio.gather(*[self.refresh(client_id) for client_id in self.watched], return_exceptions=True)
+
+            for result in results:
+                if isinstance(result, APIException):
+                    self.logger.warning(result.message)
+                elif isinstance(result, Exception):
+                    self.logger.error(f"Presence poll failed: {result!r}")
+
+            await asyncio.sleep(self.poll_rate)
+
+    async def is_online(self, client_id: int) -> bool:
+        entry = self.presence.get(client_id)
+
+        if entry and time.time() - entry[1] <= self.max_staleness:
+            return entry[0]
+
+        try:
+            await self.refresh(client_id)
+        except Exception as e:
+            if not isinstance(e, APIException):
+                self.logger.error(f"Presence check for client '{client_id}' failed: {e!r}")
+                e = APIException(f"Presence check for client '{client_id}' failed: {e!r}")
+
+            if entry is None:
+                raise e
+
+            self.stale_reads += 1
+            return entry[0]
+
+        return self.presence[client_id][0]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "watched": len(self.watched),
+            "polls": self.polls,
+            "pushes": self.pushes,
+            "stale_reads": self.stale_reads
+        }
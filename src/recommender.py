@@ -0,0 +1,402 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from .score import Score
+from .play_mode import PlayMode
+from .mods import ModBitwise
+from .logger import Logger
+
+INITIAL_CAPACITY = 4096
+SKILL_PLAYS = 10
+SKILL_BAND = 0.25
+TARGET_BOOST = 1.05
+PP_BAND = 0.15
+PP_WINDOW = 2.5
+SNAPSHOT_SLACK = 0.02
+MIN_SUPPORT = 0.05
+MIN_WEIGHT = 0.01
+DIFFICULTY_MODS = sum(1 << ModBitwise[name].value for name in ("EZ", "HR", "DT", "HT", "FL"))
+NIGHTCORE = 1 << ModBitwise.NC.value
+DOUBLE_TIME = 1 << ModBitwise.DT.value
+MODES = len(PlayMode)
+
+
+def grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+
+    grown = np.zeros((max(len(array) * 2, size),) + array.shape[1:], array.dtype)
+    grown[:len(array)] = array
+
+    return grown
+
+
+class BeatmapRecommender:
+    def __init__(self, max_entries: int, recent_limit: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.max_entries = max_entries
+        self.recent_limit = recent_limit
+
+        self.users: dict[int, int] = {}
+        self.user_entries: list[dict[int, int]] = []
+        self.played: list[set[int]] = []
+        self.top: list[list[list[float]]] = []
+        self.skill = np.zeros((INITIAL_CAPACITY, MODES), np.float32)
+
+        self.beatmaps: dict[str, int] = {}
+        self.md5s: list[str] = []
+        self.columns: dict[tuple[int, int, int], int] = {}
+        self.column_keys: list[tuple[int, int, int]] = []
+        self.column_beatmap = np.zeros(INITIAL_CAPACITY, np.int32)
+        self.column_mode = np.zeros(INITIAL_CAPACITY, np.uint8)
+        self.column_mods = np.zeros(INITIAL_CAPACITY, np.uint32)
+
+        self.rows = np.zeros(INITIAL_CAPACITY, np.int32)
+        self.cols = np.zeros(INITIAL_CAPACITY, np.int32)
+        self.pp = np.zeros(INITIAL_CAPACITY, np.float32)
+        self.size = 0
+        self.base = 0
+
+        self.sorted_rows = np.zeros(0, np.int32)
+        self.sorted_cols = np.zeros(0, np.int32)
+        self.sorted_pp = np.zeros(0, np.float32)
+        self.sorted_size = 0
+
+        self.recommended: dict[int, deque[int]] = {}
+
+        self.scores = 0
+        self.compactions = 0
+        self.merges = 0
+        self.recommendations = 0
+        self.empty_recommendations = 0
+
+    @staticmethod
+    def normalize_mods(mods: int) -> int:
+        if mods & NIGHTCORE:
+            mods |= DOUBLE_TIME
+
+        return mods & DIFFICULTY_MODS
+
+    def user_row(self, user_id: int) -> int:
+        row = self.users.get(user_id)
+
+        if row is None:
+            row = self.users[user_id] = len(self.user_entries)
+            self.user_entries.append({})
+            self.played.append(set())
+            self.top.append([[] for _ in PlayMode])
+            self.skill = grow(self.skill, row + 1)
+
+        return row
+
+    def beatmap_index(self, md5: str) -> int:
+        index = self.beatmaps.get(md5)
+
+        if index is None:
+            index = self.beatmaps[md5] = len(self.md5s)
+            self.md5s.append(md5)
+
+        return index
+
+    def column(self, beatmap: int, play_mode: int, mods: int) -> int:
+        key = (beatmap, play_mode, mods)
+        column = self.columns.get(key)
+
+        if column is None:
+            column = self.columns[key] = len(self.column_keys)
+            self.column_keys.append(key)
+
+            self.column_beatmap = grow(self.column_beatmap, column + 1)
+            self.column_mode = grow(self.column_mode, column + 1)
+            self.column_mods = grow(self.column_mods, column + 1)
+
+            self.column_beatmap[column] = beatmap
+            self.column_mode[column] = play_mode
+            self.column_mods[column] = mods
+
+        return column
+
+    def add(self, score: Score):
+        self.add_play(score.user_id, score.beatmap_md5, score.play_mode, score.mods, score.pp, score.completed)
+
+    def add_play(self, user_id: int, md5: str, play_mode: int, mods: int, pp: float, completed: int):
+        self.scores += 1
+
+        if self.size >= self.max_entries:
+            self.compact()
+
+        row = self.user_row(user_id)
+        beatmap = self.beatmap_index(md5)
+        self.played[row].add(beatmap)
+
+        if completed < 2 or pp <= 0 or play_mode >= MODES:
+            return
+
+        column = self.column(beatmap, play_mode, self.normalize_mods(mods))
+        entry = self.user_entries[row].get(column)
+        position = entry - self.base if entry is not None else None
+
+        if position is None:
+            position = self.size
+            self.size += 1
+
+            self.rows = grow(self.rows, self.size)
+            self.cols = grow(self.cols, self.size)
+            self.pp = grow(self.pp, self.size)
+
+            self.rows[position] = row
+            self.cols[position] = column
+            self.user_entries[row][column] = self.base + position
+        elif pp <= self.pp[position]:
+            return
+        elif position < self.sorted_size:
+            self.reorder(row, column, self.pp[position], pp)
+
+        self.pp[position] = pp
+        self.update_skill(row, play_mode, pp)
+
+    def update_skill(self, row: int, play_mode: int, pp: float):
+        top = self.top[row][play_mode]
+
+        if len(top) >= SKILL_PLAYS and pp <= top[-1]:
+            return
+
+        self.refresh_skill(row, play_mode)
+
+    def refresh_skill(self, row: int, play_mode: int):
+        top = self.top[row][play_mode]
+        values = [float(self.pp[entry - self.base]) for column, entry in self.user_entries[row].items() if self.column_mode[column] == play_mode]
+        top[:] = sorted(values, reverse=True)[:SKILL_PLAYS]
+
+        self.skill[row, play_mode] = sum(top) / len(top) if top else 0
+
+    def rebuild_skill(self, affected: list[int]):
+        mask = np.zeros(len(self.user_entries), bool)
+        mask[affected] = True
+        positions = np.flatnonzero(mask[self.rows[:self.size]])
+        rows, modes, pp = self.rows[positions], self.column_mode[self.cols[positions]].astype(np.int64), self.pp[positions]
+
+        order = np.lexsort((-pp, modes, rows))
+        groups = rows[order].astype(np.int64) * MODES + modes[order]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        ranks = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        order, groups = order[ranks < SKILL_PLAYS], groups[ranks < SKILL_PLAYS]
+
+        for group, value in zip(groups.tolist(), pp[order].tolist()):
+            self.top[group // MODES][group % MODES].append(value)
+
+        totals = np.bincount(groups, weights=pp[order].astype(np.float64))
+        counts = np.bincount(groups)
+        present = np.flatnonzero(counts)
+        self.skill[present // MODES, present % MODES] = totals[present] / counts[present]
+
+    def compact(self):
+        dropped = self.size // 2
+        kept = self.size - dropped
+        dropped_rows, dropped_cols = self.rows[:dropped].tolist(), self.cols[:dropped].tolist()
+        affected = np.flatnonzero(np.bincount(self.rows[:dropped], minlength=len(self.user_entries))).tolist()
+
+        self.rows[:kept] = self.rows[dropped:self.size]
+        self.cols[:kept] = self.cols[dropped:self.size]
+        self.pp[:kept] = self.pp[dropped:self.size]
+        self.size = kept
+
+        self.sorted_rows, self.sorted_cols, self.sorted_pp = self.rows[:0], self.cols[:0], self.pp[:0]
+        self.sorted_size = 0
+
+        self.base += dropped
+
+        for row, column in zip(dropped_rows, dropped_cols):
+            del self.user_entries[row][column]
+
+        for row in affected:
+            self.top[row] = [[] for _ in range(MODES)]
+
+        self.skill[affected] = 0
+        self.rebuild_skill(affected)
+
+        self.prune_players()
+        self.prune_columns()
+
+        self.compactions += 1
+        self.logger.log(f"Dropped the oldest {dropped} recommendation index entries, keeping {len(self.users)} player(s) on {len(self.column_keys)} map/mod combination(s)")
+
+    def prune_players(self):
+        live, rows = np.unique(self.rows[:self.size], return_inverse=True)
+        live_rows, user_ids = live.tolist(), list(self.users)
+
+        self.rows[:self.size] = rows
+        self.users = {user_ids[row]: index for index, row in enumerate(live_rows)}
+        self.user_entries = [self.user_entries[row] for row in live_rows]
+        self.played = [self.played[row] for row in live_rows]
+        self.top = [self.top[row] for row in live_rows]
+        self.skill[:len(live)] = self.skill[live]
+        self.skill[len(live):] = 0
+        self.recommended = {user_id: recent for user_id, recent in self.recommended.items() if user_id in self.users}
+
+    def prune_columns(self):
+        live, cols = np.unique(self.cols[:self.size], return_inverse=True)
+        beatmaps, column_beatmap = np.unique(self.column_beatmap[live], return_inverse=True)
+
+        if len(live) * 2 > len(self.column_keys) and len(beatmaps) * 2 > len(self.md5s):
+            return
+
+        column_map = np.full(len(self.column_keys), -1, np.int64)
+        column_map[live] = np.arange(len(live))
+        beatmap_map = dict(zip(beatmaps.tolist(), range(len(beatmaps))))
+
+        self.cols[:self.size] = cols
+        self.column_beatmap[:len(live)] = column_beatmap
+        self.column_mode[:len(live)] = self.column_mode[live]
+        self.column_mods[:len(live)] = self.column_mods[live]
+        self.column_keys = list(zip(column_beatmap.tolist(), self.column_mode[:len(live)].tolist(), self.column_mods[:len(live)].tolist()))
+        self.columns = dict(zip(self.column_keys, range(len(live))))
+
+        self.md5s = [self.md5s[beatmap] for beatmap in beatmaps.tolist()]
+        self.beatmaps = dict(zip(self.md5s, range(len(self.md5s))))
+        self.played = [{beatmap_map[beatmap] for beatmap in played if beatmap in beatmap_map} for played in self.played]
+
+        order = np.argsort(self.rows[:self.size], kind="stable")
+        ends = np.cumsum(np.bincount(self.rows[:self.size], minlength=len(self.user_entries))).tolist()
+        columns, positions = cols[order].tolist(), order.tolist()
+        self.user_entries = [dict(zip(columns[start:end], positions[start:end])) for start, end in zip([0] + ends[:-1], ends)]
+        self.base = 0
+
+        self.recommended = {
+            user_id: deque((column for column in column_map[list(recent)].tolist() if column >= 0), maxlen=self.recent_limit)
+            for user_id, recent in self.recommended.items()
+        }
+
+    def preload(self, rows: list[tuple]):
+        start = time.perf_counter()
+
+        for user_id, md5, play_mode, mods, pp, completed in rows:
+            self.add_play(user_id, md5, play_mode, mods, pp, completed)
+
+        self.logger.log(f"Indexed {self.size} play(s) from {len(self.users)} player(s) on {len(self.column_keys)} map/mod combination(s) in {time.perf_counter() - start:.2f}s")
+
+    def main_mode(self, user_id: int) -> PlayMode | None:
+        row = self.users.get(user_id)
+
+        if row is None or not self.skill[row].any():
+            return None
+
+        return PlayMode(int(self.skill[row].argmax()))
+
+    def merge(self):
+        pending = self.size - self.sorted_size
+
+        if not pending or (self.sorted_size and pending < self.size * SNAPSHOT_SLACK):
+            return
+
+        order = np.argsort(self.pp[self.sorted_size:self.size], kind="stable") + self.sorted_size
+        positions = self.sorted_pp.searchsorted(self.pp[order])
+
+        self.sorted_rows = np.insert(self.sorted_rows, positions, self.rows[order])
+        self.sorted_cols = np.insert(self.sorted_cols, positions, self.cols[order])
+        self.sorted_pp = np.insert(self.sorted_pp, positions, self.pp[order])
+        self.sorted_size = self.size
+        self.merges += 1
+
+    def reorder(self, row: int, column: int, old_pp: float, new_pp: float):
+        low, high = self.sorted_pp.searchsorted(old_pp), self.sorted_pp.searchsorted(old_pp, side="right")
+        index = low + int(np.flatnonzero((self.sorted_rows[low:high] == row) & (self.sorted_cols[low:high] == column))[0])
+        target = self.sorted_pp.searchsorted(np.float32(new_pp)) - 1
+
+        for array in (self.sorted_rows, self.sorted_cols, self.sorted_pp):
+            array[index:target] = array[index + 1:target + 1]
+
+        self.sorted_rows[target], self.sorted_cols[target], self.sorted_pp[target] = row, column, new_pp
+
+    def window(self, target: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.merge()
+
+        low, high = target * (1 - PP_WINDOW * PP_BAND), target * (1 + PP_WINDOW * PP_BAND)
+        start, end = self.sorted_pp.searchsorted(np.float32(low)), self.sorted_pp.searchsorted(np.float32(high), side="right")
+
+        pending = slice(self.sorted_size, self.size)
+        mask = (self.pp[pending] >= low) & (self.pp[pending] <= high)
+
+        return (
+            np.concatenate((self.sorted_rows[start:end], self.rows[pending][mask])),
+            np.concatenate((self.sorted_cols[start:end], self.cols[pending][mask])),
+            np.concatenate((self.sorted_pp[start:end], self.pp[pending][mask]))
+        )
+
+    def recommend(self, user_id: int, play_mode: PlayMode, mods: int | None = None, count: int = 1) -> list[tuple[str, int, float, int]]:
+        self.recommendations += 1
+        row = self.users.get(user_id)
+
+        if row is None or not self.top[row][play_mode.value]:
+            self.empty_recommendations += 1
+            return []
+
+        skill = float(self.skill[row, play_mode.value])
+        target = skill * TARGET_BOOST
+        users, columns = len(self.user_entries), len(self.column_keys)
+        rows, cols, pp = self.window(target)
+
+        entries = self.user_entries[row]
+        own = np.fromiter(entries, np.int32, len(entries))
+        own = own[self.column_mode[own] == play_mode.value]
+        top_columns = own[np.argsort(self.pp[[entries[column] - self.base for column in own.tolist()]])[::-1][:SKILL_PLAYS]]
+
+        in_top = np.zeros(columns, bool)
+        in_top[top_columns] = True
+        overlap = np.bincount(rows[in_top[cols]], minlength=users)
+
+        similarity = np.exp(-np.square((self.skill[:users, play_mode.value] - skill) / (skill * SKILL_BAND))) * (1 + overlap)
+        similarity[row] = 0
+
+        weights = similarity[rows] * np.exp(-np.square((pp - target) / (target * PP_BAND)))
+        support = np.bincount(cols, weights=weights, minlength=columns)
+
+        valid = self.column_mode[:columns] == play_mode.value
+
+        if mods is not None:
+            valid &= self.column_mods[:columns] == mods
+
+        valid &= ~np.isin(self.column_beatmap[:columns], np.fromiter(self.played[row], np.int32, len(self.played[row])))
+        support[~valid] = 0
+
+        support[list(self.recommended.get(user_id, ()))] = 0
+
+        count = min(count, columns)
+        candidates = np.argpartition(-support, count - 1)[:count] if count else []
+        candidates = sorted((int(column) for column in candidates if support[column] > MIN_SUPPORT), key=lambda column: support[column], reverse=True)
+
+        if not candidates:
+            self.empty_recommendations += 1
+
+        recommendations = []
+
+        for column in candidates:
+            matches = cols == column
+            expected = float(np.dot(weights[matches], pp[matches]) / support[column])
+            players = int(np.count_nonzero(weights[matches] > MIN_WEIGHT))
+
+            recommendations.append((self.md5s[self.column_keys[column][0]], self.column_keys[column][2], expected, players))
+
+        return recommendations
+
+    def mark_recommended(self, user_id: int, md5: str, play_mode: PlayMode, mods: int):
+        column = self.columns.get((self.beatmaps.get(md5, -1), play_mode.value, mods))
+
+        if column is not None:
+            self.recommended.setdefault(user_id, deque(maxlen=self.recent_limit)).append(column)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "users": len(self.users),
+            "beatmaps": len(self.md5s),
+            "columns": len(self.column_keys),
+            "entries": self.size,
+            "scores": self.scores,
+            "compactions": self.compactions,
+            "merges": self.merges,
+            "recommendations": self.recommendations,
+            "empty_recommendations": self.empty_recommendations
+        }
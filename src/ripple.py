@@ -1,55 +1,61 @@
+from urllib.parse import quote
+
 from .api_base import APIClientBase
 from .logger import Logger
 
+TIMEOUTS = {"/users": 5}
+CONCURRENCY = {"/users": 4}
+HEDGED = {"/users"}
+
 
 class RippleAPIClient(APIClientBase):
     def __init__(self, ripple_base_url, api_token):
         self.logger = Logger(self.__class__.__name__)
 
-        super().__init__(ripple_base_url, {"X-Ripple-Token": api_token})
+        super().__init__(ripple_base_url, {"X-Ripple-Token": api_token}, TIMEOUTS, CONCURRENCY, HEDGED)
 
-    def get_users(self, **kwargs) -> dict:
+    async def get_users(self, **kwargs) -> dict:
         endpoint = "/users"
         query_params = []
 
         for key, value in kwargs.items():
             match key:
                 case "username":
-                    query_params.append("nname={}".format(value))
+                    query_params.append("nname={}".format(quote(str(value), safe="")))
                 case "user_id":
-                    query_params.append("iid={}".format(value))
+                    query_params.append("iid={}".format(quote(str(value), safe="")))
                 case "privileges":
-                    query_params.append("privileges={}".format(value))
+                    query_params.append("privileges={}".format(quote(str(value), safe="")))
                 case "has_privileges":
-                    query_params.append("has_privileges={}".format(value))
+                    query_params.append("has_privileges={}".format(quote(str(value), safe="")))
                 case "has_not_privileges":
-                    query_params.append("has_not_privileges={}".format(value))
+                    query_params.append("has_not_privileges={}".format(quote(str(value), safe="")))
                 case "country":
-                    query_params.append("country={}".format(value))
+                    query_params.append("country={}".format(quote(str(value), safe="")))
                 case "name_aka":
-                    query_params.append("name_aka={}".format(value))
+                    query_params.append("name_aka={}".format(quote(str(value), safe="")))
                 case "privilege_group":
-                    query_params.append("privilege_group={}".format(value))
+                    query_params.append("privilege_group={}".format(quote(str(value), safe="")))
                 case "ids":
                     for item in value:
-                        query_params.append("ids={}".format(item))
+                        query_params.append("ids={}".format(quote(str(item), safe="")))
                 case "names":
                     for item in value:
-                        query_params.append("names={}".format(item))
+                        query_params.append("names={}".format(quote(str(item), safe="")))
                 case "names_aka":
                     for item in value:
-                        query_params.append("names_aka={}".format(item))
+                        query_params.append("names_aka={}".format(quote(str(item), safe="")))
                 case "countries":
                     for item in value:
-                        query_params.append("countries={}".format(item))
+                        query_params.append("countries={}".format(quote(str(item), safe="")))
                 case "sort":
-                    query_params.append("sort={}".format(value))
+                    query_params.append("sort={}".format(quote(str(value), safe="")))
 
         query = "?" + "&".join(query_params)
 
-        response = self.get(endpoint, query)
+        response = await self.get(endpoint, query)
         return response
 
-    def get_user_id(self, username: str) -> int:
-        response = self.get_users(username=username)
+    async def get_user_id(self, username: str) -> int:
+        response = await self.get_users(username=username)
         return response["users"][0]["id"]
@@ -1,4 +1,13 @@
+from time import time as timestamp
+
+
 class Score:
+    __slots__ = (
+        "score_id", "user_id", "username", "score", "accuracy", "pp", "rank", "mods", "max_combo",
+        "count_300", "count_100", "count_50", "count_geki", "count_katu", "count_miss",
+        "time", "play_mode", "completed", "beatmap_md5", "received_at"
+    )
+
     def __init__(
         self,
         user: dict,
@@ -20,6 +29,8 @@ class Score:
         beatmap_md5: str,
         **kwargs
     ):
+        self.score_id = kwargs.get("id", 0)
+        self.user_id = user.get("id", 0)
         self.username = user["username"]
         self.score = score
         self.accuracy = accuracy
@@ -37,4 +48,4 @@ class Score:
         self.play_mode = play_mode
         self.completed = completed
         self.beatmap_md5 = beatmap_md5
-        self.kwargs = kwargs
+        self.received_at = timestamp()
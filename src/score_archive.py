@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .score import Score
+from .score_history import ScoreHistory
+from .play_mode import PlayMode
+from .mods import ModBitwise
+from .logger import Logger
+
+ROW = np.dtype([
+    ("user_id", "<i4"),
+    ("pp", "<f4"),
+    ("accuracy", "<f4"),
+    ("mods", "<u4"),
+    ("play_mode", "u1"),
+    ("played_at", "<u4"),
+    ("beatmap", "<i4")
+])
+MANIFEST = "CURRENT"
+BEATMAPS_FILE = "beatmaps.txt"
+INITIAL_TAIL = 4096
+MOD_BITS = np.array([member.value for member in ModBitwise], dtype=np.uint32)
+MOD_NAMES = [member.name for member in ModBitwise]
+PERCENTILES = (50, 90, 99)
+TREND_WINDOW = 50
+TOP_MODS = 3
+
+
+class ScoreArchive:
+    def __init__(self, path: str, compact_rows: int, flush_interval: float):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.path = path
+        self.compact_rows = compact_rows
+        self.flush_interval = flush_interval
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+
+        self.segment = 0
+        self.columns: dict[str, np.ndarray] = {name: np.empty(0, ROW[name]) for name in ROW.names}
+        self.logs: list[str] = []
+        self.log = None
+        self.tail = np.empty(INITIAL_TAIL, ROW)
+        self.tail_size = 0
+        self.logged = 0
+        self.beatmap_ids: dict[str, int] = {}
+        self.new_beatmaps: list[str] = []
+        self.beatmap_file = None
+        self.compacting = False
+
+        self.appended = 0
+        self.compactions = 0
+        self.compaction_seconds = 0.0
+
+        self.open()
+
+    def file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def segment_path(self, segment: int) -> str:
+        return self.file(f"segment-{segment}")
+
+    def open(self):
+        os.makedirs(self.path, exist_ok=True)
+
+        manifest = {"segment": 0, "logs": []}
+
+        if os.path.exists(self.file(MANIFEST)):
+            with open(self.file(MANIFEST), "r") as file:
+                manifest = json.load(file)
+
+        self.segment = manifest["segment"]
+
+        if self.segment:
+            self.columns = {name: np.load(os.path.join(self.segment_path(self.segment), f"{name}.npy"), mmap_mode="r") for name in ROW.names}
+
+        if os.path.exists(self.file(BEATMAPS_FILE)):
+            with open(self.file(BEATMAPS_FILE), "r") as file:
+                for md5 in file.read().split():
+                    self.beatmap_ids[md5] = len(self.beatmap_ids)
+
+        self.logs = manifest["logs"] or [f"log-{time.time_ns()}.bin"]
+
+        for log in self.logs:
+            if os.path.exists(self.file(log)):
+                size = os.path.getsize(self.file(log))
+                os.truncate(self.file(log), size - size % ROW.itemsize)
+
+                self.extend(np.fromfile(self.file(log), dtype=ROW))
+
+        self.logged = self.tail_size
+        self.log = open(self.file(self.logs[-1]), "ab")
+        self.beatmap_file = open(self.file(BEATMAPS_FILE), "a")
+        self.write_manifest()
+
+        self.logger.log(f"Opened score archive with {len(self)} score(s) ({self.tail_size} in the append log)")
+
+    def write_manifest(self):
+        temporary = self.file(f"{MANIFEST}.tmp")
+
+        with open(temporary, "w") as file:
+            json.dump({"segment": self.segment, "logs": self.logs}, file)
+
+        os.replace(temporary, self.file(MANIFEST))
+
+    def beatmap_index(self, md5: str) -> int:
+        index = self.beatmap_ids.get(md5)
+
+        if index is None:
+            index = self.beatmap_ids[md5] = len(self.beatmap_ids)
+            self.new_beatmaps.append(md5)
+
+        return index
+
+    def reserve(self, rows: int):
+        if self.tail_size + rows <= len(self.tail):
+            return
+
+        tail = np.empty(max(len(self.tail) * 2, self.tail_size + rows), ROW)
+        tail[:self.tail_size] = self.tail[:self.tail_size]
+        self.tail = tail
+
+    def add(self, score: Score):
+        self.reserve(1)
+
+        self.tail[self.tail_size] = (
+            score.user_id, score.pp, score.accuracy, score.mods, score.play_mode,
+            ScoreHistory.played_at(score), self.beatmap_index(score.beatmap_md5)
+        )
+        self.tail_size += 1
+        self.appended += 1
+
+    def extend(self, rows: np.ndarray):
+        self.reserve(len(rows))
+
+        self.tail[self.tail_size:self.tail_size + len(rows)] = rows
+        self.tail_size += len(rows)
+
+    def flush(self):
+        if self.new_beatmaps:
+            self.beatmap_file.write("".join(f"{md5}\n" for md5 in self.new_beatmaps))
+            self.beatmap_file.flush()
+            self.new_beatmaps = []
+
+        if self.logged < self.tail_size:
+            self.log.write(self.tail[self.logged:self.tail_size].tobytes())
+            self.log.flush()
+            self.logged = self.tail_size
+
+    def merge(self, rows: np.ndarray, segment: int) -> dict[str, np.ndarray]:
+        rows = rows[np.argsort(rows["user_id"], kind="stable")]
+        positions = np.searchsorted(self.columns["user_id"], rows["user_id"], side="right")
+
+        directory = self.segment_path(segment)
+        os.makedirs(directory, exist_ok=True)
+
+        for name in ROW.names:
+            np.save(os.path.join(directory, f"{name}.npy"), np.insert(self.columns[name], positions, rows[name]))
+
+        return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in ROW.names}
+
+    async def compact(self):
+        if self.compacting or not self.tail_size:
+            return
+
+        self.compacting = True
+        self.flush()
+
+        count = self.tail_size
+        rows = self.tail[:count].copy()
+        segment = self.segment + 1
+        old_segment, old_logs = self.segment, self.logs
+
+        self.log.close()
+        self.logs = old_logs + [f"log-{time.time_ns()}.bin"]
+        self.log = open(self.file(self.logs[-1]), "ab")
+        self.write_manifest()
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        try:
+            columns = await loop.run_in_executor(self.executor, self.merge, rows, segment)
+        except OSError as e:
+            self.logger.error(f"Failed to compact {count} score(s): {e!r}")
+            return
+        finally:
+            self.compacting = False
+
+        remaining = self.tail[count:self.tail_size].copy()
+        self.tail[:len(remaining)] = remaining
+        self.tail_size -= count
+        self.logged -= count
+
+        self.columns = columns
+        self.segment = segment
+        self.logs = self.logs[len(old_logs):]
+        self.write_manifest()
+
+        shutil.rmtree(self.segment_path(old_segment), ignore_errors=True)
+
+        for log in old_logs:
+            os.remove(self.file(log))
+
+        self.compactions += 1
+        self.compaction_seconds = time.perf_counter() - start
+
+        self.logger.log(f"Compacted {count} score(s) into segment {segment} ({len(self)} total) in {self.compaction_seconds:.2f}s")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+            if self.tail_size >= self.compact_rows:
+                await self.compact()
+
+    def close(self):
+        self.flush()
+        self.log.close()
+        self.beatmap_file.close()
+        self.executor.shutdown(wait=True)
+
+    def user_columns(self, user_id: int) -> dict[str, np.ndarray]:
+        key = ROW["user_id"].type(user_id)
+        users = self.columns["user_id"]
+        start, end = users.searchsorted(key, side="left"), users.searchsorted(key, side="right")
+
+        tail = self.tail[:self.tail_size]
+        tail = tail[tail["user_id"] == key]
+
+        return {name: np.concatenate((self.columns[name][start:end], tail[name])) for name in ROW.names}
+
+    def aggregate(self, user_id: int) -> dict | None:
+        columns = self.user_columns(user_id)
+        plays = len(columns["user_id"])
+
+        if not plays:
+            return None
+
+        order = np.argsort(columns["played_at"], kind="stable")
+        pp = columns["pp"][order]
+        accuracy = columns["accuracy"][order]
+        ranked = pp[pp > 0]
+
+        modes = np.bincount(columns["play_mode"], minlength=len(PlayMode)) / plays
+        mod_usage = ((columns["mods"][:, None] >> MOD_BITS) & 1).mean(axis=0)
+        top_mods = np.argsort(mod_usage)[::-1][:TOP_MODS]
+
+        return {
+            "plays": plays,
+            "beatmaps": int(np.unique(columns["beatmap"]).size),
+            "modes": {PlayMode(mode): float(share) for mode, share in enumerate(modes[:len(PlayMode)]) if share > 0},
+            "pp_percentiles": dict(zip(PERCENTILES, np.percentile(ranked, PERCENTILES).tolist())) if ranked.size else {},
+            "pp_max": float(ranked.max()) if ranked.size else 0.0,
+            "accuracy": float(accuracy.mean()),
+            "recent_accuracy": float(accuracy[-TREND_WINDOW:].mean()),
+            "mods": {MOD_NAMES[bit]: float(mod_usage[bit]) for bit in top_mods if mod_usage[bit] > 0},
+            "first_played": int(columns["played_at"].min()),
+            "last_played": int(columns["played_at"].max())
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["user_id"]) + self.tail_size
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "rows": len(self),
+            "segment_rows": len(self.columns["user_id"]),
+            "tail_rows": self.tail_size,
+            "beatmaps": len(self.beatmap_ids),
+            "appended": self.appended,
+            "compactions": self.compactions,
+            "compaction_seconds": self.compaction_seconds
+        }
@@ -0,0 +1,183 @@
+import time
+import sqlite3
+import asyncio
+from datetime import datetime, timezone
+
+from .database import DatabaseManager, SCORE_COLUMNS
+from .score import Score
+from .logger import Logger
+
+PRUNE_INTERVAL = 60 * 60
+PRUNE_CHUNK = 5000
+USER_ID_COLUMN = SCORE_COLUMNS.index("user_id")
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class ScoreHistory:
+    def __init__(self, db: DatabaseManager, batch_size: int, flush_interval: float, max_pending: int, retention: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retention = retention
+
+        self.pending: list[tuple] = []
+        self.full = asyncio.Event()
+        self.pruned_at = 0.0
+
+        self.received = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.pruned = 0
+        self.write_failures = 0
+
+    @staticmethod
+    def played_at(score: Score) -> int:
+        try:
+            return int(datetime.fromisoformat(score.time).timestamp())
+        except (TypeError, ValueError):
+            return int(score.received_at)
+
+    @classmethod
+    def to_row(cls, score: Score) -> tuple:
+        return (
+            score.score_id or None, score.user_id, score.username, score.beatmap_md5, score.play_mode, score.score,
+            score.accuracy, score.pp, score.rank, score.mods, score.max_combo, score.count_300, score.count_100,
+            score.count_50, score.count_geki, score.count_katu, score.count_miss, score.completed,
+            cls.played_at(score), int(score.received_at)
+        )
+
+    @staticmethod
+    def to_score(row: tuple) -> Score:
+        columns = dict(zip(SCORE_COLUMNS, row))
+
+        score = Score(
+            user={"id": columns.pop("user_id"), "username": columns.pop("username")},
+            id=columns.pop("score_id") or 0,
+            time=datetime.fromtimestamp(columns.pop("played_at"), timezone.utc).strftime(TIME_FORMAT),
+            **columns
+        )
+        score.received_at = row[-1]
+
+        return score
+
+    def add(self, score: Score):
+        self.pending.append(self.to_row(score))
+        self.received += 1
+
+        overflow = len(self.pending) - self.max_pending
+
+        if overflow > 0:
+            del self.pending[:overflow]
+            self.dropped += overflow
+
+        if len(self.pending) >= self.batch_size:
+            self.full.set()
+
+    async def flush(self) -> bool:
+        self.full.clear()
+
+        if not self.pending:
+            return True
+
+        batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+
+        try:
+            await self.db.insert_scores(batch)
+        except sqlite3.Error as e:
+            self.write_failures += 1
+            self.logger.error(f"Failed to write {len(batch)} score(s): {e!r}")
+
+            self.pending[:0] = batch
+            overflow = max(len(self.pending) - self.max_pending, 0)
+            del self.pending[:overflow]
+            self.dropped += overflow
+
+            return False
+
+        self.written += len(batch)
+        self.batches += 1
+
+        if len(self.pending) >= self.batch_size:
+            self.full.set()
+
+        return True
+
+    async def close(self):
+        while self.pending and await self.flush():
+            pass
+
+    async def prune(self):
+        self.pruned_at = time.monotonic()
+        boundary = await self.db.get_score_boundary(int(time.time() - self.retention))
+        pruned = 0
+
+        while True:
+            deleted = await self.db.delete_scores(boundary, PRUNE_CHUNK)
+            pruned += deleted
+
+            if deleted < PRUNE_CHUNK:
+                break
+
+        if pruned:
+            self.pruned += pruned
+            self.logger.log(f"Pruned {pruned} score(s) older than {self.retention}s")
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.full.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+
+            await self.flush()
+
+            if time.monotonic() - self.pruned_at >= PRUNE_INTERVAL:
+                try:
+                    await self.prune()
+                except sqlite3.Error as e:
+                    self.logger.error(f"Failed to prune score history: {e!r}")
+
+    def pending_for(self, user_id: int) -> list[tuple]:
+        return [row for row in self.pending if row[USER_ID_COLUMN] == user_id]
+
+    async def recent(self, user_id: int, limit: int) -> list[Score]:
+        pending = self.pending_for(user_id)
+        rows = await self.db.get_recent_scores(user_id, limit)
+
+        scores = [self.to_score(row) for row in reversed(pending[-limit:])]
+        scores.extend(self.to_score(row) for row in rows)
+
+        return scores[:limit]
+
+    async def top(self, user_id: int, play_mode: int, limit: int) -> list[Score]:
+        pending = self.pending_for(user_id)
+        rows = await self.db.get_top_scores(user_id, play_mode, limit)
+
+        best: dict[str, Score] = {}
+
+        for score in [self.to_score(row) for row in rows + pending]:
+            if score.play_mode != play_mode or score.completed < 2 or score.pp <= 0:
+                continue
+
+            current = best.get(score.beatmap_md5)
+
+            if current is None or score.pp > current.pp:
+                best[score.beatmap_md5] = score
+
+        return sorted(best.values(), key=lambda score: score.pp, reverse=True)[:limit]
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "received": self.received,
+            "written": self.written,
+            "batches": self.batches,
+            "mean_batch_size": self.written / self.batches if self.batches else 0.0,
+            "pending": len(self.pending),
+            "dropped": self.dropped,
+            "pruned": self.pruned,
+            "write_failures": self.write_failures
+        }
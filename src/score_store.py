@@ -0,0 +1,85 @@
+import sys
+import time
+from itertools import islice
+from collections import OrderedDict, deque
+
+from .score import Score
+from .user_resolver import UserResolver
+
+MEMORY_SAMPLE_USERS = 256
+
+
+class ScoreStore:
+    def __init__(self, max_users: int, scores_per_user: int, max_age: int):
+        self.max_users = max_users
+        self.scores_per_user = scores_per_user
+        self.max_age = max_age
+
+        self.scores: OrderedDict[str, deque[Score]] = OrderedDict()
+
+        self.added = 0
+        self.evicted = 0
+
+    def add(self, score: Score):
+        key = UserResolver.normalize(score.username)
+        user_scores = self.scores.get(key)
+
+        if user_scores is None:
+            user_scores = self.scores[key] = deque(maxlen=self.scores_per_user)
+
+        user_scores.append(score)
+        self.scores.move_to_end(key)
+        self.added += 1
+
+        while len(self.scores) > self.max_users:
+            self.scores.popitem(last=False)
+            self.evicted += 1
+
+        self.prune()
+
+    def prune(self):
+        cutoff = time.time() - self.max_age
+
+        while self.scores and next(iter(self.scores.values()))[-1].received_at < cutoff:
+            self.scores.popitem(last=False)
+            self.evicted += 1
+
+    def last(self, username: str) -> Score | None:
+        user_scores = self.scores.get(UserResolver.normalize(username))
+        return user_scores[-1] if user_scores else None
+
+    def recent(self, username: str, limit: int) -> list[Score]:
+        user_scores = self.scores.get(UserResolver.normalize(username))
+
+        if not user_scores:
+            return []
+
+        return list(reversed(user_scores))[:limit]
+
+    def memory_usage(self) -> int:
+        sample = list(islice(self.scores.items(), MEMORY_SAMPLE_USERS))
+
+        if not sample:
+            return sys.getsizeof(self.scores)
+
+        sampled = 0
+
+        for key, user_scores in sample:
+            sampled += sys.getsizeof(key) + sys.getsizeof(user_scores)
+
+            for score in user_scores:
+                sampled += sys.getsizeof(score) + sum(sys.getsizeof(getattr(score, slot)) for slot in Score.__slots__)
+
+        return sys.getsizeof(self.scores) + sampled * len(self.scores) // len(sample)
+
+    def __len__(self) -> int:
+        return sum(len(user_scores) for user_scores in self.scores.values())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "users": len(self.scores),
+            "scores": len(self),
+            "added": self.added,
+            "evicted": self.evicted,
+            "memory_bytes": self.memory_usage()
+        }
@@ -0,0 +1,41 @@
+import time
+import asyncio
+from collections import OrderedDict
+
+ALL_MODES = [0, 1, 2, 3]
+NOBODY = [{"user": 0, "modes": []}]
+
+
+class ScoreSubscription:
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.users: OrderedDict[int, float] = OrderedDict()
+        self.changed = asyncio.Event()
+
+    def touch(self, user_id: int):
+        if user_id not in self.users:
+            self.changed.set()
+
+        self.users[user_id] = time.time()
+        self.users.move_to_end(user_id)
+
+        while len(self.users) > self.max_size:
+            self.users.popitem(last=False)
+            self.changed.set()
+
+    def prune(self):
+        cutoff = time.time() - self.ttl
+
+        while self.users and next(iter(self.users.values())) < cutoff:
+            self.users.popitem(last=False)
+            self.changed.set()
+
+    def payload(self) -> list[dict]:
+        return [{"user": user_id, "modes": ALL_MODES} for user_id in self.users] or NOBODY
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.users
+
+    def __len__(self) -> int:
+        return len(self.users)
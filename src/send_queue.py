@@ -0,0 +1,218 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable
+
+from .irc_command import IRCCommand
+from .logger import Logger
+
+GLOBAL_RATE = 2.0
+GLOBAL_BURST = 6
+TARGET_RATE = 1.5
+TARGET_BURST = 6
+STALE_AFTER = 10
+REPLY_STALE_AFTER = 30
+MAX_QUEUED = 256
+MAX_BATCH_BYTES = 4096
+MAX_LINE_BYTES = 512
+PREFIX_RESERVE = 64
+LATENCY_SAMPLES = 1024
+
+
+class MessagePriority(Enum):
+    HIGH = 0
+    LOW = 1
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def available(self, now: float) -> bool:
+        self.refill(now)
+        return self.tokens >= 1
+
+    def consume(self):
+        self.tokens -= 1
+
+    def delay(self, now: float) -> float:
+        self.refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class OutboundMessage:
+    __slots__ = ("priority", "sequence", "target", "line", "queued_at")
+
+    def __init__(self, priority: MessagePriority, sequence: int, target: str, line: str, queued_at: float):
+        self.priority = priority
+        self.sequence = sequence
+        self.target = target
+        self.line = line
+        self.queued_at = queued_at
+
+    def __lt__(self, other: "OutboundMessage") -> bool:
+        return (self.priority.value, self.sequence) < (other.priority.value, other.sequence)
+
+
+class SendQueue:
+    def __init__(self, send: Callable[[str], Awaitable[None]], ready: asyncio.Event):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.send = send
+        self.ready = ready
+        self.heap: list[OutboundMessage] = []
+        self.sequence = itertools.count()
+        self.wakeup = asyncio.Event()
+
+        self.global_bucket = TokenBucket(GLOBAL_RATE, GLOBAL_BURST)
+        self.target_buckets: dict[str, TokenBucket] = {}
+
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @staticmethod
+    def split(text: str, max_bytes: int) -> list[str]:
+        chunks = []
+        encoded = text.encode()
+
+        while len(encoded) > max_bytes:
+            cut = max_bytes
+
+            while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+                cut -= 1
+
+            space = encoded.rfind(b" ", 0, cut)
+
+            if space > max_bytes // 2:
+                cut = space
+
+            chunks.append(encoded[:cut].decode())
+            encoded = encoded[cut:].lstrip(b" ")
+
+        chunks.append(encoded.decode())
+
+        return chunks
+
+    def put(self, target: str, irc_command: IRCCommand, text: str, priority: MessagePriority = MessagePriority.HIGH):
+        overhead = len(irc_command.compose(target, "").encode()) + PREFIX_RESERVE
+        now = time.monotonic()
+
+        for chunk in self.split(text, MAX_LINE_BYTES - overhead):
+            message = OutboundMessage(priority, next(self.sequence), target, irc_command.compose(target, chunk), now)
+            heapq.heappush(self.heap, message)
+
+        while len(self.heap) > MAX_QUEUED:
+            self.evict()
+
+        self.wakeup.set()
+
+    def evict(self):
+        index = min(range(len(self.heap)), key=lambda i: (-self.heap[i].priority.value, self.heap[i].sequence))
+
+        self.heap[index] = self.heap[-1]
+        self.heap.pop()
+        heapq.heapify(self.heap)
+        self.dropped += 1
+
+    def get_bucket(self, target: str) -> TokenBucket:
+        if target not in self.target_buckets:
+            self.target_buckets[target] = TokenBucket(TARGET_RATE, TARGET_BURST)
+
+        return self.target_buckets[target]
+
+    def take_batch(self, now: float) -> tuple[list[OutboundMessage], float]:
+        batch = []
+        deferred = []
+        size = 0
+        delay = 0.0
+
+        while self.heap and size < MAX_BATCH_BYTES:
+            message = heapq.heappop(self.heap)
+
+            if now - message.queued_at > (STALE_AFTER if message.priority is MessagePriority.LOW else REPLY_STALE_AFTER):
+                self.dropped += 1
+                continue
+
+            if not self.global_bucket.available(now):
+                deferred.append(message)
+                delay = self.global_bucket.delay(now)
+                break
+
+            bucket = self.get_bucket(message.target)
+
+            if not bucket.available(now):
+                deferred.append(message)
+                delay = bucket.delay(now) if not delay else min(delay, bucket.delay(now))
+                continue
+
+            self.global_bucket.consume()
+            bucket.consume()
+            batch.append(message)
+            size += len(message.line.encode())
+
+        for message in deferred:
+            heapq.heappush(self.heap, message)
+
+        return batch, delay
+
+    async def run(self):
+        while True:
+            self.wakeup.clear()
+
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            await self.ready.wait()
+
+            now = time.monotonic()
+            batch, delay = self.take_batch(now)
+
+            if batch:
+                try:
+                    await self.send("".join(message.line for message in batch))
+                except (ConnectionError, OSError) as e:
+                    self.logger.warning(f"Send failed, requeueing {len(batch)} message(s): {e!r}")
+
+                    for message in batch:
+                        heapq.heappush(self.heap, message)
+
+                    self.ready.clear()
+                    continue
+
+                sent_at = time.monotonic()
+                self.latencies.extend(sent_at - message.queued_at for message in batch)
+                self.sent += len(batch)
+                self.batches += 1
+            elif self.heap:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), max(delay, 0.01))
+                except TimeoutError:
+                    pass
+
+    def stats(self) -> dict[str, float]:
+        latencies = sorted(self.latencies)
+
+        return {
+            "queue_depth": len(self.heap),
+            "sent": self.sent,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "latency_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "latency_p99": latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+        }
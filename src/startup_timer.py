@@ -0,0 +1,29 @@
+import time
+from contextlib import contextmanager
+
+from .logger import Logger
+
+
+class StartupTimer:
+    def __init__(self, name: str):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.name = name
+
+        self.started_at = time.perf_counter()
+        self.phases: list[tuple[str, float, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started_at, time.perf_counter() - start))
+
+    def report(self):
+        total = time.perf_counter() - self.started_at
+        lines = [f"\t{name}: {duration:.3f}s (started at +{offset:.3f}s)" for name, offset, duration in self.phases]
+
+        self.logger.log(f"{self.name} ready in {total:.3f}s\n" + "\n".join(lines))
@@ -0,0 +1,115 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable
+
+from .startup_timer import StartupTimer
+from .logger import Logger
+
+BASE_DELAY = 1
+MAX_DELAY = 60
+
+
+async def wait_first(*tasks: asyncio.Task):
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    for task in done:
+        task.result()
+
+    raise ConnectionError("Connection task exited")
+
+
+class ConnectionSupervisor:
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[StartupTimer], Awaitable[None]],
+        serve: Callable[[], Awaitable[None]],
+        reset: Callable[[], Awaitable[None]]
+    ):
+        self.logger = Logger(f"{self.__class__.__name__}:{name}")
+
+        self.name = name
+        self.connect = connect
+        self.serve = serve
+        self.reset = reset
+
+        self.connected = asyncio.Event()
+        self.down_since: float | None = None
+
+        self.connects = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.downtime = 0.0
+
+    def get_delay(self, attempt: int) -> float:
+        delay = min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def run(self):
+        attempt = 0
+
+        while True:
+            try:
+                timer = StartupTimer(self.name)
+                await self.connect(timer)
+                timer.report()
+
+                self.mark_up()
+                attempt = 0
+
+                await self.serve()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.logger.warning(f"Connection lost: {e!r}")
+
+            self.mark_down()
+
+            try:
+                await self.reset()
+            except Exception as e:
+                self.logger.warning(f"Error while resetting connection: {e!r}")
+
+            delay = self.get_delay(attempt)
+            attempt += 1
+
+            self.logger.log(f"Reconnecting in {delay:.1f}s (attempt {attempt})...")
+            await asyncio.sleep(delay)
+
+    def mark_up(self):
+        if self.down_since is not None:
+            downtime = time.monotonic() - self.down_since
+            self.downtime += downtime
+            self.reconnects += 1
+            self.down_since = None
+
+            self.logger.log(f"Reconnected after {downtime:.1f}s of downtime")
+
+        self.connects += 1
+        self.connected.set()
+
+    def mark_down(self):
+        self.connected.clear()
+
+        if self.down_since is None:
+            self.down_since = time.monotonic()
+
+    def stats(self) -> dict[str, float]:
+        current_downtime = time.monotonic() - self.down_since if self.down_since is not None else 0.0
+
+        return {
+            "connected": int(self.connected.is_set()),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "failures": self.failures,
+            "downtime_seconds": self.downtime + current_downtime
+        }
@@ -0,0 +1,76 @@
+import os
+import gzip
+import json
+import time
+import asyncio
+import zlib
+from typing import Iterator
+
+from .logger import Logger
+
+IRC_STREAM = "irc"
+WEBSOCKET_STREAM = "ws"
+
+
+class TrafficRecorder:
+    def __init__(self, path: str, flush_interval: float):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.path = path
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = gzip.open(path, "ab")
+
+        self.records = 0
+        self.raw_bytes = 0
+
+    def record(self, stream: str, payload: str):
+        if self.file is None:
+            return
+
+        entry = json.dumps([round(time.time(), 3), stream, payload.rstrip("\r\n")], ensure_ascii=False).encode() + b"\n"
+        self.file.write(entry)
+
+        self.records += 1
+        self.raw_bytes += len(entry)
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+
+    async def run_flusher(self):
+        self.logger.log(f"Recording traffic to '{self.path}'")
+
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "records": self.records,
+            "raw_bytes": self.raw_bytes
+        }
+
+    @staticmethod
+    def read(path: str) -> Iterator[tuple[float, str, str]]:
+        with gzip.open(path, "rb") as recording:
+            try:
+                for line in recording:
+                    try:
+                        timestamp, stream, payload = json.loads(line)
+                    except ValueError:
+                        return
+
+                    yield timestamp, stream, payload
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                return
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Callable
+
+from .ripple import RippleAPIClient
+from .exceptions import APIException
+from .logger import Logger
+
+
+class UserLookupBatcher:
+    def __init__(self, ripple: RippleAPIClient, window: float, max_batch: int, normalize: Callable[[str], str]):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.ripple = ripple
+        self.window = window
+        self.max_batch = max_batch
+        self.normalize = normalize
+
+        self.pending: dict[str, asyncio.Future] = {}
+        self.in_flight: dict[str, asyncio.Future] = {}
+        self.timer: asyncio.TimerHandle | None = None
+        self.tasks: set[asyncio.Task] = set()
+
+        self.lookups = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched = 0
+        self.largest_batch = 0
+        self.not_found = 0
+
+    async def lookup(self, key: str) -> int:
+        self.lookups += 1
+        future = self.pending.get(key) or self.in_flight.get(key)
+
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.pending[key] = future
+
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+
+        return await asyncio.shield(future)
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, {}
+        self.in_flight.update(batch)
+
+        task = asyncio.create_task(self.resolve(batch), name="User Lookup Batch Task")
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def resolve(self, batch: dict[str, asyncio.Future]):
+        self.batches += 1
+        self.batched += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        found: dict[str, int] = {}
+        error: APIException | None = None
+
+        try:
+            response = await self.ripple.get_users(names=list(batch))
+            found = {self.normalize(user["username"]): user["id"] for user in response.get("users") or []}
+        except APIException as e:
+            error = e
+        except (AttributeError, KeyError, TypeError) as e:
+            error = APIException(f"Unexpected /users response: {e!r}")
+        except BaseException as e:
+            error = APIException(f"User lookup batch failed: {e!r}")
+            raise
+        finally:
+            self.settle(batch, found, error)
+
+    def settle(self, batch: dict[str, asyncio.Future], found: dict[str, int], error: APIException | None):
+        for key, future in batch.items():
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+            if future.done():
+                continue
+
+            if key in found:
+                future.set_result(found[key])
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                self.not_found += 1
+                future.set_exception(APIException(f"User '{key}' not found"))
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "lookups": self.lookups,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "mean_batch_size": self.batched / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "not_found": self.not_found,
+            "requests_saved": self.lookups - self.batches
+        }
@@ -0,0 +1,144 @@
+import time
+import asyncio
+from collections import OrderedDict
+
+from .ripple import RippleAPIClient
+from .database import DatabaseManager
+from .user_batcher import UserLookupBatcher
+from .exceptions import APIException
+from .logger import Logger
+
+
+class UserResolver:
+    def __init__(self, ripple: RippleAPIClient, db: DatabaseManager, max_size: int, ttl: int, max_stale: int, batch_window: float, batch_size: int):
+        self.logger = Logger(self.__class__.__name__)
+
+        self.ripple = ripple
+        self.db = db
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.lookups = UserLookupBatcher(ripple, batch_window, batch_size, self.normalize)
+
+        self.cache: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self.names: dict[int, str] = {}
+        self.refreshing: set[str] = set()
+        self.tasks: set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.db_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+
+    @staticmethod
+    def normalize(username: str) -> str:
+        return username.strip().lower().replace(" ", "_")
+
+    async def get_user_id(self, username: str) -> int:
+        key = self.normalize(username)
+        now = time.time()
+
+        entry = self.cache.get(key)
+
+        if entry and now - entry[1] < self.ttl:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        if entry and now - entry[1] < self.ttl + self.max_stale:
+            self.cache.move_to_end(key)
+            self.stale_hits += 1
+            self.revalidate(key)
+            return entry[0]
+
+        row = await self.db.get_username(key)
+
+        if row and now - row[1] < self.ttl:
+            self.db_hits += 1
+            self.store(key, row[0], row[1])
+            return row[0]
+
+        if row and now - row[1] < self.ttl + self.max_stale:
+            self.stale_hits += 1
+            self.store(key, row[0], row[1])
+            self.revalidate(key)
+            return row[0]
+
+        self.misses += 1
+
+        try:
+            user_id = await self.lookups.lookup(key)
+        except APIException:
+            if not entry and not row:
+                raise
+
+            self.stale_hits += 1
+            return entry[0] if entry else row[0]
+
+        await self.remember(key, user_id, now)
+
+        return user_id
+
+    def revalidate(self, key: str):
+        if key in self.refreshing:
+            return
+
+        self.refreshing.add(key)
+
+        task = asyncio.create_task(self.refresh(key), name="Username Refresh Task")
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def refresh(self, key: str):
+        try:
+            await self.remember(key, await self.lookups.lookup(key), time.time())
+        except APIException as e:
+            self.refresh_failures += 1
+            self.logger.debug(f"Keeping stale user ID for '{key}': {e.message}")
+        finally:
+            self.refreshing.discard(key)
+
+    def store(self, key: str, user_id: int, updated_at: float):
+        previous = self.names.get(user_id)
+
+        if previous is not None and previous != key:
+            self.cache.pop(previous, None)
+
+        self.cache[key] = (user_id, updated_at)
+        self.cache.move_to_end(key)
+        self.names[user_id] = key
+
+        while len(self.cache) > self.max_size:
+            evicted_key, (evicted_id, _) = self.cache.popitem(last=False)
+
+            if self.names.get(evicted_id) == evicted_key:
+                del self.names[evicted_id]
+
+    async def remember(self, key: str, user_id: int, updated_at: float):
+        self.store(key, user_id, updated_at)
+        await self.db.set_username(key, user_id, int(updated_at))
+
+    async def invalidate(self, username: str):
+        key = self.normalize(username)
+        entry = self.cache.pop(key, None)
+
+        if entry and self.names.get(entry[0]) == key:
+            del self.names[entry[0]]
+
+        await self.db.delete_username(key)
+
+    async def rename(self, old_username: str, new_username: str):
+        self.logger.log(f"User '{old_username}' is now known as '{new_username}'")
+        await self.invalidate(old_username)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.cache),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_failures": self.refresh_failures,
+            "upstream_calls_saved": self.hits + self.db_hits + self.stale_hits + self.lookups.lookups - self.lookups.batches
+        }
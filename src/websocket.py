@@ -1,18 +1,31 @@
 import asyncio
+import re
 import ssl
+import time
+from typing import Callable
 
 from websockets.asyncio.client import connect, ClientConnection
 
 from .logger import Logger
+from .supervisor import wait_first
+from .metrics import METRICS
 from .ws_message import WebsocketMessageType, WebsocketMessage
 from .score import Score
+from .score_store import ScoreStore
+from .score_subscription import ScoreSubscription
+from .traffic_recorder import TrafficRecorder, WEBSOCKET_STREAM
 
 HEARTBEAT_RATE = 50
 HEARTBEAT_TIMEOUT = 5
+SUBSCRIPTION_DEBOUNCE = 5
+SUBSCRIPTION_PRUNE_RATE = 300
+TYPE_WINDOW = 64
+NEW_SCORE_TYPE = '"new_score"'
+SCORE_USER_ID = re.compile(r'"user"\s*:\s*\{[^{}]*?"id"\s*:\s*(\d+)')
 
 
 class RippleWebsocketClient:
-    def __init__(self, websocket_url: str, token: str):
+    def __init__(self, websocket_url: str, token: str, scores: ScoreStore, recorder: TrafficRecorder | None = None, subscription: ScoreSubscription | None = None):
         self.logger = Logger(self.__class__.__name__)
 
         self.url = websocket_url
@@ -20,20 +33,35 @@ class RippleWebsocketClient:
 
         self.websocket: ClientConnection | None = None
         self.alive = asyncio.Event()
-        self.last_scores: dict[str, Score] = {}
+        self.scores = scores
+        self.recorder = recorder
+        self.subscription = subscription
+        self.score_listeners: list[Callable[[Score], None]] = []
+
+        self.started_at = time.monotonic()
+        self.frames = 0
+        self.decoded = 0
+        self.dropped = 0
+        self.subscribed_users = 0
 
     async def run(self):
-        await self.setup()
+        tasks = [
+            asyncio.create_task(self.handle_server(), name="Handler Task"),
+            asyncio.create_task(self.handle_heartbeat(), name="Heartbeat Task")
+        ]
 
-        handler_task = asyncio.create_task(self.handle_server(), name="Handler Task")
-        heartbeat_task = asyncio.create_task(self.handle_heartbeat(), name="Heartbeat Task")
+        if self.subscription is not None:
+            tasks.append(asyncio.create_task(self.handle_subscription(), name="Subscription Task"))
 
-        await asyncio.gather(handler_task, heartbeat_task)
+        await wait_first(*tasks)
 
     async def connect(self):
-        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
+        context = None
+
+        if self.url.startswith("wss://"):
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
 
         self.logger.log(f"Connecting to websocket...")
 
@@ -41,25 +69,78 @@ class RippleWebsocketClient:
 
         self.logger.log("Connected!\n")
 
+    async def disconnect(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+            self.websocket = None
+
     async def setup(self):
         self.logger.log("Authenticating with token...")
         websocket_message = WebsocketMessage(WebsocketMessageType.IDENTIFY, data={"token": self.token, "is_bearer": False})
         await self.send(websocket_message.serialize())
 
-        self.logger.log("Subscribing to scores...")
-        websocket_message = WebsocketMessage(WebsocketMessageType.SUBSCRIBE_SCORES)
+        if self.subscription is None:
+            self.logger.log("Subscribing to scores...")
+            websocket_message = WebsocketMessage(WebsocketMessageType.SUBSCRIBE_SCORES)
+            await self.send(websocket_message.serialize())
+        else:
+            self.subscribed_users = 0
+            await self.subscribe()
+
+    async def subscribe(self):
+        self.subscription.changed.clear()
+
+        if self.subscription:
+            self.logger.log(f"Subscribing to scores of {len(self.subscription)} active user(s)...")
+        else:
+            self.logger.debug("No active users, subscribing to nobody's scores", category="websocket")
+
+        websocket_message = WebsocketMessage(WebsocketMessageType.SUBSCRIBE_SCORES, data=self.subscription.payload())
         await self.send(websocket_message.serialize())
 
+        self.subscribed_users = len(self.subscription)
+
+    async def handle_subscription(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.subscription.changed.wait(), SUBSCRIPTION_PRUNE_RATE)
+            except TimeoutError:
+                pass
+
+            await asyncio.sleep(SUBSCRIPTION_DEBOUNCE)
+
+            self.subscription.prune()
+
+            if self.subscription.changed.is_set():
+                await self.subscribe()
+
+    def should_drop(self, frame: str) -> bool:
+        if NEW_SCORE_TYPE not in frame[:TYPE_WINDOW]:
+            return False
+
+        match = SCORE_USER_ID.search(frame)
+
+        return match is not None and int(match.group(1)) not in self.subscription
+
     async def handle_server(self):
         while True:
             message = await self.recv()
+            self.frames += 1
+
+            if self.subscription is not None and self.should_drop(message):
+                self.dropped += 1
+                continue
 
             try:
                 ws_message = WebsocketMessage.deserialize(message)
-                await self.handle_message(ws_message)
             except KeyError:
                 continue
 
+            self.decoded += 1
+
+            with METRICS.timer("websocket_message_seconds", "Time spent handling a websocket message", type=ws_message.type.name):
+                await self.handle_message(ws_message)
+
     async def handle_heartbeat(self):
         while True:
             await self.heartbeat(HEARTBEAT_TIMEOUT)
@@ -70,6 +151,10 @@ class RippleWebsocketClient:
 
     async def recv(self) -> str:
         message = await self.websocket.recv()
+
+        if self.recorder is not None:
+            self.recorder.record(WEBSOCKET_STREAM, message)
+
         return message
 
     async def heartbeat(self, timeout: int):
@@ -86,6 +171,26 @@ class RippleWebsocketClient:
                 self.alive.set()
             case WebsocketMessageType.NEW_SCORE:
                 score = Score(**ws_message.kwargs["data"])
-                self.last_scores[score.username] = score
+                self.scores.add(score)
+
+                for listener in self.score_listeners:
+                    try:
+                        listener(score)
+                    except Exception as e:
+                        name = getattr(listener, "__qualname__", repr(listener))
+                        METRICS.counter("websocket_listener_errors_total", "Score listeners that raised on a websocket score", listener=name).inc()
+                        self.logger.error(f"Score listener '{name}' failed on score {score.score_id}: {e!r}")
             case _:
-                self.logger.log(ws_message.serialize())
+                self.logger.debug(ws_message.serialize(), category="websocket")
+
+    def stats(self) -> dict[str, float]:
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+
+        return {
+            "frames": self.frames,
+            "decoded": self.decoded,
+            "dropped": self.dropped,
+            "decoded_per_second": self.decoded / uptime,
+            "dropped_per_second": self.dropped / uptime,
+            "subscribed_users": self.subscribed_users
+        }